@@ -0,0 +1,4 @@
+// Generated by scripts/convert_questionnaire_to_backend.py --catalog. Do not edit.
+import { QuestionnaireManifestEntry } from '../../services/questionnaireCatalog';
+
+export const manifest: QuestionnaireManifestEntry[] = [];
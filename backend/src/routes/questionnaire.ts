@@ -14,6 +14,15 @@ router.get('/', asyncHandler(async (req: Request, res: Response) => {
   });
 }));
 
+// GET /api/questionnaires/catalog - Get the per-payer questionnaire manifest (modules are loaded on demand)
+router.get('/catalog', asyncHandler(async (req: Request, res: Response) => {
+  const catalog = await questionnaireService.getCatalog();
+  return res.json({
+    success: true,
+    data: catalog
+  });
+}));
+
 // GET /api/questionnaires/:id - Get specific questionnaire
 router.get('/:id', asyncHandler(async (req: Request, res: Response) => {
   const { id } = req.params;
@@ -0,0 +1,114 @@
+/**
+ * Questionnaire Catalog - Per-payer questionnaire modules loaded on demand
+ * Modules and their manifest are generated by scripts/convert_questionnaire_to_backend.py --catalog;
+ * only the manifest is read up front, and loaded questionnaires are kept in a bounded LRU cache
+ */
+
+import { Questionnaire } from '../types/questionnaire';
+
+export interface QuestionnaireManifestEntry {
+  id: string;
+  payer: string;
+  version: string;
+  title: string;
+  transactionType: string;
+  module: string;
+  hash: string;
+  sectionCount: number;
+  questionCount: number;
+}
+
+const CATALOG_DIR = '../data/questionnaires';
+const DEFAULT_CACHE_SIZE = 20;
+
+export class QuestionnaireCatalog {
+  private manifest: Map<string, QuestionnaireManifestEntry> | null = null;
+  // Map iteration order is insertion order, so the first key is always the least recently used
+  private cache: Map<string, Questionnaire> = new Map();
+  private pending: Map<string, Promise<Questionnaire>> = new Map();
+
+  constructor(
+    private readonly capacity: number = Number(process.env.QUESTIONNAIRE_CACHE_SIZE) || DEFAULT_CACHE_SIZE
+  ) {}
+
+  async getEntries(): Promise<QuestionnaireManifestEntry[]> {
+    return Array.from((await this.loadManifest()).values());
+  }
+
+  async getEntry(id: string): Promise<QuestionnaireManifestEntry | null> {
+    return (await this.loadManifest()).get(id) || null;
+  }
+
+  /**
+   * Questionnaire for a catalog id, loading its module on first use
+   */
+  async getQuestionnaire(id: string): Promise<Questionnaire | null> {
+    const cached = this.cache.get(id);
+    if (cached) {
+      // Mark as most recently used
+      this.cache.delete(id);
+      this.cache.set(id, cached);
+      return cached;
+    }
+
+    const entry = await this.getEntry(id);
+    if (!entry) {
+      return null;
+    }
+
+    // Concurrent requests for the same questionnaire share one load
+    let loading = this.pending.get(id);
+    if (!loading) {
+      loading = this.loadModule(entry).finally(() => this.pending.delete(id));
+      this.pending.set(id, loading);
+    }
+    const questionnaire = await loading;
+    this.remember(id, questionnaire);
+    return questionnaire;
+  }
+
+  getCacheStats(): { size: number; capacity: number; loaded: string[] } {
+    return { size: this.cache.size, capacity: this.capacity, loaded: Array.from(this.cache.keys()) };
+  }
+
+  private async loadManifest(): Promise<Map<string, QuestionnaireManifestEntry>> {
+    if (!this.manifest) {
+      const { manifest } = await import(`${CATALOG_DIR}/manifest`);
+      this.manifest = new Map((manifest as QuestionnaireManifestEntry[]).map(entry => [entry.id, entry]));
+    }
+    return this.manifest;
+  }
+
+  private async loadModule(entry: QuestionnaireManifestEntry): Promise<Questionnaire> {
+    const { questionnaire } = await import(`${CATALOG_DIR}/${entry.module}`);
+    if (!questionnaire) {
+      throw new Error(`Questionnaire module ${entry.module} has no questionnaire export`);
+    }
+    return questionnaire as Questionnaire;
+  }
+
+  private remember(id: string, questionnaire: Questionnaire): void {
+    this.cache.delete(id);
+    this.cache.set(id, questionnaire);
+
+    while (this.cache.size > this.capacity) {
+      const evicted = this.cache.keys().next().value as string;
+      this.cache.delete(evicted);
+      const moduleName = this.manifest?.get(evicted)?.module;
+      if (moduleName) {
+        this.unloadModule(moduleName);
+      }
+    }
+  }
+
+  private unloadModule(moduleName: string): void {
+    // The require cache holds a reference to every loaded module; drop it so evicted questionnaires can be collected
+    try {
+      delete require.cache[require.resolve(`${CATALOG_DIR}/${moduleName}`)];
+    } catch {
+      // Not resolvable any more (e.g. regenerated away); nothing to release
+    }
+  }
+}
+
+export const questionnaireCatalog = new QuestionnaireCatalog();
@@ -2,12 +2,18 @@ import { Questionnaire, Section, ImplementationMode } from '../types/questionnai
 import { x12270271Questionnaire } from '../data/x12-270-271-questionnaire';
 import { x12270271CompleteQuestionnaire } from '../data/x12-270-271-complete';
 import { createError } from '../middleware/errorHandler';
+import { questionnaireCatalog, QuestionnaireCatalog, QuestionnaireManifestEntry } from './questionnaireCatalog';
 
 export class QuestionnaireService {
   // In-memory storage for now (will be replaced with database later)
   private questionnaires: Map<string, Questionnaire> = new Map();
 
-  constructor() {
+  // Per-payer questionnaires, loaded on demand from the generated catalog
+  private catalog: QuestionnaireCatalog;
+
+  constructor(catalog: QuestionnaireCatalog = questionnaireCatalog) {
+    this.catalog = catalog;
+
     // Initialize with the X12 270/271 questionnaires
     this.questionnaires.set(x12270271Questionnaire.id, x12270271Questionnaire);
     this.questionnaires.set(x12270271CompleteQuestionnaire.id, x12270271CompleteQuestionnaire);
@@ -18,10 +24,14 @@ export class QuestionnaireService {
   }
 
   async getQuestionnaireById(id: string): Promise<Questionnaire | null> {
-    const questionnaire = this.questionnaires.get(id);
+    const questionnaire = this.questionnaires.get(id) || await this.catalog.getQuestionnaire(id);
     return questionnaire && questionnaire.isActive ? questionnaire : null;
   }
 
+  async getCatalog(): Promise<QuestionnaireManifestEntry[]> {
+    return this.catalog.getEntries();
+  }
+
   async getQuestionnaireSections(
     questionnaireId: string, 
     implementationMode?: string
@@ -8,18 +8,34 @@ This script provides comprehensive PDF form field extraction with:
 - Conditional logic identification
 - Field relationship analysis
 - Questionnaire structure generation
+- Incremental re-extraction of revised PDFs: with --incremental only pages
+  whose content hash changed since the last run (page_manifest.json) are
+  analyzed again, and fields_raw.json / form_controls_analysis.json are
+  spliced
 
 Usage:
-    python advanced_pdf_extractor.py <pdf_file> [--generate-questionnaire]
+    python advanced_pdf_extractor.py <pdf_file> [--generate-questionnaire] [--incremental] [--html]
 """
 
 import sys
 import json
 import re
+import time
 import argparse
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Tuple, Iterator
+from dataclasses import dataclass, asdict, replace
+
+from page_manifest import load_manifest, match_pages, page_hashes, update_manifest
+from report_writer import DEFAULT_PAGE_SIZE, ReportSection, write_html_report, write_markdown_report
+from run_journal import atomic_write
+
+FIELDS_OUTPUT = "fields_raw.json"
+
+# Linear tokenizer for text analysis: words (incl. underscores and inner hyphens) or punctuation runs
+LABEL_TOKEN_PATTERN = re.compile(r'\w+(?:-\w+)*|[^\w\s]+')
+CHECKBOX_MARKERS = ("□", "☐")
+CLOSERS = {"[": "]", "(": ")"}
 
 @dataclass
 class FormField:
@@ -44,10 +60,18 @@ class FormField:
 
 
 class AdvancedPDFExtractor:
+    # Compiled X12 patterns, shared by every extractor in the process
+    _compiled_x12_patterns: Optional[List[Tuple[Any, str]]] = None
+
     def __init__(self, pdf_path: str):
         self.pdf_path = Path(pdf_path)
         self.fields: Dict[str, FormField] = {}
         self.sections: Dict[str, List[str]] = {}
+        # page → extraction method → field names it produced (page 0: document-level PyPDF2 fields)
+        self.page_fields: Dict[int, Dict[str, List[str]]] = {}
+        self.page_hashes: Optional[List[str]] = None
+        # page → vector geometry detections, so unchanged pages need not be detected again
+        self.page_detections: Dict[int, List[Dict[str, str]]] = {}
         self.x12_patterns = self._load_x12_patterns()
         
     def _load_x12_patterns(self) -> Dict[str, str]:
@@ -75,8 +99,12 @@ class AdvancedPDFExtractor:
             r'(?i)email': 'PER*IC*{ContactName}*EM*{EmailAddress}',
         }
     
-    def extract_fields_comprehensive(self) -> Dict[str, FormField]:
-        """Extract fields using multiple methods"""
+    def extract_fields_comprehensive(self, degraded: bool = False) -> Dict[str, FormField]:
+        """Extract fields using multiple methods
+
+        degraded: PyMuPDF widgets only, for documents that blew their time or memory
+        budget (no PyPDF2 /Kids recursion, no geometry or text analysis)
+        """
         print(f"Starting comprehensive extraction from: {self.pdf_path}")
         
         # Method 1: Try PyMuPDF
@@ -86,6 +114,11 @@ class AdvancedPDFExtractor:
         except Exception as e:
             print(f"PyMuPDF failed: {e}")
         
+        if degraded:
+            print("Degraded mode: skipping PyPDF2, vector geometry and text analysis")
+            self._post_process()
+            return self.fields
+        
         # Method 2: Try PyPDF2
         try:
             self._extract_with_pypdf2()
@@ -93,28 +126,120 @@ class AdvancedPDFExtractor:
         except Exception as e:
             print(f"PyPDF2 failed: {e}")
         
-        # Method 3: Text analysis for field detection
+        # Method 3: Vector geometry for flattened PDFs (no AcroForm widgets)
+        if not self.fields:
+            try:
+                self._extract_from_vector_geometry()
+                print(f"After vector geometry: Total {len(self.fields)} fields")
+            except Exception as e:
+                print(f"Vector geometry failed: {e}")
+        
+        # Method 4: Text analysis for field detection
         try:
             self._extract_from_text_analysis()
             print(f"After text analysis: Total {len(self.fields)} fields")
         except Exception as e:
             print(f"Text analysis failed: {e}")
         
-        # Post-processing
+        self._post_process()
+        return self.fields
+    
+    def extract_fields_incremental(self, output_dir: str = "extracted_fields") -> Dict[str, FormField]:
+        """Extract only pages whose content changed since the run recorded in page_manifest.json
+
+        Fields of unchanged (or moved) pages are taken from the previous fields_raw.json;
+        widgets, vector geometry and text labels are analyzed again for changed pages only.
+        The PyPDF2 AcroForm walk is document-level, so it is repeated whenever anything
+        changed. Without a usable manifest every page is extracted.
+        """
+        self.page_hashes = page_hashes(self.pdf_path)
+        previous = load_manifest(output_dir).get(FIELDS_OUTPUT)
+        fields_path = Path(output_dir) / FIELDS_OUTPUT
+        if not previous or not fields_path.exists():
+            print("No page manifest from a previous run, extracting every page")
+            return self.extract_fields_comprehensive()
+        
+        with open(fields_path, 'r') as f:
+            old_fields = {name: FormField(**data) for name, data in json.load(f).items()}
+        matches = match_pages(previous["page_hashes"], self.page_hashes)
+        changed = [page - 1 for page, old_page in matches.items() if old_page is None]
+        print(f"Incremental extraction from: {self.pdf_path} ({len(changed)} of {len(matches)} pages changed)")
+        
+        def splice(method: str, fresh: Tuple[Dict[str, FormField], Dict[int, Dict[str, List[str]]]],
+                   keep_existing: bool = False):
+            """Add one method's fields page by page, in the order a full extraction would"""
+            fresh_fields, fresh_pages = fresh
+            for page, old_page in matches.items():
+                if old_page is None:
+                    names, source = fresh_pages.get(page, {}).get(method, []), fresh_fields
+                else:
+                    names, source = previous["pages"].get(str(old_page), {}).get(method, []), old_fields
+                for name in names:
+                    if name not in source or (keep_existing and name in self.fields):
+                        continue
+                    self.fields[name] = source[name] if old_page is None else replace(source[name], page=page)
+                    self._record(method, page, name)
+        
+        try:
+            splice("widgets", self._extract_pages(self._extract_with_pymupdf, changed))
+        except Exception as e:
+            print(f"PyMuPDF failed: {e}")
+        
+        if changed or len(matches) != len(previous["page_hashes"]):
+            try:
+                self._extract_with_pypdf2()
+            except Exception as e:
+                print(f"PyPDF2 failed: {e}")
+        else:
+            for name in previous.get("document", []):
+                if name in old_fields and name not in self.fields:
+                    self.fields[name] = old_fields[name]
+                    self._record("pypdf2", 0, name)
+        
+        if not self.fields:
+            cached = {page: previous["pages"][str(old_page)]["detections"] for page, old_page in matches.items()
+                      if old_page is not None and "detections" in previous["pages"].get(str(old_page), {})}
+            try:
+                self._extract_from_vector_geometry(cached)
+            except Exception as e:
+                print(f"Vector geometry failed: {e}")
+        
+        try:
+            splice("text", self._extract_pages(self._extract_from_text_analysis, changed), keep_existing=True)
+        except Exception as e:
+            print(f"Text analysis failed: {e}")
+        print(f"After incremental extraction: Total {len(self.fields)} fields")
+        
+        self._post_process()
+        return self.fields
+    
+    def _extract_pages(self, extract, pages: List[int]) -> Tuple[Dict[str, FormField], Dict[int, Dict[str, List[str]]]]:
+        """Run one extraction method on some pages (0-based) and return what it found, without keeping it"""
+        fields, page_fields = self.fields, self.page_fields
+        self.fields, self.page_fields = dict(fields), {}
+        try:
+            if pages:
+                extract(pages=pages)
+            return self.fields, self.page_fields
+        finally:
+            self.fields, self.page_fields = fields, page_fields
+    
+    def _record(self, method: str, page: int, field_name: str):
+        self.page_fields.setdefault(page, {}).setdefault(method, []).append(field_name)
+    
+    def _post_process(self):
         self._detect_sections()
         self._map_x12_fields()
         self._detect_conditional_logic()
         self._detect_validation_rules()
-        
-        return self.fields
     
-    def _extract_with_pymupdf(self):
+    def _extract_with_pymupdf(self, pages: Optional[List[int]] = None):
         """Extract using PyMuPDF"""
         try:
             import fitz
             doc = fitz.open(self.pdf_path)
             
-            for page_num in range(len(doc)):
+            for page_num in (range(len(doc)) if pages is None else pages):
                 page = doc[page_num]
                 widgets = page.widgets()
                 
@@ -137,6 +262,7 @@ class AdvancedPDFExtractor:
                         ]
                     
                     self.fields[field_name] = field
+                    self._record("widgets", page_num + 1, field_name)
             
             doc.close()
         except ImportError:
@@ -197,6 +323,7 @@ class AdvancedPDFExtractor:
                             })
                 
                 self.fields[full_name] = field
+                self._record("pypdf2", 0, full_name)
             
             # Process children
             if "/Kids" in field_obj:
@@ -207,32 +334,65 @@ class AdvancedPDFExtractor:
         except Exception as e:
             print(f"Error processing field: {e}")
     
-    def _extract_from_text_analysis(self):
+    def _extract_from_vector_geometry(self, cached: Optional[Dict[int, List[Dict[str, str]]]] = None):
+        """Infer input boxes, checkboxes and underline fields from page drawings
+
+        cached: page → detections from a previous run, used instead of detecting again
+        (names are still assigned in document order, so suffixes match a full run)
+        """
+        try:
+            import fitz
+            from vector_field_detector import detect_page_fields
+        except ImportError:
+            print("PyMuPDF/NumPy not available for vector geometry, skipping...")
+            return
+        
+        field_types = {"text": "text", "underline": "text", "checkbox": "button", "radio": "button"}
+        
+        with fitz.open(self.pdf_path) as doc:
+            for page_num in range(len(doc)):
+                detections = (cached or {}).get(page_num + 1)
+                if detections is None:
+                    detections = [{key: detected[key] for key in ("kind", "label", "value")}
+                                  for detected in detect_page_fields(doc[page_num])]
+                self.page_detections[page_num + 1] = detections
+                for detected in detections:
+                    base_name = self._normalize_field_name(detected["label"]) or f"field_{len(self.fields)}"
+                    field_name = base_name
+                    suffix = 2
+                    while field_name in self.fields:
+                        field_name = f"{base_name}_{suffix}"
+                        suffix += 1
+                    
+                    self.fields[field_name] = FormField(
+                        name=field_name,
+                        field_type=field_types[detected["kind"]],
+                        label=detected["label"],
+                        value=detected["value"],
+                        page=page_num + 1
+                    )
+                    self._record("geometry", page_num + 1, field_name)
+    
+    def _extract_from_text_analysis(self, page_time_budget: float = 0.5, pages: Optional[List[int]] = None):
         """Extract potential fields from text analysis"""
         try:
             import fitz
             doc = fitz.open(self.pdf_path)
             
-            for page_num in range(len(doc)):
+            for page_num in (range(len(doc)) if pages is None else pages):
                 page = doc[page_num]
-                text = page.get_text()
+                started = time.perf_counter()
                 
-                # Look for common form patterns
-                patterns = [
-                    r'(\w+(?:\s+\w+)*)\s*[:\-_]\s*_+',  # Label: ____
-                    r'(\w+(?:\s+\w+)*)\s*\[\s*\]',      # Label [ ]
-                    r'(\w+(?:\s+\w+)*)\s*\(\s*\)',      # Label ( )
-                    r'□\s*(\w+(?:\s+\w+)*)',            # □ Label
-                    r'☐\s*(\w+(?:\s+\w+)*)',            # ☐ Label
-                ]
+                # Group word tokens into lines: (x0, y0, x1, y1, word, block, line, word_no)
+                lines: Dict[Tuple[int, int], List[str]] = {}
+                for word in page.get_text("words"):
+                    lines.setdefault((word[5], word[6]), []).append(word[4])
                 
-                for pattern in patterns:
-                    matches = re.finditer(pattern, text, re.IGNORECASE)
-                    for match in matches:
-                        label = match.group(1).strip()
+                for tokens in lines.values():
+                    for label in self._scan_line_for_labels(tokens):
                         field_name = self._normalize_field_name(label)
                         
-                        if field_name not in self.fields:
+                        if field_name and field_name not in self.fields:
                             field = FormField(
                                 name=field_name,
                                 field_type="text",  # Default assumption
@@ -240,11 +400,81 @@ class AdvancedPDFExtractor:
                                 page=page_num + 1
                             )
                             self.fields[field_name] = field
+                            self._record("text", page_num + 1, field_name)
+                    
+                    if time.perf_counter() - started > page_time_budget:
+                        print(f"Text analysis budget exceeded on page {page_num + 1}, skipping rest of page")
+                        break
             
             doc.close()
         except ImportError:
             print("PyMuPDF not available for text analysis, skipping...")
     
+    def _scan_line_for_labels(self, tokens: List[str]) -> List[str]:
+        """Find form labels in one line of word tokens with a single left-to-right pass
+        
+        Recognizes `Label: ____`, `Label [ ]`, `Label ( )` and `□ Label` / `☐ Label`.
+        """
+        labels = []
+        words: List[str] = []         # label being built
+        marker_words: List[str] = []  # label following a □/☐ marker
+        in_marker = False
+        after_separator = False
+        opener = ""
+        
+        def emit(parts: List[str]):
+            if parts:
+                labels.append(" ".join(parts))
+                parts.clear()
+        
+        for token in tokens:
+            for part in LABEL_TOKEN_PATTERN.findall(token):
+                if opener:
+                    closed = part == CLOSERS[opener]
+                    opener = ""
+                    if closed:
+                        emit(words)
+                        continue
+                    words.clear()
+                
+                is_word = part[0].isalnum() or part[0] == "_"
+                word = part.rstrip("_")
+                
+                if is_word and word:
+                    if in_marker:
+                        marker_words.append(word)
+                        continue
+                    if after_separator:
+                        words.clear()
+                        after_separator = False
+                    words.append(word)
+                    # "Name____" carries its own blank
+                    if len(part) - len(word) >= 2:
+                        emit(words)
+                elif is_word:
+                    # A run of underscores: the blank to fill in
+                    emit(words)
+                    after_separator = False
+                elif part in CHECKBOX_MARKERS:
+                    emit(marker_words)
+                    words.clear()
+                    in_marker = True
+                elif part in ("[]", "()"):
+                    emit(words)
+                elif part in CLOSERS:
+                    opener = part
+                elif part in (":", "-") and words and not in_marker:
+                    after_separator = True
+                else:
+                    # Any other punctuation ends the label being built
+                    words.clear()
+                    after_separator = False
+                    emit(marker_words)
+                    in_marker = False
+        
+        emit(marker_words)
+        return labels
+    
     def _normalize_field_name(self, label: str) -> str:
         """Convert label to valid field name"""
         # Remove special characters and convert to snake_case
@@ -309,13 +539,23 @@ class AdvancedPDFExtractor:
         else:
             return "other"
     
+    def _get_compiled_x12_patterns(self) -> List[Tuple[Any, str]]:
+        """Compile the X12 patterns once per process"""
+        if AdvancedPDFExtractor._compiled_x12_patterns is None:
+            AdvancedPDFExtractor._compiled_x12_patterns = [
+                (re.compile(pattern), x12_template)
+                for pattern, x12_template in self.x12_patterns.items()
+            ]
+        return AdvancedPDFExtractor._compiled_x12_patterns
+    
     def _map_x12_fields(self):
         """Map fields to X12 segments"""
+        patterns = self._get_compiled_x12_patterns()
         for field_name, field in self.fields.items():
             text = f"{field_name} {field.label}".lower()
             
-            for pattern, x12_template in self.x12_patterns.items():
-                if re.search(pattern, text):
+            for pattern, x12_template in patterns:
+                if pattern.search(text):
                     field.x12_mapping = x12_template
                     break
     
@@ -398,66 +638,92 @@ class AdvancedPDFExtractor:
         else:
             return "text"
     
-    def save_results(self, output_dir: str = "extracted_fields"):
-        """Save extraction results in multiple formats"""
+    def save_results(self, output_dir: str = "extracted_fields", html: bool = False,
+                     page_size: int = DEFAULT_PAGE_SIZE):
+        """Save extraction results in multiple formats (each file replaced atomically)"""
         output_path = Path(output_dir)
         output_path.mkdir(exist_ok=True)
         
         # Save raw field data
         fields_data = {name: asdict(field) for name, field in self.fields.items()}
-        with open(output_path / "fields_raw.json", 'w') as f:
+        with atomic_write(output_path / FIELDS_OUTPUT) as f:
             json.dump(fields_data, f, indent=2)
         
+        # Page state the fields were built from; a full extraction (no hashes) invalidates it
+        update_manifest(output_path, FIELDS_OUTPUT, self._page_manifest_entry() if self.page_hashes else None)
+        
         # Save questionnaire structure
         questionnaire = self.generate_questionnaire_structure()
-        with open(output_path / "questionnaire_structure.json", 'w') as f:
+        with atomic_write(output_path / "questionnaire_structure.json") as f:
             json.dump(questionnaire, f, indent=2)
         
-        # Save markdown report
-        report = self._generate_markdown_report()
-        with open(output_path / "fields_analysis.md", 'w') as f:
-            f.write(report)
+        # Stream the markdown report (and optionally paginated HTML) field by field
+        write_markdown_report(output_path / "fields_analysis.md", self._report_header(), self._report_sections())
+        if html:
+            write_html_report(output_path / "fields_analysis_html", f"PDF Form Analysis: {self.pdf_path.name}",
+                              self._report_header(), self._report_sections(), page_size)
         
         print(f"Results saved to {output_path}/")
         return output_path
     
-    def _generate_markdown_report(self) -> str:
-        """Generate comprehensive markdown report"""
-        report = [
+    def _page_manifest_entry(self) -> Dict[str, Any]:
+        pages = {}
+        for page in range(1, len(self.page_hashes) + 1):
+            pages[str(page)] = dict(self.page_fields.get(page, {}))
+            if page in self.page_detections:
+                pages[str(page)]["detections"] = self.page_detections[page]
+        return {
+            "pdf": str(self.pdf_path),
+            "page_hashes": self.page_hashes,
+            "document": self.page_fields.get(0, {}).get("pypdf2", []),
+            "pages": pages,
+        }
+    
+    def _report_header(self) -> List[str]:
+        return [
             f"# PDF Form Analysis: {self.pdf_path.name}",
-            f"\n**Total Fields:** {len(self.fields)}",
+            "",
+            f"**Total Fields:** {len(self.fields)}",
             f"**Sections:** {len(self.sections)}",
-            "\n## Sections Overview"
         ]
+    
+    def _report_sections(self) -> List[ReportSection]:
+        """Report sections; entries are generated while the report is written"""
+        def overview() -> Iterator[List[str]]:
+            for section, fields in self.sections.items():
+                entry = ["", f"### {section.replace('_', ' ').title()} ({len(fields)} fields)"]
+                for field_name in fields:
+                    field = self.fields[field_name]
+                    entry.append(f"- **{field_name}**: {field.field_type}")
+                    if field.x12_mapping:
+                        entry.append(f"  - X12: `{field.x12_mapping}`")
+                yield entry
         
-        for section, fields in self.sections.items():
-            report.append(f"\n### {section.replace('_', ' ').title()} ({len(fields)} fields)")
-            for field_name in fields:
+        def details() -> Iterator[List[str]]:
+            for field_name in sorted(self.fields):
                 field = self.fields[field_name]
-                report.append(f"- **{field_name}**: {field.field_type}")
+                entry = [
+                    "",
+                    f"### {field_name}",
+                    f"- **Type:** {field.field_type}",
+                    f"- **Section:** {field.section}",
+                    f"- **Required:** {'Yes' if field.required else 'No'}",
+                ]
+                if field.label:
+                    entry.append(f"- **Label:** {field.label}")
                 if field.x12_mapping:
-                    report.append(f"  - X12: `{field.x12_mapping}`")
-        
-        report.append("\n## Detailed Field Information")
-        for field_name, field in sorted(self.fields.items()):
-            report.append(f"\n### {field_name}")
-            report.append(f"- **Type:** {field.field_type}")
-            report.append(f"- **Section:** {field.section}")
-            report.append(f"- **Required:** {'Yes' if field.required else 'No'}")
-            
-            if field.label:
-                report.append(f"- **Label:** {field.label}")
-            if field.x12_mapping:
-                report.append(f"- **X12 Mapping:** `{field.x12_mapping}`")
-            if field.options:
-                report.append("- **Options:**")
-                for opt in field.options:
-                    report.append(f"  - {opt['value']}: {opt['label']}")
-            if field.validation_rules:
-                report.append(f"- **Validation:** {', '.join(field.validation_rules)}")
-        
-        return "\n".join(report)
-
+                    entry.append(f"- **X12 Mapping:** `{field.x12_mapping}`")
+                if field.options:
+                    entry.append("- **Options:**")
+                    entry.extend(f"  - {opt['value']}: {opt['label']}" for opt in field.options)
+                if field.validation_rules:
+                    entry.append(f"- **Validation:** {', '.join(field.validation_rules)}")
+                yield entry
+        
+        return [
+            ReportSection("Sections Overview", ["", "## Sections Overview"], overview()),
+            ReportSection("Detailed Field Information", ["", "## Detailed Field Information"], details()),
+        ]
 
 def main():
     parser = argparse.ArgumentParser(description="Advanced PDF form field extraction")
@@ -466,23 +732,41 @@ def main():
                        help="Output directory")
     parser.add_argument("--generate-questionnaire", action="store_true",
                        help="Generate questionnaire structure")
+    parser.add_argument("--html", action="store_true",
+                       help="Also write a paginated HTML report (fields_analysis_html/)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                       help="Fields per HTML report page")
+    parser.add_argument("--incremental", action="store_true",
+                       help="Re-extract only pages changed since the last --incremental run")
     
     args = parser.parse_args()
     
+    if args.page_size < 1:
+        print("Error: --page-size must be at least 1")
+        sys.exit(1)
+    
     if not Path(args.pdf_file).exists():
         print(f"Error: PDF file not found: {args.pdf_file}")
         sys.exit(1)
     
     # Extract fields
     extractor = AdvancedPDFExtractor(args.pdf_file)
-    fields = extractor.extract_fields_comprehensive()
+    if args.incremental:
+        fields = extractor.extract_fields_incremental(args.output_dir)
+    else:
+        fields = extractor.extract_fields_comprehensive()
     
     if not fields:
         print("No form fields found in the PDF")
         sys.exit(1)
     
     # Save results
-    output_path = extractor.save_results(args.output_dir)
+    output_path = extractor.save_results(args.output_dir, html=args.html, page_size=args.page_size)
+    
+    if args.incremental and (output_path / "form_controls_analysis.json").exists():
+        from analyze_form_controls import update_form_controls_analysis
+        analysis = update_form_controls_analysis(args.pdf_file, output_path)
+        print(f"Form controls analysis updated: {analysis['total_fields']} fields")
     
     if args.generate_questionnaire:
         questionnaire = extractor.generate_questionnaire_structure()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Form Version Alignment
+
+This script matches the fields of a revised implementation PDF to the fields
+of the previous version, so hand-written field mappings (fix_field_names.py,
+create_proper_contact_structure.py) carry forward to the new form:
+- Fingerprint per field: name tokens, label word shingles, control type and
+  coarse page position
+- MinHash signatures + LSH banding to find candidate pairs without comparing
+  every old field to every new field
+- Geometric tiebreak on page and page-normalized position
+- One-to-one greedy assignment; unmatched fields are reported as new/removed
+
+The alignment is saved to extracted_fields/field_alignment.json and picked up
+by the mapping scripts automatically.
+
+Usage:
+    python align_form_versions.py <old.pdf|old_analysis.json> <new.pdf|new_analysis.json> [--output extracted_fields/field_alignment.json]
+"""
+
+import re
+import sys
+import json
+import zlib
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Any, Set, Tuple
+
+import numpy as np
+
+from build_label_index import normalize_widget_name, tokenize
+
+DEFAULT_ALIGNMENT = "extracted_fields/field_alignment.json"
+
+# US Letter, used when page sizes are unknown (analysis JSON input)
+DEFAULT_PAGE_SIZE = (612.0, 792.0)
+
+NUM_PERM = 64
+BANDS = 32
+GRID = 20  # coarse position cells per page side
+MIN_SIMILARITY = 0.3
+GEOMETRY_WEIGHT = 0.5
+PAGE_PENALTY = 0.2
+
+# Largest prime below 2**32: a * x + b stays inside uint64 and mod p mixes fully
+_PRIME = 4294967291
+
+
+def _load_analysis(source: str) -> Tuple[Dict[str, Any], Dict[str, str], Dict[int, Tuple[float, float]]]:
+    """Return (field_details, labels, page_sizes) from a PDF or a saved form controls analysis"""
+    if source.lower().endswith(".json"):
+        with open(source, 'r') as f:
+            analysis = json.load(f)
+        return analysis["field_details"], {}, {}
+
+    from analyze_form_controls import analyze_pdf_form_controls
+    analysis = analyze_pdf_form_controls(source, write_report=False)
+    if analysis is None:
+        raise RuntimeError(f"Form control analysis failed: {source}")
+    labels, page_sizes = _widget_labels(source, analysis["field_details"])
+    return analysis["field_details"], labels, page_sizes
+
+
+def _widget_labels(pdf_path: str, field_details: Dict[str, Any]) -> Tuple[Dict[str, str], Dict[int, Tuple[float, float]]]:
+    """Words left of each widget on its row, plus the line just above it"""
+    import fitz  # PyMuPDF
+
+    labels, page_sizes = {}, {}
+    by_page = defaultdict(list)
+    for name, details in field_details.items():
+        if details.get("rect"):
+            by_page[details["page"]].append(name)
+
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(len(doc)):
+            page = doc[page_num]
+            page_sizes[page_num + 1] = (page.rect.width, page.rect.height)
+            words = page.get_text("words")
+            if not words or not by_page.get(page_num + 1):
+                continue
+            boxes = np.array([w[:4] for w in words], dtype=np.float32)
+            cy = (boxes[:, 1] + boxes[:, 3]) / 2
+            for name in by_page[page_num + 1]:
+                x0, y0, x1, y1 = field_details[name]["rect"]
+                beside = (cy > y0) & (cy < y1) & (boxes[:, 2] <= x0 + 2) & (boxes[:, 2] >= x0 - 200)
+                above = (boxes[:, 3] <= y0 + 1) & (boxes[:, 3] >= y0 - 14) & (boxes[:, 0] < x1) & (boxes[:, 2] > x0 - 50)
+                ids = np.flatnonzero(beside | above)
+                ids = ids[np.lexsort((boxes[ids, 0], boxes[ids, 1]))]
+                labels[name] = " ".join(words[i][4] for i in ids)
+    return labels, page_sizes
+
+
+def field_features(name: str, control_type: str, label: str = "", cell: str = "") -> Set[str]:
+    """Token set describing a field; `cell` is its coarse page position"""
+    features = {f"type:{control_type}", f"id:{name.lower()}"}
+    if cell:
+        features.add(f"cell:{cell}")
+    features.update(f"name:{token}" for token in normalize_widget_name(name).split())
+    # Instance numbers (Name1 vs Name2) matter when names are otherwise equal
+    instance = re.search(r'(\d+)$', name)
+    if instance:
+        features.add(f"instance:{instance.group(1)}")
+    label_tokens = tokenize(label)
+    features.update(f"label:{a} {b}" for a, b in zip(label_tokens, label_tokens[1:]))
+    features.update(f"label:{token}" for token in label_tokens if len(label_tokens) == 1)
+    return features
+
+
+class MinHasher:
+    """MinHash signatures over string feature sets"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, features: Set[str]) -> np.ndarray:
+        hashes = np.array([zlib.crc32(feature.encode()) for feature in features] or [0], dtype=np.uint64)
+        # (a * x + b) mod p for every permutation and feature at once
+        permuted = (hashes[:, None] * self.a[None, :] + self.b[None, :]) % _PRIME
+        return permuted.min(axis=0)
+
+    def signatures(self, feature_sets: List[Set[str]]) -> np.ndarray:
+        if not feature_sets:
+            return np.zeros((0, self.num_perm), dtype=np.uint64)
+        return np.vstack([self.signature(features) for features in feature_sets])
+
+
+def _lsh_candidates(old_signatures: np.ndarray, new_signatures: np.ndarray, bands: int) -> Set[Tuple[int, int]]:
+    """Pairs (old, new) that share at least one identical signature band"""
+    rows = old_signatures.shape[1] // bands
+    candidates = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        columns = slice(band * rows, (band + 1) * rows)
+        for old_id, band_hash in enumerate(old_signatures[:, columns]):
+            buckets[band_hash.tobytes()].append(old_id)
+        for new_id, band_hash in enumerate(new_signatures[:, columns]):
+            for old_id in buckets.get(band_hash.tobytes(), ()):
+                candidates.add((old_id, new_id))
+    return candidates
+
+
+def _normalized_centers(field_details: Dict[str, Any], names: List[str],
+                        page_sizes: Dict[int, Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    pages = np.array([field_details[name].get("page", 1) for name in names], dtype=np.int32)
+    centers = np.zeros((len(names), 2), dtype=np.float32)
+    for i, name in enumerate(names):
+        rect = field_details[name].get("rect") or [0, 0, 0, 0]
+        width, height = page_sizes.get(int(pages[i]), DEFAULT_PAGE_SIZE)
+        centers[i] = ((rect[0] + rect[2]) / 2 / width, (rect[1] + rect[3]) / 2 / height)
+    return pages, centers
+
+
+def align_fields(old_source: str, new_source: str, min_similarity: float = MIN_SIMILARITY,
+                 bands: int = BANDS) -> Dict[str, Any]:
+    """Match fields of two form versions; returns renames plus matched/new/removed fields"""
+    old_details, old_labels, old_sizes = _load_analysis(old_source)
+    new_details, new_labels, new_sizes = _load_analysis(new_source)
+    old_names, new_names = list(old_details), list(new_details)
+
+    old_pages, old_centers = _normalized_centers(old_details, old_names, old_sizes)
+    new_pages, new_centers = _normalized_centers(new_details, new_names, new_sizes)
+
+    def feature_sets(details, labels, names, pages, centers):
+        cells = np.floor(centers * GRID).astype(np.int32)
+        return [
+            field_features(name, details[name].get("control_type", ""), labels.get(name, ""),
+                           f"{pages[i]}:{cells[i, 0]}:{cells[i, 1]}")
+            for i, name in enumerate(names)
+        ]
+
+    hasher = MinHasher()
+    old_signatures = hasher.signatures(feature_sets(old_details, old_labels, old_names, old_pages, old_centers))
+    new_signatures = hasher.signatures(feature_sets(new_details, new_labels, new_names, new_pages, new_centers))
+
+    scored = []
+    for old_id, new_id in _lsh_candidates(old_signatures, new_signatures, bands):
+        similarity = float(np.mean(old_signatures[old_id] == new_signatures[new_id]))
+        if similarity < min_similarity:
+            continue
+        distance = float(np.linalg.norm(old_centers[old_id] - new_centers[new_id]))
+        score = similarity - GEOMETRY_WEIGHT * distance
+        if old_pages[old_id] != new_pages[new_id]:
+            score -= PAGE_PENALTY
+        scored.append((score, similarity, distance, old_id, new_id))
+
+    # Best pairs first; each field is used at most once
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    matched, used_old, used_new = [], set(), set()
+    for score, similarity, distance, old_id, new_id in scored:
+        if old_id in used_old or new_id in used_new:
+            continue
+        used_old.add(old_id)
+        used_new.add(new_id)
+        matched.append({
+            "old": old_names[old_id],
+            "new": new_names[new_id],
+            "score": round(score, 4),
+            "similarity": round(similarity, 4),
+            "distance": round(distance, 4),
+        })
+
+    matched.sort(key=lambda match: (new_details[match["new"]].get("page", 1), match["new"]))
+    return {
+        "old_source": str(old_source),
+        "new_source": str(new_source),
+        "renames": {match["old"]: match["new"] for match in matched if match["old"] != match["new"]},
+        "matched": matched,
+        "new_fields": [name for i, name in enumerate(new_names) if i not in used_new],
+        "removed_fields": [name for i, name in enumerate(old_names) if i not in used_old],
+    }
+
+
+def load_field_alignment(alignment_path: str = DEFAULT_ALIGNMENT) -> Dict[str, str]:
+    """Old field name → new field name renames from the last alignment, if any"""
+    if not Path(alignment_path).exists():
+        return {}
+    with open(alignment_path, 'r') as f:
+        return json.load(f).get("renames", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Align form fields across two PDF versions")
+    parser.add_argument("old", help="Previous PDF or its form_controls_analysis.json")
+    parser.add_argument("new", help="Revised PDF or its form_controls_analysis.json")
+    parser.add_argument("--output", "-o", default=DEFAULT_ALIGNMENT, help="Alignment output path")
+    parser.add_argument("--min-similarity", type=float, default=MIN_SIMILARITY,
+                        help="Minimum estimated Jaccard similarity for a match")
+
+    args = parser.parse_args()
+
+    for source in (args.old, args.new):
+        if not Path(source).exists():
+            print(f"❌ File not found: {source}")
+            sys.exit(1)
+
+    print(f"🔗 Aligning {args.old} → {args.new}")
+    alignment = align_fields(args.old, args.new, args.min_similarity)
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(alignment, f, indent=2)
+
+    print(f"✅ Matched {len(alignment['matched'])} fields "
+          f"({len(alignment['renames'])} renamed)")
+    print(f"🆕 New fields needing review: {len(alignment['new_fields'])}")
+    for name in alignment["new_fields"]:
+        print(f"   + {name}")
+    print(f"🗑️  Removed fields: {len(alignment['removed_fields'])}")
+    for name in alignment["removed_fields"]:
+        print(f"   - {name}")
+    print(f"💾 Saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
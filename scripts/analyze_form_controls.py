@@ -7,9 +7,12 @@ This script provides detailed analysis of PDF form controls including:
 - All possible values and options
 - Field groupings and relationships
 - Visual properties and layout
+- Incremental updates of an existing form_controls_analysis.json: only pages
+  whose content hash changed (see page_manifest.py) are analyzed again
+- Streamed markdown report, plus a paginated HTML report with --html
 
 Usage:
-    python analyze_form_controls.py <pdf_file>
+    python analyze_form_controls.py <pdf_file> [--html]
 """
 
 import sys
@@ -17,7 +20,13 @@ import json
 from pathlib import Path
 import fitz  # PyMuPDF
 
-def analyze_pdf_form_controls(pdf_path):
+from page_manifest import load_manifest, match_pages, page_content_hash, update_manifest
+from report_writer import DEFAULT_PAGE_SIZE, ReportSection, write_html_report, write_markdown_report
+from run_journal import atomic_write
+
+CONTROLS_OUTPUT = "form_controls_analysis.json"
+
+def analyze_pdf_form_controls(pdf_path, write_report=True, html=False):
     """Analyze PDF form controls in detail"""
     
     print(f"🔍 Analyzing form controls in: {pdf_path}")
@@ -33,27 +42,7 @@ def analyze_pdf_form_controls(pdf_path):
         }
         
         for page_num in range(len(doc)):
-            page = doc[page_num]
-            widgets = page.widgets()
-            
-            page_fields = []
-            
-            for widget in widgets:
-                field_name = widget.field_name or f"unnamed_field_{len(analysis['field_details'])}"
-                
-                # Detailed widget analysis
-                widget_info = analyze_widget_detailed(widget, page_num + 1)
-                
-                analysis['field_details'][field_name] = widget_info
-                page_fields.append(field_name)
-                
-                # Count field types
-                field_type = widget_info['control_type']
-                analysis['field_types'][field_type] = analysis['field_types'].get(field_type, 0) + 1
-                
-                analysis['total_fields'] += 1
-            
-            analysis['fields_by_page'][f"page_{page_num + 1}"] = page_fields
+            analyze_page_controls(doc[page_num], page_num + 1, analysis)
         
         doc.close()
         
@@ -61,7 +50,8 @@ def analyze_pdf_form_controls(pdf_path):
         analysis['radio_groups'] = analyze_radio_button_groups(analysis['field_details'])
 
         # Generate summary report
-        generate_control_analysis_report(analysis, pdf_path)
+        if write_report:
+            generate_control_analysis_report(analysis, pdf_path, html=html)
 
         return analysis
         
@@ -69,6 +59,86 @@ def analyze_pdf_form_controls(pdf_path):
         print(f"❌ Error analyzing PDF: {e}")
         return None
 
+def analyze_page_controls(page, page_num, analysis):
+    """Analyze every widget on one page into `analysis`; returns the page's control type counts"""
+    page_fields = []
+    page_types = {}
+    
+    for widget in page.widgets():
+        field_name = widget.field_name or f"unnamed_field_{len(analysis['field_details'])}"
+        
+        # Detailed widget analysis
+        widget_info = analyze_widget_detailed(widget, page_num)
+        
+        analysis['field_details'][field_name] = widget_info
+        page_fields.append(field_name)
+        
+        # Count field types
+        field_type = widget_info['control_type']
+        page_types[field_type] = page_types.get(field_type, 0) + 1
+    
+    for field_type, count in page_types.items():
+        analysis['field_types'][field_type] = analysis['field_types'].get(field_type, 0) + count
+    analysis['total_fields'] += len(page_fields)
+    analysis['fields_by_page'][f"page_{page_num}"] = page_fields
+    return page_types
+
+def update_form_controls_analysis(pdf_path, output_dir):
+    """Splice re-analyzed changed pages into output_dir/form_controls_analysis.json
+    
+    Unchanged and moved pages keep their previous analysis; without a previous
+    analysis and page manifest entry every page is analyzed. Saves and returns the analysis.
+    """
+    output_path = Path(output_dir) / CONTROLS_OUTPUT
+    previous = load_manifest(output_dir).get(CONTROLS_OUTPUT)
+    old = None
+    if previous and output_path.exists():
+        with open(output_path, 'r') as f:
+            old = json.load(f)
+    
+    with fitz.open(pdf_path) as doc:
+        hashes = [page_content_hash(page) for page in doc]
+        if old:
+            matches = match_pages(previous["page_hashes"], hashes)
+        else:
+            matches = dict.fromkeys(range(1, len(doc) + 1))
+        print(f"🔍 Updating form controls analysis: {sum(m is None for m in matches.values())} "
+              f"of {len(doc)} pages changed")
+        
+        analysis = {
+            "total_pages": len(doc),
+            "total_fields": 0,
+            "field_types": {},
+            "fields_by_page": {},
+            "field_details": {}
+        }
+        page_types = {}
+        for page_num, old_page in matches.items():
+            if old_page is None:
+                page_types[page_num] = analyze_page_controls(doc[page_num - 1], page_num, analysis)
+                continue
+            
+            page_fields = old['fields_by_page'].get(f"page_{old_page}", [])
+            for field_name in page_fields:
+                if field_name in old['field_details']:
+                    analysis['field_details'][field_name] = dict(old['field_details'][field_name], page=page_num)
+            page_types[page_num] = previous["page_types"].get(str(old_page), {})
+            for field_type, count in page_types[page_num].items():
+                analysis['field_types'][field_type] = analysis['field_types'].get(field_type, 0) + count
+            analysis['total_fields'] += len(page_fields)
+            analysis['fields_by_page'][f"page_{page_num}"] = list(page_fields)
+    
+    analysis['radio_groups'] = analyze_radio_button_groups(analysis['field_details'])
+    
+    with atomic_write(output_path) as f:
+        json.dump(analysis, f, indent=2)
+    update_manifest(output_dir, CONTROLS_OUTPUT, {
+        "pdf": str(pdf_path),
+        "page_hashes": hashes,
+        "page_types": {str(page): types for page, types in page_types.items()},
+    })
+    return analysis
+
 def analyze_widget_detailed(widget, page_num):
     """Perform detailed analysis of a single widget"""
     
@@ -355,53 +425,71 @@ def get_visual_properties(widget):
     except:
         return {}
 
-def generate_control_analysis_report(analysis, pdf_path):
+def control_report_sections(analysis):
+    """Form controls report sections; field entries are generated while the report is written"""
+    
+    def distribution():
+        yield [f"- **{field_type}**: {count} fields" for field_type, count in sorted(analysis['field_types'].items())]
+    
+    def details():
+        for field_name, details in analysis['field_details'].items():
+            entry = [
+                f"### {field_name}",
+                f"- **Page:** {details['page']}",
+                f"- **Control Type:** {details['control_type']} ({details['control_subtype']})",
+                f"- **Current Value:** `{details['current_value']}`",
+                f"- **Required:** {details['flags_analysis']['is_required']}",
+                f"- **ReadOnly:** {details['flags_analysis']['is_readonly']}",
+            ]
+            if details['options']:
+                entry.append(f"- **Options:** {len(details['options'])} available")
+                for opt in details['options']:
+                    selected = " ✓" if opt.get('selected', False) else ""
+                    entry.append(f"  - `{opt['value']}` ({opt['label']}){selected}")
+            entry.append("")
+            yield entry
+    
+    return [
+        ReportSection("Field Type Distribution", ["## Field Type Distribution", ""], distribution()),
+        ReportSection("Detailed Field Analysis", ["", "## Detailed Field Analysis", ""], details()),
+    ]
+
+def generate_control_analysis_report(analysis, pdf_path, html=False, page_size=DEFAULT_PAGE_SIZE):
     """Generate a comprehensive report of form controls"""
     
     output_dir = Path("extracted_fields")
     output_dir.mkdir(exist_ok=True)
     
     # Save detailed JSON
-    with open(output_dir / "form_controls_analysis.json", 'w') as f:
+    with atomic_write(output_dir / CONTROLS_OUTPUT) as f:
         json.dump(analysis, f, indent=2)
+    # Written from a full analysis, so any recorded page state no longer applies
+    update_manifest(output_dir, CONTROLS_OUTPUT, None)
     
-    # Generate markdown report
-    report_path = output_dir / "form_controls_report.md"
-    
-    with open(report_path, 'w') as f:
-        f.write(f"# Form Controls Analysis: {Path(pdf_path).name}\n\n")
-        f.write(f"**Total Fields:** {analysis['total_fields']}\n")
-        f.write(f"**Total Pages:** {analysis['total_pages']}\n\n")
-        
-        f.write("## Field Type Distribution\n\n")
-        for field_type, count in sorted(analysis['field_types'].items()):
-            f.write(f"- **{field_type}**: {count} fields\n")
-        
-        f.write("\n## Detailed Field Analysis\n\n")
-        
-        for field_name, details in analysis['field_details'].items():
-            f.write(f"### {field_name}\n")
-            f.write(f"- **Page:** {details['page']}\n")
-            f.write(f"- **Control Type:** {details['control_type']} ({details['control_subtype']})\n")
-            f.write(f"- **Current Value:** `{details['current_value']}`\n")
-            f.write(f"- **Required:** {details['flags_analysis']['is_required']}\n")
-            f.write(f"- **ReadOnly:** {details['flags_analysis']['is_readonly']}\n")
-            
-            if details['options']:
-                f.write(f"- **Options:** {len(details['options'])} available\n")
-                for opt in details['options']:
-                    selected = " ✓" if opt.get('selected', False) else ""
-                    f.write(f"  - `{opt['value']}` ({opt['label']}){selected}\n")
-            
-            f.write("\n")
+    # Stream the markdown report field by field
+    title = f"Form Controls Analysis: {Path(pdf_path).name}"
+    header = [
+        f"# {title}",
+        "",
+        f"**Total Fields:** {analysis['total_fields']}",
+        f"**Total Pages:** {analysis['total_pages']}",
+        "",
+    ]
+    write_markdown_report(output_dir / "form_controls_report.md", header, control_report_sections(analysis))
     
     print(f"📊 Analysis complete! Reports saved to:")
     print(f"   - {output_dir / 'form_controls_analysis.json'}")
     print(f"   - {output_dir / 'form_controls_report.md'}")
+    
+    if html:
+        index = write_html_report(output_dir / "form_controls_report_html", title, header,
+                                  control_report_sections(analysis), page_size)
+        print(f"   - {index}")
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python analyze_form_controls.py <pdf_file>")
+    html = "--html" in sys.argv[2:]
+    if len(sys.argv) not in (2, 3) or sys.argv[2:] not in ([], ["--html"]):
+        print("Usage: python analyze_form_controls.py <pdf_file> [--html]")
         sys.exit(1)
     
     pdf_file = sys.argv[1]
@@ -409,7 +497,7 @@ if __name__ == "__main__":
         print(f"❌ File not found: {pdf_file}")
         sys.exit(1)
     
-    analysis = analyze_pdf_form_controls(pdf_file)
+    analysis = analyze_pdf_form_controls(pdf_file, html=html)
     if analysis:
         print(f"✅ Found {analysis['total_fields']} form fields across {analysis['total_pages']} pages")
         
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Mock Payer Test Result Analytics
+
+This script analyzes exported mock payer test executions (PayerTestResult
+records from /api/mock-payer/270 and /execute-tests, one per JSONL line):
+- Results, validation checks and 271 EB segments are loaded into NumPy
+  columnar tables with interned strings (as in widget_table.py)
+- Each response271 is walked with a streaming segment splitter; separators
+  come from its ISA header
+- JSONL chunks are parsed in a process pool and merged by remapping string ids
+- Pass rates by rule, latency percentiles and pass rate by test type, and EB01/
+  EB02/EB03 benefit distributions, all as vectorized group-bys
+- --save/--load keep the tables as one .npz, so repeated reports over a
+  million results skip the JSON parsing
+
+Test types follow the testId markers used by validateCoreBusinessRules
+(ACTIVE/001, INACTIVE/002, NOT_FOUND/003, PHARMACY/004, INVALID_ID/005,
+FAMILY_COVERAGE/006).
+
+Usage:
+    python analyze_test_results.py <results.jsonl> [more ...] [--output test_results_report.json] [--save results.npz]
+    python analyze_test_results.py --load results.npz
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Tuple
+
+import numpy as np
+
+from validate_x12_batch import X12Tokenizer
+from widget_table import StringPool
+
+CHUNK_LINES = 20000
+PERCENTILES = (50, 90, 95, 99)
+
+# Most specific markers first: "INACTIVE" also contains "ACTIVE"
+TEST_TYPES = [
+    ("pharmacy", ("PHARMACY", "004")),
+    ("invalid_id", ("INVALID_ID", "005")),
+    ("family_coverage", ("FAMILY_COVERAGE", "006")),
+    ("inactive", ("INACTIVE", "002")),
+    ("not_found", ("NOT_FOUND", "003")),
+    ("active", ("ACTIVE", "001")),
+]
+TEST_TYPE_NAMES = [name for name, _ in TEST_TYPES] + ["other"]
+SEVERITIES = ["error", "warning", "info"]
+
+RESULT_DTYPE = np.dtype([
+    ("test_id", np.uint32),
+    ("passed", np.bool_),
+    ("response_time", np.float32),
+    ("eb_count", np.uint16),
+    ("aaa_count", np.uint16),
+])
+CHECK_DTYPE = np.dtype([
+    ("result", np.uint32),
+    ("rule", np.uint32),
+    ("passed", np.bool_),
+    ("severity", np.uint8),
+])
+EB_DTYPE = np.dtype([
+    ("result", np.uint32),
+    ("eb01", np.uint32),
+    ("eb02", np.uint32),
+    ("eb03", np.uint32),
+])
+
+
+def iter_segments(x12: str) -> Iterator[List[str]]:
+    """Elements of each segment of an interchange, one segment at a time"""
+    start = x12.find("ISA")
+    if start == -1:
+        return
+    separators = X12Tokenizer.detect_separators(x12[start:start + 128].encode('ascii', errors='replace'))
+    element = separators.element.decode()
+    terminator = separators.segment.decode()
+    position = start
+    size = len(x12)
+    while position < size:
+        end = x12.find(terminator, position)
+        if end == -1:
+            end = size
+        segment = x12[position:end].strip()
+        if segment:
+            yield segment.split(element)
+        position = end + 1
+
+
+def test_type_code(test_id: str) -> int:
+    for code, (_, markers) in enumerate(TEST_TYPES):
+        if any(marker in test_id for marker in markers):
+            return code
+    return len(TEST_TYPES)
+
+
+def iter_results(record: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """PayerTestResult records from a bare result, an API response or an /execute-tests summary"""
+    record = record.get("data", record) if isinstance(record, dict) else record
+    if isinstance(record, dict) and isinstance(record.get("results"), list):
+        yield from record["results"]
+    elif isinstance(record, dict) and "testId" in record:
+        yield record
+
+
+class ResultTables:
+    """Test results, validation checks and EB segments as parallel columns"""
+
+    def __init__(self, results: np.ndarray = None, checks: np.ndarray = None, ebs: np.ndarray = None,
+                 test_ids: StringPool = None, rules: StringPool = None, codes: StringPool = None):
+        self.results = results if results is not None else np.zeros(0, dtype=RESULT_DTYPE)
+        self.checks = checks if checks is not None else np.zeros(0, dtype=CHECK_DTYPE)
+        self.ebs = ebs if ebs is not None else np.zeros(0, dtype=EB_DTYPE)
+        self.test_ids = test_ids or StringPool()
+        self.rules = rules or StringPool()
+        self.codes = codes or StringPool([""])
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    @classmethod
+    def from_lines(cls, lines: List[str]) -> "ResultTables":
+        """Parse JSONL lines into tables with chunk-local string pools"""
+        tables = cls()
+        results, checks, ebs = [], [], []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            for result in iter_results(record):
+                index = len(results)
+                eb_count = aaa_count = 0
+                for elements in iter_segments(result.get("response271") or ""):
+                    if elements[0] == "EB":
+                        eb_count += 1
+                        ebs.append((index, *(tables.codes.intern(elements[i] if len(elements) > i else "")
+                                             for i in (1, 2, 3))))
+                    elif elements[0] == "AAA":
+                        aaa_count += 1
+                for check in result.get("validationResults") or []:
+                    severity = check.get("severity", "info")
+                    checks.append((index, tables.rules.intern(check.get("rule", "")), bool(check.get("passed")),
+                                   SEVERITIES.index(severity) if severity in SEVERITIES else 2))
+                results.append((tables.test_ids.intern(str(result.get("testId", ""))),
+                                result.get("status") == "passed", float(result.get("responseTime") or 0),
+                                min(eb_count, 65535), min(aaa_count, 65535)))
+        tables.results = np.array(results, dtype=RESULT_DTYPE)
+        tables.checks = np.array(checks, dtype=CHECK_DTYPE)
+        tables.ebs = np.array(ebs, dtype=EB_DTYPE)
+        return tables
+
+    def extend(self, other: "ResultTables"):
+        """Append another table set, remapping its string ids into ours"""
+        def remap(pool: StringPool, other_pool: StringPool) -> np.ndarray:
+            return np.array([pool.intern(s) for s in other_pool.strings], dtype=np.uint32)
+
+        offset = len(self.results)
+        results = other.results.copy()
+        checks = other.checks.copy()
+        ebs = other.ebs.copy()
+        if len(results):
+            results["test_id"] = remap(self.test_ids, other.test_ids)[results["test_id"]]
+        if len(checks):
+            checks["rule"] = remap(self.rules, other.rules)[checks["rule"]]
+            checks["result"] += offset
+        if len(ebs):
+            codes = remap(self.codes, other.codes)
+            for column in ("eb01", "eb02", "eb03"):
+                ebs[column] = codes[ebs[column]]
+            ebs["result"] += offset
+        self.results = np.concatenate([self.results, results])
+        self.checks = np.concatenate([self.checks, checks])
+        self.ebs = np.concatenate([self.ebs, ebs])
+
+    def test_types(self) -> np.ndarray:
+        """Test type code per result, classifying each distinct testId once"""
+        by_id = np.array([test_type_code(test_id) for test_id in self.test_ids.strings], dtype=np.uint8)
+        return by_id[self.results["test_id"]] if len(self.results) else np.zeros(0, dtype=np.uint8)
+
+    # Reports
+
+    def pass_rate_by_rule(self) -> List[Dict[str, Any]]:
+        rules = self.checks["rule"]
+        totals = np.bincount(rules, minlength=len(self.rules))
+        passed = np.bincount(rules, weights=self.checks["passed"], minlength=len(self.rules))
+        rows = [{"rule": self.rules[i], "checks": int(totals[i]), "passed": int(passed[i]),
+                 "pass_rate": round(float(passed[i] / totals[i]), 4)}
+                for i in np.flatnonzero(totals)]
+        return sorted(rows, key=lambda row: (row["pass_rate"], -row["checks"]))
+
+    def latency_by_test_type(self) -> List[Dict[str, Any]]:
+        types = self.test_types()
+        latency = self.results["response_time"]
+        order = np.lexsort((latency, types))
+        sorted_types = types[order]
+        sorted_latency = latency[order]
+        passed = np.bincount(types, weights=self.results["passed"], minlength=len(TEST_TYPE_NAMES))
+        boundaries = np.flatnonzero(np.diff(sorted_types)) + 1
+        rows = []
+        for group in np.split(np.arange(len(order)), boundaries):
+            if not len(group):
+                continue
+            code = int(sorted_types[group[0]])
+            values = sorted_latency[group]
+            row = {"test_type": TEST_TYPE_NAMES[code], "results": int(len(values)),
+                   "pass_rate": round(float(passed[code] / len(values)), 4)}
+            row.update({f"p{p}": round(float(v), 1) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+            row.update({"mean": round(float(values.mean()), 1), "max": round(float(values[-1]), 1)})
+            rows.append(row)
+        return rows
+
+    def eb_distribution(self, top: int = 20) -> Dict[str, Any]:
+        def counts(column: np.ndarray) -> Dict[str, int]:
+            values, totals = np.unique(column, return_counts=True)
+            ranked = np.argsort(-totals, kind="stable")[:top]
+            return {self.codes[int(values[i])] or "(empty)": int(totals[i]) for i in ranked}
+
+        combos = self.ebs["eb01"].astype(np.uint64) << np.uint64(32) | self.ebs["eb03"].astype(np.uint64)
+        values, totals = np.unique(combos, return_counts=True)
+        ranked = np.argsort(-totals, kind="stable")[:top]
+        with_eb = int((self.results["eb_count"] > 0).sum())
+        return {
+            "eb_segments": int(len(self.ebs)),
+            "results_with_eb": with_eb,
+            "results_with_aaa": int((self.results["aaa_count"] > 0).sum()),
+            "eb01_benefit_information": counts(self.ebs["eb01"]),
+            "eb02_coverage_level": counts(self.ebs["eb02"]),
+            "eb03_service_type": counts(self.ebs["eb03"]),
+            "eb01_by_eb03": {f"{self.codes[int(v >> np.uint64(32))]}/{self.codes[int(v & np.uint64(0xFFFFFFFF))]}":
+                             int(totals[i]) for i, v in ((i, values[i]) for i in ranked)},
+        }
+
+    def to_report(self) -> Dict[str, Any]:
+        total = len(self.results)
+        passed = int(self.results["passed"].sum())
+        return {
+            "results": total,
+            "passed": passed,
+            "pass_rate": round(passed / total, 4) if total else 0.0,
+            "validation_checks": int(len(self.checks)),
+            "pass_rate_by_rule": self.pass_rate_by_rule(),
+            "latency_ms_by_test_type": self.latency_by_test_type(),
+            "eb_distribution": self.eb_distribution(),
+        }
+
+    def save(self, path: str):
+        output_path = Path(path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            output_path,
+            results=self.results, checks=self.checks, ebs=self.ebs,
+            test_ids=np.array(self.test_ids.strings, dtype=object),
+            rules=np.array(self.rules.strings, dtype=object),
+            codes=np.array(self.codes.strings, dtype=object),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ResultTables":
+        with np.load(path, allow_pickle=True) as data:
+            return cls(data["results"], data["checks"], data["ebs"], StringPool(data["test_ids"].tolist()),
+                       StringPool(data["rules"].tolist()), StringPool(data["codes"].tolist()))
+
+
+def iter_line_chunks(paths: List[str], size: int = CHUNK_LINES) -> Iterator[List[str]]:
+    for path in paths:
+        with open(path, 'r') as f:
+            while True:
+                chunk = list(islice(f, size))
+                if not chunk:
+                    break
+                yield chunk
+
+
+def load_results(paths: List[str], workers: int) -> ResultTables:
+    tables = ResultTables()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_tables in pool.map(ResultTables.from_lines, iter_line_chunks(paths)):
+            tables.extend(chunk_tables)
+    return tables
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"📊 {report['results']} results, {report['pass_rate']:.1%} passed, "
+          f"{report['validation_checks']} validation checks")
+    print("\n📋 Lowest pass rates by rule:")
+    for row in report["pass_rate_by_rule"][:10]:
+        print(f"   {row['rule']}: {row['pass_rate']:.1%} of {row['checks']}")
+    print("\n⏱️  Latency (ms) by test type:")
+    for row in report["latency_ms_by_test_type"]:
+        print(f"   {row['test_type']}: n={row['results']} pass={row['pass_rate']:.1%} "
+              f"p50={row['p50']} p90={row['p90']} p99={row['p99']} max={row['max']}")
+    eb = report["eb_distribution"]
+    print(f"\n🩺 {eb['eb_segments']} EB segments in {eb['results_with_eb']} responses, "
+          f"{eb['results_with_aaa']} with AAA rejections")
+    for combo, count in list(eb["eb01_by_eb03"].items())[:10]:
+        print(f"   EB01/EB03 {combo}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze exported mock payer test results")
+    parser.add_argument("results", nargs="*", help="PayerTestResult JSONL files")
+    parser.add_argument("--load", help="Load tables saved with --save instead of parsing JSONL")
+    parser.add_argument("--save", help="Save the parsed tables (.npz) for later reports")
+    parser.add_argument("--output", "-o", default="test_results_report.json", help="Report JSON file")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 2, help="Parser processes")
+
+    args = parser.parse_args()
+
+    inputs = [args.load] if args.load else args.results
+    missing = [path for path in inputs if not Path(path).exists()]
+    if not inputs or missing:
+        print(f"❌ File not found: {', '.join(missing) or 'no input given'}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    tables = ResultTables.load(args.load) if args.load else load_results(args.results, args.workers)
+    loaded = time.perf_counter()
+    if not len(tables):
+        print("❌ No test results found")
+        sys.exit(1)
+    report = tables.to_report()
+    finished = time.perf_counter()
+
+    print_report(report)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.save:
+        tables.save(args.save)
+        print(f"💾 Tables saved to: {args.save}")
+    print(f"\n✅ Loaded {len(tables)} results in {loaded - started:.2f}s, report in {finished - loaded:.2f}s")
+    print(f"💾 Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
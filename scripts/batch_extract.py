@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Batch Extraction Runner with Per-Document Budgets
+
+This script runs the extraction pipeline over many PDFs, one output
+directory per document, so a single pathological PDF cannot stall the batch:
+- Each document runs in its own worker process (forked from a warm parent)
+- Wall-clock budget: enforced inside the worker (timer) and by the parent,
+  which kills workers that do not return within a grace period
+- Memory budget: the parent polls worker RSS and kills workers over the limit
+- Documents over budget are retried once with the degraded pipeline
+  (PyMuPDF widgets only: no PyPDF2, no geometry or text analysis, no
+  controls stage)
+- Every attempt is recorded in run_manifest.json
+- Stage completions are journaled (run_journal.jsonl) with the input PDF's
+  hash; re-running the same command resumes the batch, skipping finished
+  documents and stages. Outputs are written atomically.
+- With --incremental, a revised PDF is re-extracted only for pages whose
+  content hash changed since its previous run (page_manifest.json in the
+  document's output directory)
+
+Usage:
+    python batch_extract.py <pdf|dir> [more ...] [--output-dir extraction_runs] [--workers 4]
+                            [--time-budget 60] [--memory-budget 1024] [--stages extract,controls] [--restart]
+                            [--incremental]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import multiprocessing
+from collections import deque
+from contextlib import redirect_stdout
+from datetime import datetime
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from page_manifest import update_manifest
+from run_journal import JOURNAL_NAME, RunJournal, atomic_write, file_sha256
+
+ALL_STAGES = ["extract", "controls"]
+DEFAULT_OUTPUT_DIR = "extraction_runs"
+MANIFEST_NAME = "run_manifest.json"
+
+# Seconds the parent waits past the time budget before killing a worker
+KILL_GRACE = 5.0
+POLL_INTERVAL = 0.1
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class BudgetExceeded(BaseException):
+    """Raised inside a worker when its time budget runs out
+
+    A BaseException so the extractor's per-method `except Exception` cannot swallow it.
+    """
+
+
+def _on_timer(signum, frame):
+    raise BudgetExceeded("time")
+
+
+def _warm():
+    """Pay imports once in the parent; forked workers inherit them"""
+    global AdvancedPDFExtractor, analyze_pdf_form_controls, update_form_controls_analysis, CONTROLS_OUTPUT
+    with redirect_stdout(io.StringIO()):
+        from advanced_pdf_extractor import AdvancedPDFExtractor
+        from analyze_form_controls import CONTROLS_OUTPUT, analyze_pdf_form_controls, update_form_controls_analysis
+        AdvancedPDFExtractor(__file__)._get_compiled_x12_patterns()
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process, or None where /proc is unavailable"""
+    try:
+        with open(f"/proc/{pid}/statm", 'r') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def run_document(pdf_path: str, output_dir: str, stages: List[str], degraded: bool, time_budget: float,
+                 on_stage=None, incremental: bool = False) -> Dict[str, Any]:
+    """Run the pipeline for one document inside a worker process; on_stage(name, details) after each stage"""
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _on_timer)
+        signal.setitimer(signal.ITIMER_REAL, time_budget)
+
+    result: Dict[str, Any] = {"stages": {}}
+
+    def stage_done(stage: str, details: Dict[str, Any]):
+        result["stages"][stage] = details
+        if on_stage:
+            on_stage(stage, details)
+
+    with redirect_stdout(io.StringIO()):
+        if "extract" in stages:
+            extractor = AdvancedPDFExtractor(pdf_path)
+            if incremental and not degraded:
+                fields = extractor.extract_fields_incremental(output_dir)
+            else:
+                fields = extractor.extract_fields_comprehensive(degraded=degraded)
+            extractor.save_results(output_dir)
+            stage_done("extract", {"fields": len(fields)})
+
+        # Controls analysis walks every widget again; the degraded pipeline skips it
+        if "controls" in stages and not degraded:
+            if incremental:
+                analysis = update_form_controls_analysis(pdf_path, output_dir)
+            else:
+                analysis = analyze_pdf_form_controls(pdf_path, write_report=False)
+                if analysis is None:
+                    raise RuntimeError("Form control analysis failed")
+                with atomic_write(Path(output_dir) / CONTROLS_OUTPUT) as f:
+                    json.dump(analysis, f, indent=2)
+                update_manifest(output_dir, CONTROLS_OUTPUT, None)
+            stage_done("controls", {"fields": analysis["total_fields"]})
+
+    if hasattr(signal, "setitimer"):
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    return result
+
+
+def _worker_main(connection, pdf_path: str, output_dir: str, stages: List[str], degraded: bool, time_budget: float,
+                 incremental: bool):
+    try:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        # Stages are reported as they finish, so a later kill does not lose them
+        run_document(pdf_path, output_dir, stages, degraded, time_budget,
+                     on_stage=lambda stage, details: connection.send({"stage": stage, **details}),
+                     incremental=incremental)
+        connection.send({"status": "ok"})
+    except BudgetExceeded as e:
+        connection.send({"status": "over_budget", "reason": str(e)})
+    except Exception as e:
+        connection.send({"status": "error", "reason": f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
+
+
+def collect_pdfs(inputs: List[str]) -> List[Path]:
+    paths = []
+    for item in inputs:
+        path = Path(item)
+        paths.extend(sorted(path.rglob("*.pdf")) if path.is_dir() else [path])
+    return paths
+
+
+def output_dirs_for(pdfs: List[Path], output_root: Path) -> Dict[str, str]:
+    """One output directory per PDF, named after its stem (suffixed on collisions)"""
+    used, dirs = set(), {}
+    for pdf in pdfs:
+        name, suffix = pdf.stem, 2
+        while name in used:
+            name = f"{pdf.stem}_{suffix}"
+            suffix += 1
+        used.add(name)
+        dirs[str(pdf)] = str(output_root / name)
+    return dirs
+
+
+class BatchRunner:
+    """Fixed number of worker processes with time and memory watchdogs"""
+
+    def __init__(self, workers: int, time_budget: float, memory_budget_mb: float, stages: List[str],
+                 journal: RunJournal, incremental: bool = False):
+        self.workers = workers
+        self.time_budget = time_budget
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.stages = stages
+        self.journal = journal
+        self.incremental = incremental
+        methods = multiprocessing.get_all_start_methods()
+        self.context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self.memory_enforced = rss_bytes(os.getpid()) is not None
+
+    def _start(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        receiver, sender = self.context.Pipe(duplex=False)
+        process = self.context.Process(
+            target=_worker_main,
+            args=(sender, job["pdf"], job["output_dir"], job["stages"], job["degraded"], self.time_budget,
+                  self.incremental),
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+        return {"job": job, "process": process, "connection": receiver,
+                "started": time.perf_counter(), "peak_rss": 0, "stages": {}}
+
+    def _finish(self, running: Dict[str, Any], outcome: Dict[str, Any]) -> Dict[str, Any]:
+        running["connection"].close()
+        running["process"].join(1)
+        return {
+            "mode": "degraded" if running["job"]["degraded"] else "full",
+            "elapsed_seconds": round(time.perf_counter() - running["started"], 3),
+            "peak_rss_mb": round(running["peak_rss"] / 1024 / 1024, 1) if running["peak_rss"] else None,
+            "stages": running["stages"],
+            **outcome,
+        }
+
+    def _receive(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Journal stage messages from a worker; return its final outcome once sent"""
+        job = entry["job"]
+        while entry["connection"].poll():
+            try:
+                message = entry["connection"].recv()
+            except EOFError:
+                return {"status": "error", "reason": "worker exited without a result"}
+            if "stage" not in message:
+                return message
+            stage = message.pop("stage")
+            entry["stages"][stage] = message
+            self.journal.record_stage(job["pdf"], job["sha256"], stage,
+                                      "degraded" if job["degraded"] else "full", job["output_dir"], **message)
+        return None
+
+    def run(self, pdfs: List[Path], output_root: Path, on_done=None, resume: bool = True) -> List[Dict[str, Any]]:
+        dirs = output_dirs_for(pdfs, output_root)
+        documents = {}
+        queue = deque()
+        for pdf in pdfs:
+            sha256 = file_sha256(pdf)
+            document = {"pdf": str(pdf), "sha256": sha256, "output_dir": dirs[str(pdf)], "attempts": []}
+            documents[str(pdf)] = document
+            previous = self.journal.document_status(str(pdf), sha256) if resume else None
+            if previous in ("ok", "degraded"):
+                document.update({"status": previous, "resumed": True})
+                continue
+            done = self.journal.completed_stages(str(pdf), sha256) if resume else set()
+            pending = [stage for stage in self.stages if stage not in done]
+            if done:
+                document["resumed_stages"] = sorted(done)
+            queue.append({"pdf": str(pdf), "sha256": sha256, "output_dir": dirs[str(pdf)],
+                          "stages": pending, "degraded": False})
+        active: List[Dict[str, Any]] = []
+
+        while queue or active:
+            while queue and len(active) < self.workers:
+                active.append(self._start(queue.popleft()))
+
+            wait([entry["connection"] for entry in active] + [entry["process"].sentinel for entry in active],
+                 timeout=POLL_INTERVAL)
+
+            now = time.perf_counter()
+            for entry in list(active):
+                outcome = self._receive(entry)
+                if outcome is None and not entry["process"].is_alive():
+                    # Messages sent just before the worker exited are still in the pipe
+                    outcome = self._receive(entry) or {
+                        "status": "error", "reason": f"worker crashed (exit code {entry['process'].exitcode})"
+                    }
+                elif outcome is None:
+                    rss = rss_bytes(entry["process"].pid)
+                    if rss:
+                        entry["peak_rss"] = max(entry["peak_rss"], rss)
+                    if rss and rss > self.memory_budget:
+                        outcome = {"status": "over_budget", "reason": "memory"}
+                    elif now - entry["started"] > self.time_budget + KILL_GRACE:
+                        outcome = {"status": "over_budget", "reason": "time (killed)"}
+                    if outcome:
+                        entry["process"].kill()
+                if outcome is None:
+                    continue
+
+                active.remove(entry)
+                job = entry["job"]
+                attempt = self._finish(entry, outcome)
+                document = documents[job["pdf"]]
+                document["attempts"].append(attempt)
+
+                if attempt["status"] == "over_budget" and not job["degraded"]:
+                    done = set(entry["stages"])
+                    queue.append({**job, "stages": [stage for stage in job["stages"] if stage not in done],
+                                  "degraded": True})
+                    continue
+                if attempt["status"] == "ok":
+                    document["status"] = "degraded" if job["degraded"] else "ok"
+                else:
+                    document["status"] = "failed"
+                self.journal.record_document(job["pdf"], job["sha256"], document["status"], job["output_dir"])
+                if on_done:
+                    on_done(document)
+
+        return list(documents.values())
+
+
+def write_manifest(output_root: Path, manifest: Dict[str, Any]) -> Path:
+    manifest_path = output_root / MANIFEST_NAME
+    with atomic_write(manifest_path) as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the extraction pipeline over many PDFs with per-document budgets")
+    parser.add_argument("inputs", nargs="+", help="PDF files or directories (searched recursively)")
+    parser.add_argument("--output-dir", "-o", default=DEFAULT_OUTPUT_DIR, help="Root directory for per-document outputs")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 2, help="Worker processes")
+    parser.add_argument("--time-budget", type=float, default=60.0, help="Wall-clock seconds per document")
+    parser.add_argument("--memory-budget", type=float, default=1024.0, help="Resident memory per worker, in MB")
+    parser.add_argument("--stages", default=",".join(ALL_STAGES), help="Comma-separated stages (extract,controls)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the run journal and process every document")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Re-extract only pages changed since a document's previous --incremental run")
+
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(",") if stage]
+    unknown = [stage for stage in stages if stage not in ALL_STAGES]
+    if unknown or not stages:
+        print(f"❌ Unknown stages: {unknown or args.stages}")
+        sys.exit(1)
+
+    pdfs = collect_pdfs(args.inputs)
+    missing = [str(pdf) for pdf in pdfs if not pdf.exists()]
+    if not pdfs or missing:
+        print(f"❌ No PDFs found: {missing or args.inputs}")
+        sys.exit(1)
+
+    _warm()
+    output_root = Path(args.output_dir)
+    output_root.mkdir(parents=True, exist_ok=True)
+    journal = RunJournal(output_root / JOURNAL_NAME)
+    runner = BatchRunner(args.workers, args.time_budget, args.memory_budget, stages, journal, args.incremental)
+
+    print(f"🚀 Extracting {len(pdfs)} PDFs with {args.workers} workers "
+          f"({args.time_budget:g}s, {args.memory_budget:g}MB per document)")
+    if not runner.memory_enforced:
+        print("⚠️  /proc not available: memory budget is not enforced")
+
+    icons = {"ok": "✅", "degraded": "⚠️ ", "failed": "❌"}
+
+    def report(document):
+        last = document["attempts"][-1]
+        detail = f" ({document['attempts'][0].get('reason')})" if document["status"] != "ok" else ""
+        print(f"   {icons[document['status']]} {document['pdf']}: {document['status']}{detail} "
+              f"in {last['elapsed_seconds']:.1f}s")
+
+    started_at = datetime.now().isoformat()
+    started = time.perf_counter()
+    try:
+        documents = runner.run(pdfs, output_root, on_done=report, resume=not args.restart)
+    finally:
+        journal.close()
+    elapsed = time.perf_counter() - started
+    resumed = sum(bool(document.get("resumed")) for document in documents)
+
+    totals = {status: sum(document["status"] == status for document in documents) for status in icons}
+    manifest_path = write_manifest(output_root, {
+        "started_at": started_at,
+        "finished_at": datetime.now().isoformat(),
+        "elapsed_seconds": round(elapsed, 3),
+        "settings": {
+            "workers": args.workers,
+            "time_budget_seconds": args.time_budget,
+            "memory_budget_mb": args.memory_budget,
+            "memory_enforced": runner.memory_enforced,
+            "stages": stages,
+        },
+        "totals": {**totals, "resumed": resumed},
+        "documents": documents,
+    })
+
+    if resumed:
+        print(f"🔁 {resumed} documents already finished in an earlier run")
+    print(f"✅ {totals['ok']} ok, {totals['degraded']} degraded, {totals['failed']} failed "
+          f"in {elapsed:.1f}s — {len(documents) / elapsed if elapsed else 0:.1f} documents/s")
+    print(f"💾 Manifest: {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
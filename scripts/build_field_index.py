@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Extracted Field Index Builder
+
+This script loads the extraction outputs of many processed PDFs
+(fields_raw.json, form_controls_analysis.json and, when present,
+complete_questionnaire.json) into one SQLite database for cross-corpus queries:
+- One row per field: payer, name, label, control type, section, page,
+  required/readonly, X12 mapping, widget flags
+- Indexes on field name, control type, section, page, X12 mapping and payer
+- FTS5 full-text table over labels (question titles where the PDF has none)
+- Each output directory is loaded in one transaction with executemany;
+  re-indexing a directory replaces its rows
+
+Usage:
+    python build_field_index.py <output_dir> [more ...] [--payer NAME] [--index extracted_fields/field_index.db]
+    python build_field_index.py --search "xml envelope"
+    python build_field_index.py --sql "SELECT payer, COUNT(*) FROM fields WHERE page = 6 AND required GROUP BY payer HAVING COUNT(*) > 20"
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from build_label_index import normalize_widget_name
+from fill_pdf_responses import map_widgets_to_questions
+
+DEFAULT_INDEX = "extracted_fields/field_index.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forms (
+    form_id INTEGER PRIMARY KEY,
+    payer TEXT NOT NULL,
+    source_dir TEXT NOT NULL UNIQUE,
+    total_pages INTEGER,
+    total_fields INTEGER NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fields (
+    field_id INTEGER PRIMARY KEY,
+    form_id INTEGER NOT NULL REFERENCES forms(form_id),
+    payer TEXT NOT NULL,
+    name TEXT NOT NULL,
+    label TEXT NOT NULL,
+    field_type TEXT,
+    control_type TEXT,
+    widget_type_code INTEGER,
+    section TEXT,
+    page INTEGER,
+    required INTEGER NOT NULL DEFAULT 0,
+    readonly INTEGER NOT NULL DEFAULT 0,
+    x12_mapping TEXT,
+    flags INTEGER,
+    options TEXT,
+    question_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_fields_name ON fields(name);
+CREATE INDEX IF NOT EXISTS idx_fields_control_type ON fields(control_type);
+CREATE INDEX IF NOT EXISTS idx_fields_section ON fields(section);
+CREATE INDEX IF NOT EXISTS idx_fields_page ON fields(page, required);
+CREATE INDEX IF NOT EXISTS idx_fields_x12_mapping ON fields(x12_mapping);
+CREATE INDEX IF NOT EXISTS idx_fields_payer ON fields(payer, form_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS fields_fts USING fts5(label, name_text);
+"""
+
+FIELD_COLUMNS = ("form_id", "payer", "name", "label", "field_type", "control_type", "widget_type_code", "section",
+                 "page", "required", "readonly", "x12_mapping", "flags", "options", "question_id")
+
+
+def _load_json(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def load_form_fields(output_dir: Path) -> Tuple[Optional[int], List[Dict[str, Any]]]:
+    """Merge fields_raw.json and form_controls_analysis.json of one output directory by field name"""
+    raw_fields = _load_json(output_dir / "fields_raw.json") or {}
+    analysis = _load_json(output_dir / "form_controls_analysis.json") or {}
+    controls = analysis.get("field_details", {})
+    questionnaire = _load_json(output_dir / "complete_questionnaire.json")
+
+    titles = {}
+    field_map = {}
+    if questionnaire:
+        titles = {question["id"]: question.get("title", "")
+                  for section in questionnaire.get("sections", []) for question in section.get("questions", [])}
+        field_map = map_widgets_to_questions(list(dict.fromkeys([*raw_fields, *controls])), questionnaire)
+
+    fields = []
+    for name in dict.fromkeys([*raw_fields, *controls]):
+        raw = raw_fields.get(name, {})
+        control = controls.get(name, {})
+        flags = control.get("flags_analysis", {})
+        question_id = field_map.get(name, (None, None))[0]
+        fields.append({
+            "name": name,
+            "label": raw.get("label") or titles.get(question_id) or "",
+            "field_type": raw.get("field_type"),
+            "control_type": control.get("control_type"),
+            "widget_type_code": control.get("widget_type_code"),
+            "section": raw.get("section"),
+            "page": raw.get("page") or control.get("page"),
+            "required": int(bool(raw.get("required", flags.get("is_required", False)))),
+            "readonly": int(bool(raw.get("readonly", flags.get("is_readonly", False)))),
+            "x12_mapping": raw.get("x12_mapping") or None,
+            "flags": control.get("flags"),
+            "options": json.dumps(raw.get("options") or control.get("options") or []),
+            "question_id": question_id,
+        })
+    return analysis.get("total_pages"), fields
+
+
+def fts_query(text: str) -> str:
+    """Plain search text as an FTS5 query: every term quoted, so - : " * are not query syntax"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+
+class FieldIndex:
+    """Extracted fields of many forms in one SQLite database"""
+
+    def __init__(self, index_path: str = DEFAULT_INDEX):
+        Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(index_path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def index_directory(self, output_dir: str, payer: Optional[str] = None) -> int:
+        """Replace the rows of one output directory; returns the number of fields indexed"""
+        directory = Path(output_dir).resolve()
+        payer = payer or directory.name
+        total_pages, fields = load_form_fields(directory)
+
+        with self.connection:
+            row = self.connection.execute("SELECT form_id FROM forms WHERE source_dir = ?",
+                                          (str(directory),)).fetchone()
+            if row:
+                self.connection.execute("DELETE FROM fields_fts WHERE rowid IN "
+                                        "(SELECT field_id FROM fields WHERE form_id = ?)", row)
+                self.connection.execute("DELETE FROM fields WHERE form_id = ?", row)
+                self.connection.execute("DELETE FROM forms WHERE form_id = ?", row)
+
+            form_id = self.connection.execute(
+                "INSERT INTO forms (payer, source_dir, total_pages, total_fields, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                (payer, str(directory), total_pages, len(fields), datetime.now().isoformat())
+            ).lastrowid
+            first_id = (self.connection.execute("SELECT COALESCE(MAX(field_id), 0) FROM fields").fetchone()[0]) + 1
+
+            # Explicit ids keep fields and fields_fts rows aligned without a lookup per row
+            self.connection.executemany(
+                f"INSERT INTO fields (field_id, {', '.join(FIELD_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' * len(FIELD_COLUMNS))})",
+                [(first_id + i, form_id, payer, *(field[column] for column in FIELD_COLUMNS[2:]))
+                 for i, field in enumerate(fields)]
+            )
+            self.connection.executemany(
+                "INSERT INTO fields_fts (rowid, label, name_text) VALUES (?, ?, ?)",
+                [(first_id + i, field["label"], normalize_widget_name(field["name"])) for i, field in enumerate(fields)]
+            )
+        return len(fields)
+
+    def search(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Full-text search over labels and field names, best matches first"""
+        query = fts_query(query)
+        if not query:
+            return []
+        rows = self.connection.execute(
+            "SELECT f.payer, f.name, f.label, f.page, f.control_type "
+            "FROM fields_fts JOIN fields f ON f.field_id = fields_fts.rowid "
+            "WHERE fields_fts MATCH ? ORDER BY rank LIMIT ?", (query, limit)
+        ).fetchall()
+        return [dict(zip(("payer", "name", "label", "page", "control_type"), row)) for row in rows]
+
+    def query(self, sql: str, params: Tuple = ()) -> Tuple[List[str], List[Tuple]]:
+        cursor = self.connection.execute(sql, params)
+        return [column[0] for column in cursor.description or ()], cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index extraction outputs of many PDFs in SQLite")
+    parser.add_argument("output_dirs", nargs="*", help="Extraction output directories (containing fields_raw.json)")
+    parser.add_argument("--payer", "-p", help="Payer name (default: the output directory name)")
+    parser.add_argument("--index", "-i", default=DEFAULT_INDEX, help="Field index database")
+    parser.add_argument("--search", "-s", help="Full-text search over field labels")
+    parser.add_argument("--sql", help="Run an SQL query against the index")
+
+    args = parser.parse_args()
+
+    if args.search or args.sql:
+        if not Path(args.index).exists():
+            print(f"❌ Field index not found: {args.index}. Build it first.")
+            sys.exit(1)
+        index = FieldIndex(args.index)
+        started = time.perf_counter()
+        try:
+            if args.search:
+                matches = index.search(args.search)
+                elapsed = time.perf_counter() - started
+                for match in matches:
+                    print(f"   {match['payer']} p{match['page']} {match['name']}: {match['label'][:80]}")
+                print(f"✅ {len(matches)} matches in {elapsed * 1000:.1f}ms")
+            else:
+                columns, rows = index.query(args.sql)
+                elapsed = time.perf_counter() - started
+                print("   " + " | ".join(columns))
+                for row in rows:
+                    print("   " + " | ".join(str(value) for value in row))
+                print(f"✅ {len(rows)} rows in {elapsed * 1000:.1f}ms")
+        except sqlite3.Error as e:
+            print(f"❌ Query failed: {e}")
+            sys.exit(1)
+        finally:
+            index.close()
+        return
+
+    directories = [Path(d) for d in args.output_dirs]
+    missing = [str(d) for d in directories
+               if not (d / "fields_raw.json").exists() and not (d / "form_controls_analysis.json").exists()]
+    if not directories or missing:
+        print(f"❌ No extraction outputs found: {missing or args.output_dirs}")
+        sys.exit(1)
+    if args.payer and len(directories) > 1:
+        print("❌ --payer can only be used with a single output directory")
+        sys.exit(1)
+
+    index = FieldIndex(args.index)
+    started = time.perf_counter()
+    for directory in directories:
+        count = index.index_directory(directory, args.payer)
+        print(f"📥 {directory}: {count} fields")
+    elapsed = time.perf_counter() - started
+    forms, fields = index.query("SELECT COUNT(*), SUM(total_fields) FROM forms")[1][0]
+    print(f"✅ Indexed {len(directories)} directories in {elapsed:.2f}s; index has {fields} fields from {forms} forms")
+    print(f"💾 Saved to: {args.index}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
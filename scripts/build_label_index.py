@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Label Text Index Builder
+
+This script builds a searchable index over the extracted document text
+(availity_document_content.txt) so raw widget names such as `Name1` or
+`isa06-270` can be resolved to the question text around them:
+- Page-aware paragraphs with line positions
+- Tokenized paragraphs
+- Trigram index for fuzzy matching of widget names against the text
+- A label must contain every word of the widget name; footer/legal boilerplate
+  and multi-sentence paragraphs are never used as labels
+
+The source text must be the page-marked text of the payer form itself
+("=== PAGE n ===" markers, labels next to their widgets). The bundled
+availity_document_content.txt is a slide-deck export of the onboarding
+process with no form labels: against it no questionnaire field resolves,
+and fix_field_names.py keeps its own titles.
+
+The index is built once and saved as JSON; lookups against the loaded index
+take well under a millisecond.
+
+Usage:
+    python build_label_index.py <form_text.txt> [--output extracted_fields/label_index.json]
+    python build_label_index.py --lookup "isa06-270" [--index extracted_fields/label_index.json]
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Set
+
+DEFAULT_DOCUMENT = "availity_document_content.txt"
+DEFAULT_INDEX = "extracted_fields/label_index.json"
+
+PAGE_MARKER = re.compile(r'^=== PAGE (\d+) ===$')
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Widget name abbreviations expanded before matching
+ABBREVIATIONS = {
+    "av": "availity",
+    "tp": "trading partner",
+    "dob": "date of birth",
+    "prod": "production",
+}
+
+MIN_SCORE = 0.3
+
+# Footer and legal text repeated on every page never names a field
+BOILERPLATE_PATTERN = re.compile(r'©|\bcopyright\b|\ball rights reserved\b|\bconfidential\b', re.IGNORECASE)
+# A sentence end followed by more text: instructions, not a label
+SENTENCE_BREAK = re.compile(r'[.?!]\s+\S')
+# Longer paragraphs repeated on this many pages are running headers or footers
+REPEATED_PAGES = 3
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def normalize_widget_name(name: str) -> str:
+    """Split a widget name into words (camelCase, digits, separators, abbreviations)"""
+    name = re.sub(r'([a-z])([A-Z])', r'\1 \2', name)
+    name = re.sub(r'^([A-Z]{2})(?=[A-Z][a-z])', r'\1 ', name)
+    name = re.sub(r'[_\-.]+', ' ', name)
+    words = [ABBREVIATIONS.get(word, word) for word in tokenize(name)]
+    # Trailing instance numbers (Name1, _2) do not appear in the document text
+    words = [re.sub(r'^([a-z]+)\d$', r'\1', word) for word in words]
+    return " ".join(words)
+
+
+def trigrams(text: str) -> Set[str]:
+    grams = set()
+    for token in tokenize(text):
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class LabelIndex:
+    """Paragraph and trigram index over a page-marked text document"""
+
+    def __init__(self, source: str = "", paragraphs: List[Dict[str, Any]] = None,
+                 trigram_postings: Dict[str, List[int]] = None):
+        self.source = source
+        self.paragraphs = paragraphs or []
+        self.trigram_postings = trigram_postings or {}
+        self._sizes = [paragraph["trigram_count"] for paragraph in self.paragraphs]
+        pages_by_text: Dict[str, Set[int]] = {}
+        for paragraph in self.paragraphs:
+            pages_by_text.setdefault(paragraph["text"], set()).add(paragraph["page"])
+        self._repeated = {text for text, pages in pages_by_text.items() if len(pages) >= REPEATED_PAGES}
+
+    @classmethod
+    def build(cls, document_path: str) -> "LabelIndex":
+        """Split the document into paragraphs and index their trigrams"""
+        paragraphs: List[Dict[str, Any]] = []
+        page = 1
+        current: List[str] = []
+        start_line = 0
+
+        def flush():
+            if current:
+                text = re.sub(r'\s+', ' ', " ".join(current)).strip()
+                if tokenize(text):
+                    paragraphs.append({"page": page, "line": start_line, "text": text})
+            current.clear()
+
+        with open(document_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line_number, line in enumerate(f, 1):
+                stripped = line.strip()
+                marker = PAGE_MARKER.match(stripped)
+                if marker:
+                    flush()
+                    page = int(marker.group(1))
+                    continue
+                # Blank lines, bullets and sentence ends close a paragraph
+                if not stripped or stripped in ("•", "○", "-"):
+                    flush()
+                    continue
+                # A line starting in lowercase or with a digit continues a wrapped line;
+                # anything else starts a new label
+                if current and not (stripped[0].islower() or stripped[0].isdigit()):
+                    flush()
+                if not current:
+                    start_line = line_number
+                current.append(stripped.lstrip("•○- "))
+                if stripped.endswith(("?", ":", ".")):
+                    flush()
+            flush()
+
+        postings: Dict[str, List[int]] = {}
+        for paragraph_id, paragraph in enumerate(paragraphs):
+            paragraph["tokens"] = tokenize(paragraph["text"])
+            grams = trigrams(paragraph["text"])
+            paragraph["trigram_count"] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(paragraph_id)
+
+        return cls(str(document_path), paragraphs, postings)
+
+    def save(self, index_path: str):
+        output_path = Path(index_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w') as f:
+            json.dump({
+                "source": self.source,
+                "paragraphs": self.paragraphs,
+                "trigrams": self.trigram_postings,
+            }, f)
+
+    @classmethod
+    def load(cls, index_path: str) -> "LabelIndex":
+        with open(index_path, 'r') as f:
+            data = json.load(f)
+        return cls(data["source"], data["paragraphs"], data["trigrams"])
+
+    def search(self, query: str, page: Optional[int] = None, limit: int = 3) -> List[Dict[str, Any]]:
+        """Rank paragraphs by trigram similarity to the query (same-page matches boosted)"""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        overlap = Counter()
+        for gram in query_grams:
+            overlap.update(self.trigram_postings.get(gram, ()))
+
+        results = []
+        query_size = len(query_grams)
+        for paragraph_id, shared in overlap.items():
+            # Containment of the query weighs more than paragraph length
+            score = shared / query_size * (shared / (query_size + self._sizes[paragraph_id] - shared)) ** 0.25
+            if page is not None and self.paragraphs[paragraph_id]["page"] == page:
+                score *= 1.15
+            results.append((score, paragraph_id))
+
+        results.sort(reverse=True)
+        return [
+            {
+                "id": paragraph_id,
+                "score": round(score, 4),
+                "page": self.paragraphs[paragraph_id]["page"],
+                "line": self.paragraphs[paragraph_id]["line"],
+                "text": self.paragraphs[paragraph_id]["text"],
+            }
+            for score, paragraph_id in results[:limit]
+        ]
+
+    def is_label(self, paragraph_id: int) -> bool:
+        """Whether a paragraph can be a field label: one sentence, not footer or legal boilerplate"""
+        paragraph = self.paragraphs[paragraph_id]
+        text = paragraph["text"]
+        if BOILERPLATE_PATTERN.search(text) or SENTENCE_BREAK.search(text):
+            return False
+        return len(paragraph["tokens"]) <= 2 or text not in self._repeated
+
+    def resolve_label(self, field_name: str, page: Optional[int] = None,
+                      min_score: float = MIN_SCORE) -> Optional[str]:
+        """Return the question text for a widget name, or None if nothing matches well
+
+        Only label paragraphs containing every word of the widget name are accepted.
+        """
+        query = normalize_widget_name(field_name)
+        words = set(tokenize(query))
+        matches = [
+            match for match in self.search(query, page, limit=10)
+            if match["score"] >= min_score and words <= set(self.paragraphs[match["id"]]["tokens"])
+            and self.is_label(match["id"])
+        ]
+        if not matches:
+            return None
+        # Repeated labels (e.g. one "Name" per contact block) cannot be told apart
+        if len(matches) > 1 and matches[1]["score"] == matches[0]["score"]:
+            return None
+
+        match = matches[0]
+        # A bare label such as "Name" takes its context from the heading above it
+        if len(self.paragraphs[match["id"]]["tokens"]) <= 2:
+            for previous_id in range(match["id"] - 1, -1, -1):
+                previous = self.paragraphs[previous_id]
+                if previous["page"] != match["page"]:
+                    break
+                if len(previous["tokens"]) > 2 and self.is_label(previous_id):
+                    return f"{previous['text']} - {match['text']}"
+        return match["text"]
+
+
+def load_label_index(index_path: str = DEFAULT_INDEX) -> Optional[LabelIndex]:
+    """Load the label index if it has been built"""
+    if not Path(index_path).exists():
+        return None
+    return LabelIndex.load(index_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the label text index")
+    parser.add_argument("document", nargs="?", default=DEFAULT_DOCUMENT, help="Page-marked document text")
+    parser.add_argument("--output", "-o", default=DEFAULT_INDEX, help="Index output path")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="Index to query with --lookup")
+    parser.add_argument("--lookup", "-l", action="append", help="Widget name to resolve (repeatable)")
+    parser.add_argument("--page", type=int, help="Page the widget is on (boosts same-page text)")
+
+    args = parser.parse_args()
+
+    if args.lookup:
+        index = load_label_index(args.index)
+        if index is None:
+            print(f"❌ Index not found: {args.index}. Build it first.")
+            sys.exit(1)
+        for name in args.lookup:
+            started = time.perf_counter()
+            matches = index.search(normalize_widget_name(name), args.page)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(f"🔍 {name} → '{normalize_widget_name(name)}' ({elapsed_ms:.3f}ms)")
+            for match in matches:
+                print(f"   {match['score']:.3f}  p{match['page']} L{match['line']}: {match['text'][:100]}")
+        return
+
+    if not Path(args.document).exists():
+        print(f"❌ Document not found: {args.document}")
+        sys.exit(1)
+
+    print(f"🔧 Building label index from: {args.document}")
+    index = LabelIndex.build(args.document)
+    index.save(args.output)
+    print(f"✅ Indexed {len(index.paragraphs)} paragraphs, {len(index.trigram_postings)} trigrams")
+    print(f"💾 Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
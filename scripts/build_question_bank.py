@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Corpus Question Bank Builder
+
+This script ingests the complete_questionnaire.json generated for many payer
+PDFs and merges near-duplicate questions into one bank of canonical questions:
+- Normalized title shingles + option labels, MinHash signatures
+- Element numbers (ISA06, 270/271) and grouped field names must match exactly
+- LSH band buckets to find near duplicates without pairwise comparison
+- Stable canonical ids: once assigned, an id never changes on later ingests
+- SQLite store with indexed exact keys and LSH buckets, so resolving a new
+  payer's question is a handful of indexed lookups
+
+Usage:
+    python build_question_bank.py <questionnaire.json|dir> [more ...] [--bank extracted_fields/question_bank.db]
+    python build_question_bank.py --resolve new_payer/complete_questionnaire.json
+"""
+
+import sys
+import json
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Set
+
+import numpy as np
+
+from align_form_versions import MinHasher
+from build_label_index import tokenize
+
+DEFAULT_BANK = "extracted_fields/question_bank.db"
+
+# Titles are short, so more permutations than field alignment uses
+NUM_PERM = 128
+BANDS = 32
+
+# Estimated Jaccard similarity above which two questions are the same question
+DUPLICATE_SIMILARITY = 0.75
+
+# Filler words that vary between payers without changing the question
+STOPWORDS = {"a", "an", "the", "do", "does", "you", "your", "please", "is", "are", "of", "for", "to", "if", "any"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS canonical_questions (
+    canonical_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    type TEXT NOT NULL,
+    key_terms TEXT NOT NULL,
+    options TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    first_source TEXT NOT NULL,
+    variant_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS variants (
+    exact_key TEXT PRIMARY KEY,
+    canonical_id TEXT NOT NULL REFERENCES canonical_questions(canonical_id),
+    title TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS variant_sources (
+    source TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    canonical_id TEXT NOT NULL REFERENCES canonical_questions(canonical_id),
+    PRIMARY KEY (source, question_id)
+);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band INTEGER NOT NULL,
+    bucket BLOB NOT NULL,
+    canonical_id TEXT NOT NULL REFERENCES canonical_questions(canonical_id),
+    PRIMARY KEY (band, bucket, canonical_id)
+);
+CREATE INDEX IF NOT EXISTS idx_variant_sources_canonical ON variant_sources(canonical_id);
+"""
+
+
+def normalize_title(title: str) -> List[str]:
+    return [token for token in tokenize(title) if token not in STOPWORDS]
+
+
+def key_terms(question: Dict[str, Any]) -> str:
+    """Terms that must match exactly for two questions to be the same question
+
+    Tokens with digits (ISA06, 270, 271) name different elements, and the word after
+    " - " names the field of a group ("Technical Contact - Name" vs "- Phone").
+    """
+    title = question.get("title", "")
+    terms = {token for token in tokenize(title) if any(c.isdigit() for c in token)}
+    if " - " in title:
+        field = tokenize(title.rsplit(" - ", 1)[1])
+        if field:
+            terms.add(f"field:{field[0]}")
+    return " ".join(sorted(terms))
+
+
+def question_features(question: Dict[str, Any]) -> Set[str]:
+    """Title word shingles plus option labels"""
+    tokens = normalize_title(question.get("title", ""))
+    features = {f"w:{token}" for token in tokens}
+    features.update(f"b:{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    for option in question.get("options") or []:
+        features.add("opt:" + " ".join(tokenize(str(option.get("label", option.get("value", ""))))))
+    return features
+
+
+def exact_key(question: Dict[str, Any]) -> str:
+    """Hash of the normalized question; identical questions share it"""
+    options = sorted(str(option.get("value", "")) for option in question.get("options") or [])
+    text = json.dumps([normalize_title(question.get("title", "")), question.get("type", ""), options])
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def iter_questions(questionnaire: Dict[str, Any]):
+    for section in questionnaire.get("sections", []):
+        for question in section.get("questions", []):
+            # Display-only headers are layout, not questions
+            if question.get("type") == "display" or not question.get("title"):
+                continue
+            yield question
+
+
+class QuestionBank:
+    """Canonical questions with exact and LSH lookups, stored in SQLite"""
+
+    def __init__(self, bank_path: str = DEFAULT_BANK):
+        Path(bank_path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(bank_path)
+        self.connection.executescript(SCHEMA)
+        self.hasher = MinHasher(NUM_PERM)
+        self.rows_per_band = NUM_PERM // BANDS
+
+    def close(self):
+        self.connection.close()
+
+    def _bands(self, signature: np.ndarray):
+        for band in range(BANDS):
+            yield band, signature[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes()
+
+    def resolve(self, question: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Find the canonical question for a question, or None if it is new to the bank"""
+        row = self.connection.execute(
+            "SELECT canonical_id FROM variants WHERE exact_key = ?", (exact_key(question),)
+        ).fetchone()
+        if row:
+            return {"canonical_id": row[0], "similarity": 1.0, "exact": True}
+
+        signature = self.hasher.signature(question_features(question))
+        candidates = set()
+        for band, bucket in self._bands(signature):
+            candidates.update(canonical_id for (canonical_id,) in self.connection.execute(
+                "SELECT canonical_id FROM lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)
+            ))
+
+        best = None
+        for canonical_id in candidates:
+            stored, question_type, terms = self.connection.execute(
+                "SELECT signature, type, key_terms FROM canonical_questions WHERE canonical_id = ?", (canonical_id,)
+            ).fetchone()
+            if question_type != question.get("type", "") or terms != key_terms(question):
+                continue
+            similarity = float(np.mean(np.frombuffer(stored, dtype=np.uint64) == signature))
+            if similarity >= DUPLICATE_SIMILARITY and (best is None or similarity > best["similarity"]):
+                best = {"canonical_id": canonical_id, "similarity": round(similarity, 4), "exact": False}
+        return best
+
+    def _new_canonical_id(self, question_id: str) -> str:
+        canonical_id, suffix = question_id, 2
+        while self.connection.execute(
+            "SELECT 1 FROM canonical_questions WHERE canonical_id = ?", (canonical_id,)
+        ).fetchone():
+            canonical_id = f"{question_id}-{suffix}"
+            suffix += 1
+        return canonical_id
+
+    def add(self, question: Dict[str, Any], source: str) -> Dict[str, Any]:
+        """Attach a question to its canonical entry, creating one if needed"""
+        match = self.resolve(question)
+        if match is None:
+            signature = self.hasher.signature(question_features(question))
+            canonical_id = self._new_canonical_id(question["id"])
+            self.connection.execute(
+                "INSERT INTO canonical_questions (canonical_id, title, type, key_terms, options, signature, first_source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (canonical_id, question["title"], question.get("type", ""), key_terms(question),
+                 json.dumps(question.get("options") or []), signature.tobytes(), source)
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO lsh_buckets (band, bucket, canonical_id) VALUES (?, ?, ?)",
+                [(band, bucket, canonical_id) for band, bucket in self._bands(signature)]
+            )
+            match = {"canonical_id": canonical_id, "similarity": 1.0, "exact": True, "created": True}
+
+        canonical_id = match["canonical_id"]
+        self.connection.execute(
+            "INSERT OR IGNORE INTO variants (exact_key, canonical_id, title) VALUES (?, ?, ?)",
+            (exact_key(question), canonical_id, question["title"])
+        )
+        inserted = self.connection.execute(
+            "INSERT OR IGNORE INTO variant_sources (source, question_id, canonical_id) VALUES (?, ?, ?)",
+            (source, question["id"], canonical_id)
+        ).rowcount
+        if inserted:
+            self.connection.execute(
+                "UPDATE canonical_questions SET variant_count = variant_count + 1 WHERE canonical_id = ?",
+                (canonical_id,)
+            )
+        return match
+
+    def ingest(self, questionnaire_path: str) -> Dict[str, int]:
+        with open(questionnaire_path, 'r') as f:
+            questionnaire = json.load(f)
+        source = str(questionnaire_path)
+        stats = {"questions": 0, "created": 0, "exact": 0, "near_duplicate": 0}
+        with self.connection:
+            for question in iter_questions(questionnaire):
+                match = self.add(question, source)
+                stats["questions"] += 1
+                if match.get("created"):
+                    stats["created"] += 1
+                elif match["exact"]:
+                    stats["exact"] += 1
+                else:
+                    stats["near_duplicate"] += 1
+        return stats
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM canonical_questions").fetchone()[0]
+
+
+def collect_questionnaires(inputs: List[str]) -> List[Path]:
+    paths = []
+    for item in inputs:
+        path = Path(item)
+        paths.extend(sorted(path.rglob("complete_questionnaire.json")) if path.is_dir() else [path])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the corpus question bank")
+    parser.add_argument("questionnaires", nargs="*", help="complete_questionnaire.json files or directories")
+    parser.add_argument("--bank", "-b", default=DEFAULT_BANK, help="Question bank database")
+    parser.add_argument("--resolve", "-r", help="Resolve a questionnaire against the bank without adding it")
+
+    args = parser.parse_args()
+
+    if args.resolve:
+        if not Path(args.bank).exists():
+            print(f"❌ Question bank not found: {args.bank}. Build it first.")
+            sys.exit(1)
+        bank = QuestionBank(args.bank)
+        with open(args.resolve, 'r') as f:
+            questionnaire = json.load(f)
+        unknown = 0
+        for question in iter_questions(questionnaire):
+            match = bank.resolve(question)
+            if match is None:
+                unknown += 1
+                print(f"   🆕 {question['id']}: {question['title'][:80]}")
+            else:
+                kind = "=" if match["exact"] else f"~{match['similarity']:.2f}"
+                print(f"   {kind:>5} {question['id']} → {match['canonical_id']}")
+        print(f"✅ {unknown} question(s) need review")
+        bank.close()
+        return
+
+    paths = collect_questionnaires(args.questionnaires)
+    missing = [str(path) for path in paths if not path.exists()]
+    if not paths or missing:
+        print(f"❌ No questionnaires found: {missing or args.questionnaires}")
+        sys.exit(1)
+
+    bank = QuestionBank(args.bank)
+    for path in paths:
+        stats = bank.ingest(path)
+        print(f"📥 {path}: {stats['questions']} questions, {stats['created']} new, "
+              f"{stats['exact']} exact, {stats['near_duplicate']} near-duplicate")
+    print(f"✅ Question bank has {bank.count()} canonical questions")
+    print(f"💾 Saved to: {args.bank}")
+    bank.close()
+
+
+if __name__ == "__main__":
+    main()
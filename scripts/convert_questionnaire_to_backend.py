@@ -4,16 +4,40 @@ Convert Complete Questionnaire to Backend Format
 
 This script converts the extracted complete questionnaire JSON to the proper
 TypeScript backend format with correct types and conditional logic.
+
+With --catalog it converts many payers' questionnaires in parallel into one
+module per payer/version under backend/src/data/questionnaires/, plus a
+manifest (id, payer, version, hash, section and question counts) that the
+backend reads to load modules on demand instead of importing them at boot.
+
+Usage:
+    python convert_questionnaire_to_backend.py
+    python convert_questionnaire_to_backend.py --catalog <questionnaire.json|dir> [more ...]
+                                               [--output-dir backend/src/data/questionnaires] [--workers 4]
 """
 
+import os
+import re
+import sys
 import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from run_journal import atomic_write
+from validate_questionnaire_schema import check_before_emit
+
+QUESTIONNAIRE_PATH = Path("extracted_fields/complete_questionnaire.json")
+BACKEND_PATH = Path("backend/src/data/x12-270-271-complete.ts")
+CATALOG_DIR = Path("backend/src/data/questionnaires")
+MANIFEST_MODULE = "manifest"
+
 def convert_questionnaire_to_backend():
     """Convert the complete questionnaire to backend TypeScript format"""
     
     # Load the complete questionnaire
-    questionnaire_path = Path("extracted_fields/complete_questionnaire.json")
+    questionnaire_path = QUESTIONNAIRE_PATH
     if not questionnaire_path.exists():
         print("❌ complete_questionnaire.json not found")
         return
@@ -21,7 +45,18 @@ def convert_questionnaire_to_backend():
     with open(questionnaire_path, 'r') as f:
         questionnaire = json.load(f)
     
-    # Convert to backend format
+    errors = check_before_emit(questionnaire)
+    if errors:
+        print(f"❌ {questionnaire_path} failed schema validation:")
+        for error in errors:
+            print(f"   {error}")
+        return
+    
+    # Generate TypeScript file
+    generate_typescript_file(build_backend_questionnaire(questionnaire))
+
+def build_backend_questionnaire(questionnaire):
+    """Convert a complete questionnaire to the backend format"""
     backend_questionnaire = {
         "id": questionnaire["id"],
         "title": questionnaire["title"],
@@ -37,59 +72,62 @@ def convert_questionnaire_to_backend():
     
     # Convert sections
     for section in questionnaire["sections"]:
-        backend_section = {
-            "id": section["id"],
-            "title": section["title"],
-            "description": section.get("description", ""),
-            "order": section["order"],
-            "questions": [],
-            "conditionalLogic": convert_conditional_logic(section.get("conditionalLogic"))
+        backend_questionnaire["sections"].append(convert_section(section))
+    
+    return backend_questionnaire
+
+def convert_section(section):
+    """Convert one questionnaire section to the backend format"""
+    backend_section = {
+        "id": section["id"],
+        "title": section["title"],
+        "description": section.get("description", ""),
+        "order": section["order"],
+        "questions": [],
+        "conditionalLogic": convert_conditional_logic(section.get("conditionalLogic"))
+    }
+    
+    # Convert questions
+    for question in section["questions"]:
+        backend_question = {
+            "id": question["id"],
+            "type": f"QuestionType.{map_question_type(question['type']).upper()}",
+            "title": question["title"],
+            "description": question.get("description", ""),
+            "required": question["required"],
+            "attachmentRequired": False
         }
         
-        # Convert questions
-        for question in section["questions"]:
-            backend_question = {
-                "id": question["id"],
-                "type": f"QuestionType.{map_question_type(question['type']).upper()}",
-                "title": question["title"],
-                "description": question.get("description", ""),
-                "required": question["required"],
-                "attachmentRequired": False
-            }
-            
-            # Add options if present
-            if question.get("options"):
-                backend_question["options"] = [
-                    {
-                        "value": opt["value"],
-                        "label": opt["label"],
-                        "description": opt.get("description", "")
-                    }
-                    for opt in question["options"]
-                ]
-            
-            # Add validation if present
-            if question.get("validation"):
-                backend_question["validation"] = question["validation"]
-            
-            # Add conditional logic if present
-            if question.get("conditionalLogic"):
-                backend_question["conditionalLogic"] = convert_conditional_logic(question["conditionalLogic"])
-            
-            # Add X12 field mapping if present
-            if question.get("x12Field"):
-                backend_question["x12Field"] = question["x12Field"]
-            
-            backend_section["questions"].append(backend_question)
+        # Add options if present
+        if question.get("options"):
+            backend_question["options"] = [
+                {
+                    "value": opt["value"],
+                    "label": opt["label"],
+                    "description": opt.get("description", "")
+                }
+                for opt in question["options"]
+            ]
+        
+        # Add validation if present
+        if question.get("validation"):
+            backend_question["validation"] = question["validation"]
+        
+        # Add conditional logic if present
+        if question.get("conditionalLogic"):
+            backend_question["conditionalLogic"] = convert_conditional_logic(question["conditionalLogic"])
         
-        # Remove conditionalLogic if None
-        if not backend_section["conditionalLogic"]:
-            del backend_section["conditionalLogic"]
+        # Add X12 field mapping if present
+        if question.get("x12Field"):
+            backend_question["x12Field"] = question["x12Field"]
         
-        backend_questionnaire["sections"].append(backend_section)
+        backend_section["questions"].append(backend_question)
     
-    # Generate TypeScript file
-    generate_typescript_file(backend_questionnaire)
+    # Remove conditionalLogic if None
+    if not backend_section["conditionalLogic"]:
+        del backend_section["conditionalLogic"]
+    
+    return backend_section
 
 def map_question_type(question_type: str) -> str:
     """Map question type to backend enum"""
@@ -133,15 +171,11 @@ def convert_conditional_logic(logic):
     
     return backend_logic if backend_logic else None
 
-def generate_typescript_file(questionnaire):
-    """Generate the TypeScript file"""
-    
-    output_path = Path("backend/src/data/x12-270-271-complete.ts")
-    
-    # Generate TypeScript content
-    ts_content = f'''import {{ Questionnaire, QuestionType, ImplementationMode }} from '../types/questionnaire';
+def render_typescript(questionnaire, export_name="x12270271CompleteQuestionnaire", types_import="../types/questionnaire"):
+    """TypeScript module source exporting one backend questionnaire"""
+    ts_content = f'''import {{ Questionnaire, QuestionType, ImplementationMode }} from '{types_import}';
 
-export const x12270271CompleteQuestionnaire: Questionnaire = {{
+export const {export_name}: Questionnaire = {{
   id: '{questionnaire["id"]}',
   title: '{questionnaire["title"]}',
   description: '{questionnaire["description"]}',
@@ -156,113 +190,122 @@ export const x12270271CompleteQuestionnaire: Questionnaire = {{
     
     # Add sections
     for i, section in enumerate(questionnaire["sections"]):
-        ts_content += f'''    {{
+        ts_content += render_section(section, last=i == len(questionnaire["sections"]) - 1)
+    
+    ts_content += '''  ]
+};
+'''
+    return ts_content
+
+def generate_typescript_file(questionnaire, output_path=BACKEND_PATH):
+    """Generate the TypeScript file"""
+    
+    # Write the file
+    with open(output_path, 'w') as f:
+        f.write(render_typescript(questionnaire))
+    
+    print(f"✅ Generated TypeScript questionnaire: {output_path}")
+    print(f"📊 {len(questionnaire['sections'])} sections")
+    print(f"📋 {sum(len(s['questions']) for s in questionnaire['sections'])} total questions")
+
+def render_section(section, last=False):
+    """TypeScript fragment for one backend section, from its opening brace to its closing brace line"""
+    ts_content = f'''    {{
       id: '{section["id"]}',
       title: '{section["title"]}',
       description: '{section["description"]}',
       order: {section["order"]},'''
+    
+    # Add conditional logic if present
+    if section.get("conditionalLogic"):
+        logic = section["conditionalLogic"]
+        ts_content += f'''
+      conditionalLogic: {{'''
         
-        # Add conditional logic if present
-        if section.get("conditionalLogic"):
-            logic = section["conditionalLogic"]
+        if logic.get("dependsOn"):
             ts_content += f'''
-      conditionalLogic: {{'''
-            
-            if logic.get("dependsOn"):
-                ts_content += f'''
         dependsOn: '{logic["dependsOn"]}','''
-            
-            if logic.get("showWhen"):
-                show_when = "', '".join(logic["showWhen"])
-                ts_content += f'''
+        
+        if logic.get("showWhen"):
+            show_when = "', '".join(logic["showWhen"])
+            ts_content += f'''
         showWhen: ['{show_when}'],'''
-            
-            if logic.get("requiredModes"):
-                modes = ", ".join(logic["requiredModes"])
-                ts_content += f'''
+        
+        if logic.get("requiredModes"):
+            modes = ", ".join(logic["requiredModes"])
+            ts_content += f'''
         requiredModes: [{modes}],'''
-            
-            ts_content += '''
-      },'''
         
-        ts_content += f'''
+        ts_content += '''
+      },'''
+    
+    ts_content += f'''
       questions: [
 '''
-        
-        # Add all questions
-        for j, question in enumerate(section["questions"]):
-            ts_content += f'''        {{
+    
+    # Add all questions
+    for j, question in enumerate(section["questions"]):
+        ts_content += f'''        {{
           id: '{question["id"]}',
           type: {question["type"]},
           title: '{escape_string(question["title"])}',
           description: '{escape_string(question.get("description", ""))}',
           required: {str(question["required"]).lower()},
           attachmentRequired: false'''
-            
-            # Add options if present
-            if question.get("options"):
-                ts_content += f''',
+        
+        # Add options if present
+        if question.get("options"):
+            ts_content += f''',
           options: [
 '''
-                for option in question["options"]:
-                    ts_content += f'''            {{ value: '{option["value"]}', label: '{escape_string(option["label"])}' }},
+            for option in question["options"]:
+                ts_content += f'''            {{ value: '{option["value"]}', label: '{escape_string(option["label"])}' }},
 '''
-                ts_content += '''          ]'''
-            
-            # Add validation if present
-            if question.get("validation"):
-                validation = question["validation"]
-                ts_content += f''',
+            ts_content += '''          ]'''
+        
+        # Add validation if present
+        if question.get("validation"):
+            validation = question["validation"]
+            ts_content += f''',
           validation: {{'''
-                
-                if validation.get("maxLength"):
-                    ts_content += f'''
+            
+            if validation.get("maxLength"):
+                ts_content += f'''
             maxLength: {validation["maxLength"]},'''
-                
-                if validation.get("pattern"):
-                    ts_content += f'''
+            
+            if validation.get("pattern"):
+                ts_content += f'''
             pattern: '{validation["pattern"]}','''
-                
-                ts_content += '''
-          }'''
             
-            # Add conditional logic if present
-            if question.get("conditionalLogic"):
-                logic = question["conditionalLogic"]
-                ts_content += f''',
+            ts_content += '''
+          }'''
+        
+        # Add conditional logic if present
+        if question.get("conditionalLogic"):
+            logic = question["conditionalLogic"]
+            ts_content += f''',
           conditionalLogic: {{
             dependsOn: '{logic["dependsOn"]}',
             showWhen: ['{("', '".join(logic["showWhen"]))}']
           }}'''
-            
-            # Add X12 field if present
-            if question.get("x12Field"):
-                x12 = question["x12Field"]
-                ts_content += f''',
+        
+        # Add X12 field if present
+        if question.get("x12Field"):
+            x12 = question["x12Field"]
+            ts_content += f''',
           x12Field: {{
             segment: '{x12.get("segment", "")}',
             description: '{escape_string(x12.get("description", ""))}'
           }}'''
-            
-            ts_content += f'''
-        }}{',' if j < len(section["questions"]) - 1 else ''}
-'''
         
-        ts_content += f'''      ]
-    }}{',' if i < len(questionnaire["sections"]) - 1 else ''}
+        ts_content += f'''
+        }}{',' if j < len(section["questions"]) - 1 else ''}
 '''
     
-    ts_content += '''  ]
-};
+    ts_content += f'''      ]
+    }}{'' if last else ','}
 '''
-    
-    # Write the file
-    with open(output_path, 'w') as f:
-        f.write(ts_content)
-    
-    print(f"✅ Generated TypeScript questionnaire: {output_path}")
-    print(f"📊 {len(questionnaire['sections'])} sections")
-    print(f"📋 {sum(len(s['questions']) for s in questionnaire['sections'])} total questions")
+    return ts_content
 
 def escape_string(text: str) -> str:
     """Escape string for TypeScript"""
@@ -270,5 +313,125 @@ def escape_string(text: str) -> str:
         return ""
     return text.replace("'", "\\'").replace('"', '\\"').replace('\n', '\\n')
 
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", str(text).lower()).strip("-")
+
+def find_catalog_questionnaires(paths):
+    """(payer, questionnaire path) pairs; a directory contributes every complete_questionnaire.json below it"""
+    found = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            # The payer is the directory holding the questionnaire, as in build_field_index.py
+            found.extend((q.parent.name, q) for q in sorted(path.rglob("complete_questionnaire.json")))
+        else:
+            found.append((path.parent.name, path))
+    return found
+
+def generate_catalog_module(payer, questionnaire_path, output_dir=CATALOG_DIR):
+    """Write one payer/version questionnaire module; returns its manifest entry"""
+    with open(questionnaire_path, 'r') as f:
+        questionnaire = json.load(f)
+    
+    errors = check_before_emit(questionnaire)
+    if errors:
+        raise ValueError(f"{questionnaire_path} failed schema validation: {'; '.join(errors)}")
+    
+    backend = build_backend_questionnaire(questionnaire)
+    module_id = f"{_slug(payer)}-v{_slug(backend['version'])}"
+    # The id is what the API looks questionnaires up by, so it has to be unique across payers
+    backend["id"] = module_id
+    ts_content = render_typescript(backend, export_name="questionnaire", types_import="../../types/questionnaire")
+    
+    with atomic_write(Path(output_dir) / f"{module_id}.ts") as f:
+        f.write(ts_content)
+    
+    return {
+        "id": module_id,
+        "payer": payer,
+        "version": backend["version"],
+        "title": backend["title"],
+        "transactionType": backend["transactionType"],
+        "module": module_id,
+        "hash": hashlib.sha256(ts_content.encode()).hexdigest()[:16],
+        "sectionCount": len(backend["sections"]),
+        "questionCount": sum(len(s["questions"]) for s in backend["sections"]),
+        "source": str(questionnaire_path),
+    }
+
+def render_manifest(entries):
+    """TypeScript manifest module; small enough to load on first catalog access"""
+    return f'''// Generated by scripts/convert_questionnaire_to_backend.py --catalog. Do not edit.
+import {{ QuestionnaireManifestEntry }} from '../../services/questionnaireCatalog';
+
+export const manifest: QuestionnaireManifestEntry[] = {json.dumps(entries, indent=2)};
+'''
+
+def previous_catalog_modules(output_dir):
+    """Module names listed in the manifest a previous --catalog run wrote to output_dir"""
+    manifest_path = Path(output_dir) / f"{MANIFEST_MODULE}.ts"
+    if not manifest_path.exists():
+        return set()
+    match = re.search(r"QuestionnaireManifestEntry\[\] = (.*);\s*$", manifest_path.read_text(), re.DOTALL)
+    try:
+        entries = json.loads(match.group(1)) if match else []
+    except ValueError:
+        return set()
+    # Module names are slugs; anything else did not come from this script
+    return {e["module"] for e in entries if isinstance(e, dict) and re.fullmatch(r"[a-z0-9-]+", str(e.get("module", "")))}
+
+def generate_catalog(paths, output_dir=CATALOG_DIR, workers=None):
+    """Convert every payer questionnaire in parallel and write the manifest; returns the manifest entries"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    previous_modules = previous_catalog_modules(output_dir)
+    questionnaires = find_catalog_questionnaires(paths)
+    
+    with ProcessPoolExecutor(max_workers=workers or min(len(questionnaires), os.cpu_count() or 1) or 1) as pool:
+        futures = [pool.submit(generate_catalog_module, payer, path, output_dir) for payer, path in questionnaires]
+        entries = [future.result() for future in futures]
+    
+    duplicates = {e["id"] for e in entries if sum(other["id"] == e["id"] for other in entries) > 1}
+    if duplicates:
+        raise ValueError(f"Several questionnaires map to the same payer/version: {', '.join(sorted(duplicates))}")
+    entries.sort(key=lambda e: (e["payer"], e["version"]))
+    
+    # Modules the previous manifest listed but this one does not can never be loaded; other files are left alone
+    for module in sorted(previous_modules - {e["module"] for e in entries}):
+        stale = output_dir / f"{module}.ts"
+        if stale.exists():
+            stale.unlink()
+            print(f"🗑️  Removed stale module: {stale}")
+    
+    with atomic_write(output_dir / f"{MANIFEST_MODULE}.ts") as f:
+        f.write(render_manifest([{k: v for k, v in e.items() if k != "source"} for e in entries]))
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert questionnaires to backend TypeScript modules")
+    parser.add_argument("--catalog", nargs="+", metavar="PATH",
+                        help="Questionnaire JSONs or directories of payer outputs to convert into per-payer modules")
+    parser.add_argument("--output-dir", default=str(CATALOG_DIR), help="Directory for catalog modules and manifest")
+    parser.add_argument("--workers", "-w", type=int, help="Parallel conversions (default: CPU count)")
+    
+    args = parser.parse_args()
+    
+    if not args.catalog:
+        convert_questionnaire_to_backend()
+        return
+    
+    if not find_catalog_questionnaires(args.catalog):
+        print(f"❌ No questionnaires found in: {', '.join(args.catalog)}")
+        sys.exit(1)
+    
+    try:
+        entries = generate_catalog(args.catalog, args.output_dir, args.workers)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Catalog generation failed: {e}")
+        sys.exit(1)
+    
+    for entry in entries:
+        print(f"✅ {entry['id']}: {entry['sectionCount']} sections, {entry['questionCount']} questions ({entry['hash']})")
+    print(f"📚 {len(entries)} questionnaire modules + manifest in {args.output_dir}")
+
 if __name__ == "__main__":
-    convert_questionnaire_to_backend()
+    main()
@@ -9,6 +9,8 @@ the PDF structure with Trading Partner and Availity contact categories.
 import json
 from pathlib import Path
 
+from align_form_versions import load_field_alignment
+
 def create_proper_contact_structure():
     """Create proper contact structure matching the PDF"""
 
@@ -29,6 +31,10 @@ def create_proper_contact_structure():
         "AVName3", "AVPhone3", "AVEmail3", "AVName4", "AVPhone4", "AVEmail4"
     ]
 
+    # Follow fields renamed in a revised PDF (built by align_form_versions.py)
+    renames = load_field_alignment()
+    contact_field_names = [renames.get(name, name) for name in contact_field_names]
+
     # Update sections for contact fields
     for field_name in contact_field_names:
         if field_name in raw_fields:
@@ -131,6 +137,9 @@ def create_proper_contact_structure():
     
     # Create questions for each contact type
     for contact_type in contact_types:
+        for key in ("name_field", "phone_field", "email_field"):
+            contact_type[key] = renames.get(contact_type[key], contact_type[key])
+        
         # Add a section header (as a display-only question)
         contact_section["questions"].append({
             "id": f"{contact_type['id']}-header",
@@ -11,14 +11,16 @@ This script extracts all form fields from a PDF document including:
 - Validation rules
 
 Usage:
-    python extract_pdf_fields.py <pdf_file> [--output <output_file>]
+    python extract_pdf_fields.py <pdf_file> [--output <output_file>] [--html <report_dir>]
 """
 
 import sys
 import json
 import argparse
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
+
+from report_writer import DEFAULT_PAGE_SIZE, ReportSection, write_html_report, write_markdown_report
 
 try:
     import PyPDF2
@@ -353,48 +355,62 @@ class PDFFieldExtractor:
     
     def generate_markdown_report(self, fields: Dict[str, Any]) -> str:
         """Generate a comprehensive markdown report of all fields"""
-        report = []
-        report.append("# PDF Form Fields Analysis")
-        report.append(f"\n**Source:** {self.pdf_path.name}")
-        report.append(f"**Total Fields:** {len(fields)}")
-        report.append(f"**Generated:** {self._get_timestamp()}")
-        
-        # Group fields by type
-        by_type = {}
-        for field in fields.values():
-            field_type = field.get("type", "unknown")
-            if field_type not in by_type:
-                by_type[field_type] = []
-            by_type[field_type].append(field)
-        
-        report.append("\n## Field Summary by Type")
-        for field_type, type_fields in by_type.items():
-            report.append(f"- **{field_type.title()}:** {len(type_fields)} fields")
-        
-        # Detailed field listing
-        report.append("\n## Detailed Field Information")
+        lines = list(self.report_header(fields))
+        for section in self.report_sections(fields):
+            lines.extend(section.heading)
+            for entry in section.entries:
+                lines.extend(entry)
+        return "\n".join(lines)
+    
+    def report_header(self, fields: Dict[str, Any]) -> List[str]:
+        return [
+            "# PDF Form Fields Analysis",
+            "",
+            f"**Source:** {self.pdf_path.name}",
+            f"**Total Fields:** {len(fields)}",
+            f"**Generated:** {self._get_timestamp()}",
+        ]
+    
+    def report_sections(self, fields: Dict[str, Any]) -> List[ReportSection]:
+        """Report sections for the streaming writers; field entries are generated lazily"""
+        def summary() -> Iterator[List[str]]:
+            # Count fields by type
+            by_type: Dict[str, int] = {}
+            for field in fields.values():
+                field_type = field.get("type", "unknown")
+                by_type[field_type] = by_type.get(field_type, 0) + 1
+            yield [f"- **{field_type.title()}:** {count} fields" for field_type, count in by_type.items()]
         
-        for field_name, field in sorted(fields.items()):
-            report.append(f"\n### {field_name}")
-            report.append(f"- **Type:** {field.get('type', 'unknown')}")
-            report.append(f"- **Required:** {'Yes' if field.get('required') else 'No'}")
-            report.append(f"- **Read-only:** {'Yes' if field.get('readonly') else 'No'}")
-            
-            if field.get('value'):
-                report.append(f"- **Default Value:** `{field['value']}`")
-            
-            if field.get('page'):
-                report.append(f"- **Page:** {field['page']}")
-            
-            if field.get('options'):
-                report.append("- **Options:**")
-                for option in field['options']:
-                    report.append(f"  - `{option['value']}`: {option['label']}")
-            
-            if field.get('flags'):
-                report.append(f"- **Flags:** {field['flags']} (binary: {bin(field['flags'])})")
+        def details() -> Iterator[List[str]]:
+            for field_name in sorted(fields):
+                field = fields[field_name]
+                entry = [
+                    "",
+                    f"### {field_name}",
+                    f"- **Type:** {field.get('type', 'unknown')}",
+                    f"- **Required:** {'Yes' if field.get('required') else 'No'}",
+                    f"- **Read-only:** {'Yes' if field.get('readonly') else 'No'}",
+                ]
+                
+                if field.get('value'):
+                    entry.append(f"- **Default Value:** `{field['value']}`")
+                
+                if field.get('page'):
+                    entry.append(f"- **Page:** {field['page']}")
+                
+                if field.get('options'):
+                    entry.append("- **Options:**")
+                    for option in field['options']:
+                        entry.append(f"  - `{option['value']}`: {option['label']}")
+                
+                if field.get('flags'):
+                    entry.append(f"- **Flags:** {field['flags']} (binary: {bin(field['flags'])})")
+                yield entry
         
-        return "\n".join(report)
+        return [
+            ReportSection("Field Summary by Type", ["", "## Field Summary by Type"], summary()),
+            ReportSection("Detailed Field Information", ["", "## Detailed Field Information"], details()),
+        ]
     
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
@@ -408,9 +424,16 @@ def main():
     parser.add_argument("--output", "-o", help="Output file (default: fields_extracted.md)")
     parser.add_argument("--format", choices=["markdown", "json"], default="markdown", 
                        help="Output format")
+    parser.add_argument("--html", help="Also write a paginated HTML report to this directory")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                       help="Fields per HTML report page")
     
     args = parser.parse_args()
     
+    if args.page_size < 1:
+        print("Error: --page-size must be at least 1")
+        sys.exit(1)
+    
     if not Path(args.pdf_file).exists():
         print(f"Error: PDF file not found: {args.pdf_file}")
         sys.exit(1)
@@ -431,11 +454,14 @@ def main():
             json.dump(fields, f, indent=2, ensure_ascii=False)
         print(f"JSON output saved to: {output_file}")
     else:
-        report = extractor.generate_markdown_report(fields)
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(report)
+        write_markdown_report(output_file, extractor.report_header(fields), extractor.report_sections(fields))
         print(f"Markdown report saved to: {output_file}")
     
+    if args.html:
+        index = write_html_report(args.html, "PDF Form Fields Analysis", extractor.report_header(fields),
+                                  extractor.report_sections(fields), args.page_size)
+        print(f"HTML report saved to: {index}")
+    
     print(f"\nExtracted {len(fields)} fields successfully!")
 
 
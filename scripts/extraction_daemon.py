@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Warm Extraction Daemon
+
+This script runs a long-lived local extraction service so each job skips
+Python startup, PyMuPDF/PyPDF2 imports and pattern-table construction:
+- Worker processes are warmed once (imports, compiled X12 patterns)
+- Bounded worker pool; excess jobs are rejected with 503 instead of queueing forever
+- Stages: AdvancedPDFExtractor ("extract"), analyze_pdf_form_controls ("controls")
+  and QuestionnaireGenerator ("questionnaire")
+- Results are streamed back as newline-delimited JSON as each stage finishes
+
+Usage:
+    python extraction_daemon.py [--host 127.0.0.1] [--port 8765] [--workers 4] [--max-pending 16]
+
+API:
+    GET  /health
+    POST /jobs    {"pdf_path": "/path/form.pdf", "stages": ["extract", "controls", "questionnaire"]}
+    POST /jobs?stages=extract,controls   (raw application/pdf body, e.g. straight from an upload)
+
+Example:
+    curl -N -X POST localhost:8765/jobs -d '{"pdf_path": "form.pdf"}'
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import threading
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Any
+from urllib.parse import urlparse, parse_qs
+
+ALL_STAGES = ["extract", "controls", "questionnaire"]
+
+
+def _warm_worker():
+    """Process initializer: pay imports and pattern compilation once per worker"""
+    global AdvancedPDFExtractor, analyze_pdf_form_controls, QuestionnaireGenerator
+
+    import fitz  # noqa: F401
+    try:
+        import PyPDF2  # noqa: F401
+    except ImportError:
+        pass
+
+    with redirect_stdout(io.StringIO()):
+        from advanced_pdf_extractor import AdvancedPDFExtractor
+        from analyze_form_controls import analyze_pdf_form_controls
+        from generate_complete_questionnaire import QuestionnaireGenerator
+
+        AdvancedPDFExtractor(__file__)._get_compiled_x12_patterns()
+
+
+def run_extract_stage(pdf_path: str) -> Dict[str, Any]:
+    with redirect_stdout(io.StringIO()):
+        extractor = AdvancedPDFExtractor(pdf_path)
+        fields = extractor.extract_fields_comprehensive()
+        return {
+            "fields": {name: asdict(field) for name, field in fields.items()},
+            "sections": extractor.sections,
+            "questionnaire_structure": extractor.generate_questionnaire_structure(),
+        }
+
+
+def run_controls_stage(pdf_path: str) -> Dict[str, Any]:
+    with redirect_stdout(io.StringIO()):
+        analysis = analyze_pdf_form_controls(pdf_path, write_report=False)
+    if analysis is None:
+        raise RuntimeError("Form control analysis failed")
+    return analysis
+
+
+def run_questionnaire_stage(fields_data: Dict[str, Any]) -> Dict[str, Any]:
+    with redirect_stdout(io.StringIO()):
+        return QuestionnaireGenerator().generate_complete_questionnaire(fields_data, save=False)
+
+
+class ExtractionService:
+    """Bounded, warm process pool running extraction jobs stage by stage"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.jobs_started = 0
+        self.jobs_running = 0
+        self.lock = threading.Lock()
+        # Start and warm every worker before the first job arrives
+        for future in [self.pool.submit(time.sleep, 0) for _ in range(workers)]:
+            future.result()
+
+    def try_acquire(self) -> bool:
+        if not self.slots.acquire(blocking=False):
+            return False
+        with self.lock:
+            self.jobs_started += 1
+            self.jobs_running += 1
+        return True
+
+    def release(self):
+        with self.lock:
+            self.jobs_running -= 1
+        self.slots.release()
+
+    def run_job(self, pdf_path: str, stages: List[str]):
+        """Yield one event per stage as soon as it finishes"""
+        started = time.perf_counter()
+        pending = {}
+        if "extract" in stages or "questionnaire" in stages:
+            pending[self.pool.submit(run_extract_stage, pdf_path)] = "extract"
+        if "controls" in stages:
+            pending[self.pool.submit(run_controls_stage, pdf_path)] = "controls"
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = pending.pop(future)
+                event = {"event": "stage", "stage": stage,
+                         "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+                try:
+                    result = future.result()
+                except Exception as e:
+                    event.update({"status": "failed", "error": str(e)})
+                    yield event
+                    continue
+
+                if stage == "extract" and "questionnaire" in stages:
+                    pending[self.pool.submit(run_questionnaire_stage, result["fields"])] = "questionnaire"
+                if stage in stages:
+                    event.update({"status": "completed", "result": result})
+                    yield event
+
+        yield {"event": "done", "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+
+class ExtractionRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    service: ExtractionService = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, payload: Dict[str, Any]):
+        data = (json.dumps(payload, default=str) + "\n").encode()
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self._send_json(404, {"success": False, "error": "Not found"})
+            return
+        service = self.service
+        self._send_json(200, {
+            "success": True,
+            "data": {
+                "status": "operational",
+                "workers": service.workers,
+                "maxPending": service.max_pending,
+                "jobsRunning": service.jobs_running,
+                "jobsStarted": service.jobs_started,
+            }
+        })
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/jobs":
+            self._send_json(404, {"success": False, "error": "Not found"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        query = parse_qs(url.query)
+        upload_path = None
+
+        try:
+            if self.headers.get("Content-Type", "").startswith("application/pdf"):
+                handle, upload_path = tempfile.mkstemp(suffix=".pdf")
+                with os.fdopen(handle, 'wb') as f:
+                    f.write(body)
+                pdf_path = upload_path
+                stages = query.get("stages", [",".join(ALL_STAGES)])[0].split(",")
+            else:
+                try:
+                    request = json.loads(body or b"{}")
+                except ValueError:
+                    self._send_json(400, {"success": False, "error": "Request body must be JSON or a PDF"})
+                    return
+                if not isinstance(request, dict):
+                    self._send_json(400, {"success": False, "error": "Request body must be a JSON object"})
+                    return
+                pdf_path = request.get("pdf_path", "")
+                stages = request.get("stages", ALL_STAGES)
+
+            if not isinstance(stages, list) or not isinstance(pdf_path, str):
+                self._send_json(400, {"success": False, "error": "stages must be a list and pdf_path a string"})
+                return
+            unknown = [stage for stage in stages if stage not in ALL_STAGES]
+            if unknown or not stages:
+                self._send_json(400, {"success": False, "error": f"Unknown stages: {unknown}"})
+                return
+            if not pdf_path or not Path(pdf_path).exists():
+                self._send_json(400, {"success": False, "error": f"PDF file not found: {pdf_path}"})
+                return
+
+            if not self.service.try_acquire():
+                self._send_json(503, {"success": False, "error": "Extraction workers are busy, retry later"})
+                return
+
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                self._write_chunk({"event": "accepted", "pdf": Path(pdf_path).name, "stages": stages})
+                for event in self.service.run_job(pdf_path, stages):
+                    self._write_chunk(event)
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                self.service.release()
+        finally:
+            # Uploaded PDFs are removed however the request ends, including rejected ones
+            if upload_path:
+                os.unlink(upload_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the warm PDF extraction daemon")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (keep local)")
+    parser.add_argument("--port", "-p", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 2, help="Worker processes")
+    parser.add_argument("--max-pending", type=int, default=16, help="Maximum jobs in flight before 503")
+
+    args = parser.parse_args()
+
+    # Workers import the extraction scripts that live next to this file
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+    print(f"🔥 Warming {args.workers} extraction workers...")
+    started = time.perf_counter()
+    ExtractionRequestHandler.service = ExtractionService(args.workers, args.max_pending)
+    print(f"✅ Workers ready in {time.perf_counter() - started:.1f}s")
+
+    server = ThreadingHTTPServer((args.host, args.port), ExtractionRequestHandler)
+    print(f"🚀 Extraction daemon listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        server.server_close()
+        ExtractionRequestHandler.service.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
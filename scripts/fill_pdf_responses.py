@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Bulk PDF Fill-Back Renderer
+
+This script writes questionnaire responses back into the payer's original
+PDF form, one filled PDF per response:
+- The template is parsed once; its widget map (page, xref, name, type,
+  on-state) is shared with every worker
+- Widget names are mapped to question ids with the generator's id rules
+  (_sanitize_id, contact originalField, implementation mode checkboxes)
+- Responses are filled in parallel worker processes, streamed from the input
+  with a bounded number in flight
+- Each output starts as a byte copy of the template and is saved
+  incrementally, so only the changed widgets are written
+
+Usage:
+    python fill_pdf_responses.py <template.pdf> <responses.jsonl|response.json> [--output-dir filled_pdfs] [--workers 4]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from generate_complete_questionnaire import QuestionnaireGenerator
+from validate_x12_batch import extract_answers
+
+DEFAULT_QUESTIONNAIRE = "extracted_fields/complete_questionnaire.json"
+
+# Widgets whose question id does not follow _sanitize_id (hand-written ids in
+# generate_complete_questionnaire.py); repeated per-mode blocks map their first copy
+EXPLICIT_WIDGETS = {
+    "Organization name": "organization-name",
+    "Required return date": "required-return-date",
+    "ISA06_270_define value": "isa06-270-custom",
+    "ISA06_271_define value": "isa06-271-custom",
+    "ISA07_271_define value": "isa07-271-custom",
+    "ISA08_270_define value": "isa08-270-custom",
+    "Availitys standard is to send uppercase characters Is this acceptable": "uppercase-characters-acceptable",
+    "A space is part of the X12 basic character set Does your system accept spaces": "x12-basic-character-set",
+    "Do you accept characters from the X12 extended character set": "x12-extended-character-set",
+    "Patient ID_12": "patient-id-formatting-requirements",
+    "Patient last name requirements_13": "patient-last-name-requirements",
+    "Patient first name requirements_13": "patient-first-name-requirements",
+    "Date of birth requirements_13": "date-of-birth-requirements",
+    "Gender code requirements_13": "gender-code-requirements",
+    "Provider Express Entry_12_requirements": "provider-express-entry-requirements",
+    "Provider Identifiers NM108 requirements_12": "provider-identifiers-nm108-requirements",
+    "Provider Identifiers NM109 requirements_12": "provider-identifiers-nm109-requirements",
+    "Can you support all service type codes": "support-all-service-type-codes",
+    "In Availity Essentials providers select payers by first selecting their state in a dropdown list Is your":
+        "availity-essentials-state-dropdown",
+    "Availity supports XML envelope structure Do you require an XML wrapper": "xml-envelope-structure",
+    "Do you have differing connectivity requirements for each state?": "differing-connectivity-by-state",
+    "What are your system's hours of availability?": "system-hours-availability",
+    "How many continuous threads can you support?": "continuous-threads-support",
+    "Please describe your production approval process": "production-approval-process",
+    "Will your test environment remain available?": "test-environment-continue-available",
+    "Does your organization have specific testing requirements": "specific-testing-requirements",
+    "Does your organization have specific testing requirements? If Yes, please specify:":
+        "specific-testing-requirements-details",
+    "Do you exclude any E&B benefit types from testing?": "exclude-eb-benefit-types-testing",
+    "4.Do you exclude any E&B benefit types from testing?": "excluded-eb-benefit-types-specify",
+    "Do test files require valid provider data": "test-files-valid-provider-data",
+    "Do test files require valid membership records?": "test-files-valid-membership",
+    "Do you have a designated payer ID you would like Availity to use in testing": "designated-payer-id-testing",
+    "If Yes, please specify (please include a separate attachment if you require different IDs for different lines "
+    "of business):": "designated-payer-id-specify",
+    "Do you have a minimum or maximum number of test transactions you will accept": "min-max-test-transactions",
+    "Do you have a minimum or maximum number of test transactions you will accept?":
+        "min-max-test-transactions-specify",
+    "Do you have any other testing or test transaction restrictions": "other-testing-restrictions",
+    "Do you have any other testing or test transaction restrictions?": "other-testing-restrictions-specify",
+    "When will you be prepared to receive a test file?": "test-file-ready-date",
+    "Please define your naming convention for inbound files": "naming-convention-inbound-files",
+    "Does your organization have a separate test environment for EDI transactions": "separate-test-environment-edi",
+    "Does your organization have a separate test environment for EDI transactions? If Yes please describe":
+        "separate-test-environment-describe",
+}
+
+# Mode checkboxes on the PDF are options of one radio question in the questionnaire
+IMPLEMENTATION_MODE_WIDGETS = {
+    "Real-time web": "real_time_web",
+    "Real-time B2B": "real_time_b2b",
+    "EDI batch": "edi_batch",
+}
+
+CHECKED_VALUES = {"yes", "true", "on", "checked", "x", "1"}
+
+# PyMuPDF widget type codes
+WIDGET_CHECKBOX = fitz.PDF_WIDGET_TYPE_CHECKBOX
+WIDGET_COMBOBOX = fitz.PDF_WIDGET_TYPE_COMBOBOX
+WIDGET_LISTBOX = fitz.PDF_WIDGET_TYPE_LISTBOX
+WIDGET_RADIOBUTTON = fitz.PDF_WIDGET_TYPE_RADIOBUTTON
+
+
+def build_widget_map(doc) -> List[Dict[str, Any]]:
+    """Every widget of the template with what is needed to fill it"""
+    widgets = []
+    for page_num in range(len(doc)):
+        for widget in doc[page_num].widgets():
+            on_state = None
+            if widget.field_type in (WIDGET_CHECKBOX, WIDGET_RADIOBUTTON):
+                try:
+                    on_state = widget.on_state()
+                except Exception:
+                    # Buttons without appearance states
+                    pass
+            widgets.append({
+                "page": page_num,
+                "xref": widget.xref,
+                "name": widget.field_name or "",
+                "type": widget.field_type,
+                "on_state": on_state if isinstance(on_state, str) else None,
+            })
+    return widgets
+
+
+def map_widgets_to_questions(widget_names: List[str],
+                             questionnaire: Optional[Dict[str, Any]] = None) -> Dict[str, Tuple[str, Optional[str]]]:
+    """Widget name → (question id, option value for option checkboxes)"""
+    sanitize_id = QuestionnaireGenerator()._sanitize_id
+    original_fields = {}
+    question_ids = None
+    if questionnaire:
+        question_ids = set()
+        for section in questionnaire.get("sections", []):
+            for question in section.get("questions", []):
+                question_ids.add(question["id"])
+                if question.get("originalField"):
+                    original_fields[question["originalField"]] = question["id"]
+
+    field_map = {}
+    for name in widget_names:
+        if name in IMPLEMENTATION_MODE_WIDGETS:
+            field_map[name] = ("implementation-mode-selection", IMPLEMENTATION_MODE_WIDGETS[name])
+            continue
+        question_id = original_fields.get(name) or EXPLICIT_WIDGETS.get(name) or sanitize_id(name)
+        if question_ids is None or question_id in question_ids:
+            field_map[name] = (question_id, None)
+    return field_map
+
+
+def widget_fill_value(widget_type: int, on_state: Optional[str], answer: Any, option: Optional[str]) -> Any:
+    """Value to assign to a widget for an answer, or None to leave it untouched"""
+    if answer is None or answer == "":
+        return None
+    answers = answer if isinstance(answer, list) else [answer]
+
+    if widget_type in (WIDGET_CHECKBOX, WIDGET_RADIOBUTTON):
+        if option is not None:
+            return option in answers
+        if widget_type == WIDGET_RADIOBUTTON and on_state:
+            # Radio kids are named like "Yes_2" / "No_3"
+            choice = on_state.split("_")[0].lower()
+            return any(str(value).lower() == choice for value in answers) or None
+        return any(str(value).lower() in CHECKED_VALUES for value in answers)
+
+    if widget_type in (WIDGET_COMBOBOX, WIDGET_LISTBOX):
+        return str(answers[0])
+    if isinstance(answer, list):
+        return ", ".join(str(value) for value in answer)
+    if isinstance(answer, dict):
+        return json.dumps(answer)
+    return str(answer)
+
+
+# Worker state, set once per process by _init_worker
+_template: bytes = b""
+_widgets: List[Dict[str, Any]] = []
+_field_map: Dict[str, Tuple[str, Optional[str]]] = {}
+_output_dir: Path = Path(".")
+
+
+def _init_worker(template: bytes, widgets: List[Dict[str, Any]],
+                 field_map: Dict[str, Tuple[str, Optional[str]]], output_dir: str):
+    global _template, _widgets, _field_map, _output_dir
+    _template, _widgets, _field_map, _output_dir = template, widgets, field_map, Path(output_dir)
+
+
+def output_file_name(response_id: str) -> str:
+    """File name for a response id; ids that are not plain names get a hash suffix so they stay unique"""
+    stem = re.sub(r'[^\w.-]', '_', response_id).lstrip('.')
+    if stem != response_id or not stem:
+        stem = f"{stem or 'response'}-{hashlib.sha1(response_id.encode()).hexdigest()[:8]}"
+    return f"{stem}.pdf"
+
+
+def fill_response(job: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Fill one response into a copy of the template"""
+    response_id, answers = job
+    output_path = _output_dir / output_file_name(response_id)
+    temp_path = f"{output_path}.tmp"
+    if output_path.resolve().parent != _output_dir.resolve():
+        return {"id": response_id, "status": "failed", "error": "output path outside the output directory"}
+    try:
+        output_path.write_bytes(_template)
+        filled = 0
+        skipped = []
+        with fitz.open(output_path) as doc:
+            pages = {}
+            for entry in _widgets:
+                mapping = _field_map.get(entry["name"])
+                if mapping is None:
+                    continue
+                question_id, option = mapping
+                value = widget_fill_value(entry["type"], entry["on_state"], answers.get(question_id), option)
+                if value is None:
+                    continue
+                if entry["page"] not in pages:
+                    pages[entry["page"]] = doc[entry["page"]]
+                try:
+                    widget = pages[entry["page"]].load_widget(entry["xref"])
+                    widget.field_value = value
+                    widget.update()
+                    filled += 1
+                except Exception as e:
+                    skipped.append(f"{entry['name']}: {e}")
+
+            incremental = doc.can_save_incrementally()
+            if incremental:
+                doc.saveIncr()
+            else:
+                doc.save(temp_path, garbage=0, deflate=False)
+        if not incremental:
+            os.replace(temp_path, output_path)
+        return {"id": response_id, "status": "filled", "widgets": filled, "skipped": skipped,
+                "path": str(output_path)}
+    except Exception as e:
+        return {"id": response_id, "status": "failed", "error": str(e)}
+
+
+def iter_responses(responses_path: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(response id, answers) from a JSONL file, a JSON list or a single response record"""
+    with open(responses_path, 'r') as f:
+        if responses_path.endswith(".jsonl"):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            data = json.load(f)
+            records = data if isinstance(data, list) else [data]
+
+        for index, record in enumerate(records, 1):
+            response_id = str(record.get("responseId") or record.get("id") or f"response_{index:06d}")
+            yield response_id, extract_answers(record)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill questionnaire responses back into the payer PDF")
+    parser.add_argument("template", help="Original (blank) payer PDF")
+    parser.add_argument("responses", help="Responses as JSONL, a JSON list or a single response record")
+    parser.add_argument("--questionnaire", "-q", default=DEFAULT_QUESTIONNAIRE,
+                        help="Generated questionnaire (for question ids and contact mappings)")
+    parser.add_argument("--output-dir", "-o", default="filled_pdfs", help="Output directory")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 2, help="Worker processes")
+
+    args = parser.parse_args()
+
+    for path in (args.template, args.responses):
+        if not Path(path).exists():
+            print(f"❌ File not found: {path}")
+            sys.exit(1)
+
+    from validate_responses import map_bounded
+
+    template = Path(args.template).read_bytes()
+    with fitz.open(stream=template, filetype="pdf") as doc:
+        widgets = build_widget_map(doc)
+    questionnaire = None
+    if Path(args.questionnaire).exists():
+        with open(args.questionnaire, 'r') as f:
+            questionnaire = json.load(f)
+    field_map = map_widgets_to_questions([entry["name"] for entry in widgets], questionnaire)
+    print(f"📄 Template: {len(widgets)} widgets, {len(field_map)} mapped to questions")
+
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    filled = failed = 0
+    skipped_widgets = set()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(template, widgets, field_map, args.output_dir)) as pool:
+        # Bounded window: responses are read as workers free up, not all queued up front
+        for result in map_bounded(pool, fill_response, iter_responses(args.responses), 16 * args.workers):
+            if result["status"] == "filled":
+                filled += 1
+                skipped_widgets.update(result["skipped"])
+            else:
+                failed += 1
+                print(f"   ❌ {result['id']}: {result['error']}")
+    elapsed = time.perf_counter() - started
+
+    for message in sorted(skipped_widgets):
+        print(f"   ⚠️  Could not fill {message}")
+    print(f"✅ Filled {filled} PDFs ({failed} failed) in {elapsed:.1f}s "
+          f"— {filled / elapsed if elapsed else 0:.1f} documents/s")
+    print(f"💾 Saved to: {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
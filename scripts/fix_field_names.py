@@ -10,6 +10,12 @@ import json
 import re
 from pathlib import Path
 
+from align_form_versions import load_field_alignment
+from build_label_index import load_label_index
+
+# Minimum trigram score for taking a title from the label index
+LABEL_INDEX_MIN_SCORE = 0.6
+
 def fix_field_names():
     """Fix field names to be user-readable"""
     
@@ -139,17 +145,38 @@ def fix_field_names():
         "test-environment-continue-available": "Will test environment remain available after production approval?"
     }
     
+    # Document text index (built by build_label_index.py) for fields without a mapping
+    label_index = load_label_index()
+    if label_index:
+        print(f"📚 Using label index built from {label_index.source}")
+
+    # Fields renamed in a revised PDF keep their mapping (built by align_form_versions.py)
+    previous_names = {new: old for old, new in load_field_alignment().items()}
+
+    label_titles = 0
+
     # Apply field name fixes
     for section in questionnaire["sections"]:
         for question in section["questions"]:
             original_id = question["id"]
+            mapping_key = original_id
+            if mapping_key not in field_name_mappings:
+                mapping_key = previous_names.get(question.get("originalField", original_id), original_id)
             
             # Check if we have a mapping for this field
-            if original_id in field_name_mappings:
-                question["title"] = field_name_mappings[original_id]
+            if mapping_key in field_name_mappings:
+                question["title"] = field_name_mappings[mapping_key]
             else:
                 # Apply general formatting rules
                 question["title"] = format_field_name(question["title"])
+                # The label index only names fields the rules leave as a bare widget name (Name1, AVName1)
+                if label_index and not is_readable_title(question["title"]):
+                    resolved = label_index.resolve_label(
+                        question.get("originalField", original_id), min_score=LABEL_INDEX_MIN_SCORE
+                    )
+                    if resolved:
+                        question["title"] = resolved
+                        label_titles += 1
     
     # Save the updated questionnaire
     with open(questionnaire_path, 'w') as f:
@@ -160,6 +187,8 @@ def fix_field_names():
     
     print("✅ Field names updated to be user-friendly!")
     print(f"📝 Updated {sum(len(s['questions']) for s in questionnaire['sections'])} field names")
+    if label_index:
+        print(f"📚 {label_titles} titles taken from the label index")
 
 def format_field_name(name: str) -> str:
     """Apply general formatting rules to make field names user-friendly"""
@@ -191,6 +220,10 @@ def format_field_name(name: str) -> str:
     
     return name
 
+def is_readable_title(title: str) -> bool:
+    """Formatted titles are words; a single token is still a raw widget name"""
+    return len(title.split()) > 1
+
 def regenerate_backend_questionnaire(questionnaire):
     """Regenerate the backend TypeScript file with updated names"""
     
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Bulk X12 270 Test File Generator
+
+This script generates realistic volumes of syntactically valid 270 requests
+driven by a payer's questionnaire answers:
+- Member IDs shaped by the patient ID formatting requirements
+- Service type codes from the service information answers
+- ISA06/ISA08/GS02/GS03 from the enveloping requirement answers
+- Member IDs, DOBs, NPIs and control numbers generated column-wise with NumPy
+- Streaming writer that splits output into batch files of a configurable size
+
+Usage:
+    python generate_270_test_files.py [--answers answers.json] [--count 1000000] [--per-file 50000] [--output-dir test_files]
+"""
+
+import re
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any
+
+import numpy as np
+
+from validate_x12_batch import load_answers
+
+DEFAULT_SENDER_ID = "030240928"
+DEFAULT_RECEIVER_ID = "6686CBAF-048001"
+DEFAULT_PAYER_NAME = "AETNA"
+DEFAULT_PAYER_ID = "60054"
+
+# Service type codes used when the payer supports all of them
+COMMON_SERVICE_TYPE_CODES = ["30", "1", "33", "35", "47", "48", "50", "86", "88", "98", "AL", "MH", "UC"]
+
+LAST_NAMES = np.array(["SMITH", "JOHNSON", "WILLIAMS", "BROWN", "JONES", "GARCIA", "MILLER", "DAVIS",
+                       "RODRIGUEZ", "MARTINEZ", "WILSON", "ANDERSON", "TAYLOR", "THOMAS", "MOORE", "DOE"])
+FIRST_NAMES = np.array(["JAMES", "MARY", "ROBERT", "PATRICIA", "JOHN", "JENNIFER", "MICHAEL", "LINDA",
+                        "DAVID", "ELIZABETH", "WILLIAM", "BARBARA", "RICHARD", "SUSAN", "JOSEPH", "JANE"])
+PROVIDER_NAMES = np.array(["GREEN VALLEY FAMILY CLINIC", "RIVERBEND INTERNAL MEDICINE", "LAKESIDE PEDIATRICS",
+                           "SUMMIT ORTHOPEDICS", "HARBOR VIEW HEALTH", "MAPLE STREET MEDICAL GROUP"])
+
+ALPHANUMERIC = np.array(list("ABCDEFGHJKLMNPQRSTUVWXYZ0123456789"))
+DIGITS = np.array(list("0123456789"))
+
+
+# "prefix W", "prefixed with 'AB'"; not "no prefix required" / "without prefix"
+PREFIX_PATTERN = re.compile(r'(?<!\bno )(?<!\bwithout )(?<!\bwithout a )\bprefix(?:ed)?(?:\s+with)?\s+["\']?([a-z0-9]+)')
+NO_PREFIX_PATTERN = re.compile(r'\b(?:no|without(?: a)?) prefix')
+PREFIX_NON_LITERALS = {"required", "needed", "is", "not", "none", "of", "must", "should", "may", "and", "or"}
+
+
+def resolve_generation_settings(answers: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn questionnaire answers into generation settings"""
+
+    def answer(question_id: str, default: str = "") -> str:
+        return str(answers.get(question_id, default) or default).strip()
+
+    def envelope_id(question_id: str, default: str) -> str:
+        value = answer(question_id)
+        if value == "custom":
+            value = answer(f"{question_id}-custom")
+        return value if value and value not in ("availity_defines", "01") else default
+
+    # Patient ID format, e.g. "Alphanumeric, 9 characters, prefix W"
+    id_requirements = answer("patient-id-formatting-requirements").lower()
+    length_match = re.search(r'(\d+)\s*(?:characters|chars|digits|positions)', id_requirements)
+    prefix_match = PREFIX_PATTERN.search(id_requirements)
+    if prefix_match and prefix_match.group(1) in PREFIX_NON_LITERALS:
+        prefix_match = None
+    numeric_only = "numeric" in id_requirements and "alphanumeric" not in id_requirements
+    # The "W" default is a letter, so numeric-only IDs get no default prefix
+    member_id_default_prefix = "" if numeric_only or NO_PREFIX_PATTERN.search(id_requirements) else "W"
+
+    if answer("support-all-service-type-codes").lower() == "yes":
+        service_types = COMMON_SERVICE_TYPE_CODES
+    else:
+        service_types = ["30"]
+
+    payer_id = DEFAULT_PAYER_ID
+    if answer("designated-payer-id-testing").lower() == "yes" and answer("designated-payer-id-specify"):
+        payer_id = answer("designated-payer-id-specify").split()[0]
+
+    return {
+        "sender_id": envelope_id("isa06-270", DEFAULT_SENDER_ID),
+        "receiver_id": envelope_id("isa08-270", DEFAULT_RECEIVER_ID),
+        "gs_sender": envelope_id("gs02-270", envelope_id("isa06-270", DEFAULT_SENDER_ID)),
+        "gs_receiver": envelope_id("gs03-270", envelope_id("isa08-270", DEFAULT_RECEIVER_ID)),
+        "member_id_prefix": prefix_match.group(1).upper() if prefix_match else member_id_default_prefix,
+        "member_id_length": int(length_match.group(1)) if length_match else 10,
+        "member_id_numeric": numeric_only,
+        "service_types": service_types,
+        "payer_id": payer_id,
+        "payer_name": DEFAULT_PAYER_NAME,
+    }
+
+
+def _random_strings(rng: np.random.Generator, alphabet: np.ndarray, count: int, length: int) -> np.ndarray:
+    """Generate `count` random strings of `length` characters from `alphabet`"""
+    if length <= 0:
+        return np.full(count, "", dtype="<U1")
+    chars = alphabet[rng.integers(0, len(alphabet), size=(count, length))]
+    return chars.view(f"<U{length}").reshape(count)
+
+
+def generate_member_ids(rng: np.random.Generator, count: int, settings: Dict[str, Any]) -> np.ndarray:
+    prefix = settings["member_id_prefix"]
+    body_length = settings["member_id_length"] - len(prefix)
+    if body_length < 1:
+        raise ValueError(f"member ID prefix '{prefix}' leaves no room in {settings['member_id_length']} characters")
+    alphabet = DIGITS if settings["member_id_numeric"] else ALPHANUMERIC
+    return np.char.add(prefix, _random_strings(rng, alphabet, count, body_length))
+
+
+def generate_dates_of_birth(rng: np.random.Generator, count: int) -> np.ndarray:
+    start = np.datetime64("1930-01-01")
+    end = np.datetime64("2020-12-31")
+    days = rng.integers(0, (end - start).astype(int), size=count)
+    iso = np.datetime_as_string(start + days.astype("timedelta64[D]"), unit="D")
+    return np.char.replace(iso, "-", "")
+
+
+def generate_npis(rng: np.random.Generator, count: int) -> np.ndarray:
+    """Generate NPIs with a valid Luhn check digit (80840 card issuer prefix)"""
+    body = rng.integers(0, 10, size=(count, 9))
+    body[:, 0] = rng.integers(1, 3, size=count)  # NPIs start with 1 or 2
+
+    # Luhn over "80840" + 9 digits; the check digit position is doubled last
+    doubled = body[:, ::-2] * 2
+    doubled = doubled // 10 + doubled % 10
+    total = 24 + doubled.sum(axis=1) + body[:, -2::-2].sum(axis=1)
+    check = (10 - total % 10) % 10
+
+    digits = np.concatenate([body, check[:, None]], axis=1)
+    return DIGITS[digits].view("<U10").reshape(count)
+
+
+def generate_columns(rng: np.random.Generator, count: int, settings: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Generate one chunk of 270 transaction columns"""
+    service_types = np.array(settings["service_types"])
+    return {
+        "member_id": generate_member_ids(rng, count, settings),
+        "last_name": LAST_NAMES[rng.integers(0, len(LAST_NAMES), size=count)],
+        "first_name": FIRST_NAMES[rng.integers(0, len(FIRST_NAMES), size=count)],
+        "dob": generate_dates_of_birth(rng, count),
+        "gender": np.where(rng.integers(0, 2, size=count) == 0, "M", "F"),
+        "provider_name": PROVIDER_NAMES[rng.integers(0, len(PROVIDER_NAMES), size=count)],
+        "npi": generate_npis(rng, count),
+        "service_type": service_types[rng.integers(0, len(service_types), size=count)],
+    }
+
+
+class BatchFileWriter:
+    """Stream 270 transactions into enveloped batch files"""
+
+    def __init__(self, output_dir: str, settings: Dict[str, Any], per_file: int,
+                 name_template: str = "270_batch_{index:05d}.x12"):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.settings = settings
+        self.per_file = per_file
+        self.name_template = name_template
+        self.control_width = max(4, len(str(per_file)))
+        now = datetime.now()
+        self.isa_date = now.strftime("%y%m%d")
+        self.gs_date = now.strftime("%Y%m%d")
+        self.time = now.strftime("%H%M")
+        self.files: List[Path] = []
+        self._handle = None
+        self._in_file = 0
+
+    def _open_next(self):
+        index = len(self.files) + 1
+        path = self.output_dir / self.name_template.format(index=index)
+        self.files.append(path)
+        self._handle = open(path, 'w', newline='')
+        self._in_file = 0
+        s = self.settings
+        self._control = f"{index:09d}"
+        self._handle.write(
+            f"ISA*00*          *00*          *ZZ*{s['sender_id']:<15}*ZZ*{s['receiver_id']:<15}"
+            f"*{self.isa_date}*{self.time}*^*00501*{self._control}*0*T*:~\n"
+            f"GS*HS*{s['gs_sender']}*{s['gs_receiver']}*{self.gs_date}*{self.time}*{index}*X*005010X279A1~\n"
+        )
+
+    def _close_current(self):
+        if self._handle:
+            index = len(self.files)
+            self._handle.write(f"GE*{self._in_file}*{index}~\nIEA*1*{self._control}~\n")
+            self._handle.close()
+            self._handle = None
+
+    def write_chunk(self, columns: Dict[str, np.ndarray]):
+        s = self.settings
+        count = len(columns["member_id"])
+        rows = zip(*(columns[key].tolist() for key in (
+            "member_id", "last_name", "first_name", "dob", "gender", "provider_name", "npi", "service_type")))
+
+        written = 0
+        while written < count:
+            if self._handle is None or self._in_file >= self.per_file:
+                self._close_current()
+                self._open_next()
+
+            take = min(self.per_file - self._in_file, count - written)
+            lines = []
+            for member_id, last, first, dob, gender, provider, npi, stc in (next(rows) for _ in range(take)):
+                self._in_file += 1
+                control = f"{self._in_file:0{self.control_width}d}"
+                lines.append(
+                    f"ST*270*{control}*005010X279A1~\n"
+                    f"BHT*0022*13*{self._control}{control}*{self.gs_date}*{self.time}~\n"
+                    f"HL*1**20*1~\nNM1*PR*2*{s['payer_name']}*****PI*{s['payer_id']}~\n"
+                    f"HL*2*1*21*1~\nNM1*1P*2*{provider}*****XX*{npi}~\n"
+                    f"HL*3*2*22*0~\nTRN*1*{self._control}-{control}*9{s['sender_id'][:9]}~\n"
+                    f"NM1*IL*1*{last}*{first}****MI*{member_id}~\nDMG*D8*{dob}*{gender}~\n"
+                    f"DTP*291*D8*{self.gs_date}~\nEQ*{stc}~\nSE*13*{control}~\n"
+                )
+            self._handle.write("".join(lines))
+            written += take
+
+    def close(self):
+        self._close_current()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate bulk X12 270 test files from questionnaire answers")
+    parser.add_argument("--answers", "-a", help="Questionnaire answers JSON (flat answers or a response record)")
+    parser.add_argument("--count", "-n", type=int, default=100000, help="Total number of 270 transactions")
+    parser.add_argument("--per-file", type=int, default=50000, help="Transactions per batch file")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="Rows generated per NumPy batch")
+    parser.add_argument("--output-dir", "-o", default="test_files", help="Output directory")
+    parser.add_argument("--name-template", default="270_batch_{index:05d}.x12",
+                       help="Batch file name template (use {index})")
+    parser.add_argument("--service-types", help="Comma separated service type codes (overrides answers)")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible files")
+
+    args = parser.parse_args()
+
+    if args.per_file < 1 or args.count < 1 or args.chunk_size < 1:
+        print("❌ --count, --per-file and --chunk-size must be positive")
+        sys.exit(1)
+
+    answers = load_answers(args.answers) if args.answers else {}
+    settings = resolve_generation_settings(answers)
+    if args.service_types:
+        settings["service_types"] = [code.strip() for code in args.service_types.split(",") if code.strip()]
+    if len(settings["member_id_prefix"]) >= settings["member_id_length"]:
+        print(f"❌ Member ID prefix '{settings['member_id_prefix']}' must be shorter than the "
+              f"{settings['member_id_length']}-character member ID")
+        sys.exit(1)
+
+    print(f"🔧 Generating {args.count} 270 transactions ({args.per_file} per file)")
+    print(f"   Sender: {settings['sender_id']}  Receiver: {settings['receiver_id']}")
+    print(f"   Member IDs: {settings['member_id_prefix']}... length {settings['member_id_length']}")
+    print(f"   Service types: {', '.join(settings['service_types'])}")
+
+    rng = np.random.default_rng(args.seed)
+    writer = BatchFileWriter(args.output_dir, settings, args.per_file, args.name_template)
+    started = datetime.now()
+
+    remaining = args.count
+    while remaining > 0:
+        chunk = min(args.chunk_size, remaining)
+        writer.write_chunk(generate_columns(rng, chunk, settings))
+        remaining -= chunk
+    writer.close()
+
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"✅ Wrote {args.count} transactions to {len(writer.files)} files in {elapsed:.1f}s")
+    print(f"📁 Output directory: {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
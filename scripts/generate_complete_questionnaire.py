@@ -18,6 +18,8 @@ import re
 from pathlib import Path
 from typing import Dict, List, Any
 
+from validate_questionnaire_schema import check_before_emit
+
 class QuestionnaireGenerator:
     def __init__(self):
         self.questionnaire = {
@@ -35,15 +37,16 @@ class QuestionnaireGenerator:
             {"value": "edi_batch", "label": "EDI Batch"}
         ]
 
-    def generate_complete_questionnaire(self):
+    def generate_complete_questionnaire(self, fields_data: Dict = None, save: bool = True):
         """Generate the complete questionnaire from extracted data"""
         
         print("🔧 Generating complete questionnaire structure...")
         
         # Load extracted data
-        fields_data = self._load_extracted_fields()
-        form_controls = self._load_form_controls()
-        transaction_analysis = self._load_transaction_analysis()
+        if fields_data is None:
+            fields_data = self._load_extracted_fields()
+            form_controls = self._load_form_controls()
+            transaction_analysis = self._load_transaction_analysis()
         
         # Generate sections
         self._add_organization_info_section(fields_data)
@@ -59,7 +62,8 @@ class QuestionnaireGenerator:
         self._add_production_approval_section(fields_data)
         
         # Save the questionnaire
-        self._save_questionnaire()
+        if save:
+            self._save_questionnaire()
         
         return self.questionnaire
 
@@ -888,6 +892,13 @@ class QuestionnaireGenerator:
     def _save_questionnaire(self):
         """Save the generated questionnaire"""
         
+        errors = check_before_emit(self.questionnaire)
+        if errors:
+            print("❌ Generated questionnaire failed schema validation; not saved:")
+            for error in errors:
+                print(f"   {error}")
+            return
+        
         output_dir = Path("extracted_fields")
         output_dir.mkdir(exist_ok=True)
         
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Filled PDF Answer Harvester
+
+This script migrates legacy submissions: it streams through a directory of
+already-completed payer PDFs and writes one response record per document:
+- Values only: widget name, type and value are read, nothing else (no
+  options, flags, visual properties or reports)
+- Widget names map to question ids with the same rules as the fill-back
+  renderer (_sanitize_id, contact originalField, hand-written ids)
+- Radio states ("Yes_2") and mode checkboxes become questionnaire option values
+- Worker processes read PDFs in parallel; records are appended to a JSONL file
+  in the shape accepted by /api/submissions/submit
+
+Usage:
+    python harvest_filled_pdfs.py <pdf_dir> [--output harvested_responses.jsonl] [--workers 4]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+from fill_pdf_responses import (
+    DEFAULT_QUESTIONNAIRE, WIDGET_CHECKBOX, WIDGET_RADIOBUTTON, map_widgets_to_questions
+)
+
+UNSET_VALUES = {"", "Off", "off"}
+
+# Worker state, set once per process by _init_worker
+_questionnaire: Optional[Dict[str, Any]] = None
+_question_map: Dict[str, Optional[Tuple[str, Optional[str]]]] = {}
+
+
+def _init_worker(questionnaire: Optional[Dict[str, Any]]):
+    global _questionnaire, fitz
+    import fitz  # PyMuPDF
+    _questionnaire = questionnaire
+
+
+def _question_for(widget_name: str) -> Optional[Tuple[str, Optional[str]]]:
+    """Cached widget name → (question id, option value) lookup"""
+    if widget_name not in _question_map:
+        _question_map[widget_name] = map_widgets_to_questions([widget_name], _questionnaire).get(widget_name)
+    return _question_map[widget_name]
+
+
+def harvest_pdf(pdf_path: str) -> Dict[str, Any]:
+    """Read the answered widgets of one filled PDF"""
+    answers: Dict[str, Any] = {}
+    unmapped = 0
+    try:
+        with fitz.open(pdf_path) as doc:
+            for page in doc:
+                for widget in page.widgets():
+                    value = widget.field_value
+                    if value is None or value is False or str(value) in UNSET_VALUES:
+                        continue
+                    mapping = _question_for(widget.field_name or "")
+                    if mapping is None:
+                        unmapped += 1
+                        continue
+                    question_id, option = mapping
+
+                    if option is not None:
+                        answers[question_id] = option
+                    elif widget.field_type == WIDGET_RADIOBUTTON:
+                        answers[question_id] = str(value).split("_")[0].lower()
+                    elif widget.field_type == WIDGET_CHECKBOX:
+                        answers[question_id] = "yes"
+                    elif question_id not in answers:
+                        answers[question_id] = str(value).strip()
+    except Exception as e:
+        return {"source": pdf_path, "error": str(e)}
+
+    return {"source": pdf_path, "answers": answers, "unmapped": unmapped}
+
+
+def to_submission_record(result: Dict[str, Any], root: Optional[str] = None) -> Dict[str, Any]:
+    """Response record in the shape of the /api/submissions/submit body
+
+    The responseId is the PDF's path below `root` without the extension, so a/form.pdf
+    and b/form.pdf from one recursive harvest stay distinct.
+    """
+    answers = result["answers"]
+    source = Path(result["source"])
+    relative = source.relative_to(root) if root else Path(source.name)
+    return {
+        "responseId": relative.with_suffix("").as_posix(),
+        "source": str(source),
+        "organizationInfo": {"name": answers.get("organization-name", "")},
+        "implementationMode": answers.get("implementation-mode-selection", ""),
+        "questionnaireData": answers,
+        "submittedBy": None,
+        "submittedByName": "Legacy PDF import",
+        "harvestedAt": datetime.now().isoformat(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Harvest answers from filled payer PDFs into JSONL responses")
+    parser.add_argument("pdf_dir", help="Directory of filled PDFs (searched recursively)")
+    parser.add_argument("--output", "-o", default="harvested_responses.jsonl", help="Output JSONL file")
+    parser.add_argument("--questionnaire", "-q", default=DEFAULT_QUESTIONNAIRE,
+                        help="Generated questionnaire (for question ids and contact mappings)")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 2, help="Worker processes")
+
+    args = parser.parse_args()
+
+    if not Path(args.pdf_dir).is_dir():
+        print(f"❌ Directory not found: {args.pdf_dir}")
+        sys.exit(1)
+
+    questionnaire = None
+    if Path(args.questionnaire).exists():
+        with open(args.questionnaire, 'r') as f:
+            questionnaire = json.load(f)
+
+    pdf_paths = (str(path) for path in sorted(Path(args.pdf_dir).rglob("*.pdf")))
+    print(f"🔍 Harvesting answers from: {args.pdf_dir}")
+
+    started = time.perf_counter()
+    harvested = failed = empty = 0
+    with open(args.output, 'w') as output, \
+            ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                initargs=(questionnaire,)) as pool:
+        for result in pool.map(harvest_pdf, pdf_paths, chunksize=16):
+            if "error" in result:
+                failed += 1
+                print(f"   ❌ {result['source']}: {result['error']}")
+                continue
+            if not result["answers"]:
+                empty += 1
+                continue
+            output.write(json.dumps(to_submission_record(result, args.pdf_dir)) + "\n")
+            harvested += 1
+    elapsed = time.perf_counter() - started
+
+    total = harvested + failed + empty
+    print(f"✅ Harvested {harvested} responses ({empty} blank, {failed} failed) from {total} PDFs "
+          f"in {elapsed:.1f}s — {total / elapsed if elapsed else 0:.1f} documents/s")
+    print(f"💾 Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Payer Configuration Importer
+
+This script reverse-imports existing payer configurations (the shape of
+b2b.json, web.json and 270-api-json.json) into prefilled draft questionnaire
+responses, so onboarding an existing payer needs confirmation, not re-entry:
+- An option-to-question index is built once from complete_questionnaire.json:
+  X12 element titles ("ISA06 - Interchange Sender ID (270)") give the config
+  option key, with the question's option values and its "custom" companion
+  question (conditionalLogic showWhen ["custom"])
+- versions[].options values (ISA06, ISA08, GS02, GS03, ...) select the
+  matching option, or "custom" plus the custom value question
+- template / submissionModeCd / batch give the implementation mode, name the
+  organization name
+- Config values with no question (ISA11, guideline and severity files,
+  connectorId, settings, ...) are kept under `unmapped` for the reviewer
+- Configs are converted in a process pool; one draft per config version is
+  written to JSONL in the shape accepted by import_submissions.py --draft
+
+Usage:
+    python import_payer_configs.py <config_dir|config.json> [more ...] [--questionnaire extracted_fields/complete_questionnaire.json]
+                                   [--output payer_config_drafts.jsonl] [--workers 4] [--save-index index.json]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, FrozenSet, NamedTuple
+
+from fill_pdf_responses import DEFAULT_QUESTIONNAIRE
+
+ORGANIZATION_QUESTION = "organization-name"
+MODE_QUESTION = "implementation-mode-selection"
+CUSTOM_OPTION = "custom"
+
+# Envelope values in a payer config are those of the 270 Availity sends
+CONFIG_TRANSACTION = "270"
+ELEMENT_TITLE = re.compile(r'^([A-Z]{2,3}\d{2}) - .*\((270|271)\)$')
+
+# Config template prefix (b2b-default, web-default, api-default), then submissionModeCd
+TEMPLATE_MODES = {"b2b": "real_time_b2b", "web": "real_time_web", "api": "real_time_b2b"}
+SUBMISSION_MODES = {1: "real_time_web", 2: "real_time_b2b", 10: "real_time_b2b"}
+
+
+class OptionTarget(NamedTuple):
+    question: str
+    options: Optional[FrozenSet[str]]      # None for free-text questions
+    custom_question: Optional[str]
+
+
+def build_option_index(questionnaire: Dict[str, Any]) -> Dict[str, OptionTarget]:
+    """Config option key (ISA06, GS03, ...) → question answering it"""
+    questions = [question for section in questionnaire.get("sections", [])
+                 for question in section.get("questions", [])]
+    custom_questions = {}
+    for question in questions:
+        logic = question.get("conditionalLogic") or {}
+        if logic.get("dependsOn") and logic.get("showWhen") == [CUSTOM_OPTION]:
+            custom_questions[logic["dependsOn"]] = question["id"]
+
+    index = {}
+    for question in questions:
+        match = ELEMENT_TITLE.match(question.get("title", ""))
+        if not match or match.group(2) != CONFIG_TRANSACTION:
+            continue
+        options = frozenset(str(opt["value"]) for opt in question.get("options") or [])
+        index[match.group(1)] = OptionTarget(question["id"], options or None, custom_questions.get(question["id"]))
+    return index
+
+
+def _mode_options(questionnaire: Dict[str, Any]) -> FrozenSet[str]:
+    for section in questionnaire.get("sections", []):
+        for question in section.get("questions", []):
+            if question["id"] == MODE_QUESTION:
+                return frozenset(opt["value"] for opt in question.get("options") or [])
+    return frozenset()
+
+
+def implementation_mode(config: Dict[str, Any]) -> Optional[str]:
+    if str(config.get("batch", "")).lower() == "true":
+        return "edi_batch"
+    prefix = str(config.get("template", "")).split("-")[0].lower()
+    return TEMPLATE_MODES.get(prefix) or SUBMISSION_MODES.get(config.get("submissionModeCd"))
+
+
+def draft_answers(options: Dict[str, Any], index: Dict[str, OptionTarget],
+                  answers: Dict[str, Any], unmapped: Dict[str, Any]):
+    """Map one version's options onto questions; anything without a question goes to `unmapped`"""
+    for key, value in options.items():
+        target = index.get(key)
+        if target is None:
+            unmapped[key] = value
+            continue
+        value = str(value)
+        if target.options is None or value in target.options:
+            answers[target.question] = value
+        elif CUSTOM_OPTION in target.options:
+            answers[target.question] = CUSTOM_OPTION
+            if target.custom_question:
+                answers[target.custom_question] = value
+            else:
+                # "Other" selected, but the questionnaire has nowhere to put the value
+                unmapped[key] = value
+        else:
+            unmapped[key] = value
+
+
+# Worker state, set once per process by _init_worker
+_index: Dict[str, OptionTarget] = {}
+_modes: FrozenSet[str] = frozenset()
+
+
+def _init_worker(index: Dict[str, OptionTarget], modes: FrozenSet[str]):
+    global _index, _modes
+    _index, _modes = index, modes
+
+
+def _version_error(versions: Any) -> Optional[str]:
+    """Why versions[] is not in the payer config shape, or None"""
+    if not isinstance(versions, list):
+        return "versions is not a list"
+    for position, version in enumerate(versions):
+        if not isinstance(version, dict):
+            return f"versions[{position}] is not an object"
+        for key in ("options", "settings"):
+            if version.get(key) is not None and not isinstance(version[key], dict):
+                return f"versions[{position}].{key} is not an object"
+    return None
+
+
+def convert_config(config_path: str) -> Dict[str, Any]:
+    """One prefilled draft record per config version"""
+    try:
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+        versions = config.get("versions") if isinstance(config, dict) else None
+        if not versions:
+            return {"source": config_path, "error": "not a payer configuration (no versions)"}
+    except (OSError, ValueError) as e:
+        return {"source": config_path, "error": str(e)}
+    error = _version_error(versions)
+    if error:
+        return {"source": config_path, "error": error}
+
+    mode = implementation_mode(config)
+    drafts = []
+    for version in versions:
+        answers: Dict[str, Any] = {}
+        unmapped: Dict[str, Any] = {}
+        if config.get("name"):
+            answers[ORGANIZATION_QUESTION] = config["name"]
+        if mode in _modes:
+            answers[MODE_QUESTION] = mode
+        draft_answers(version.get("options") or {}, _index, answers, unmapped)
+        for key, value in (version.get("settings") or {}).items():
+            unmapped[f"settings.{key}"] = value
+
+        drafts.append({
+            "responseId": f"{config.get('id', Path(config_path).stem)}-{config.get('template', 'config')}"
+                          f"-{version.get('version', '')}",
+            "source": config_path,
+            "organizationInfo": {"name": config.get("name", "")},
+            "implementationMode": answers.get(MODE_QUESTION, ""),
+            "questionnaireData": answers,
+            "unmapped": unmapped,
+            "prefilledFrom": {"payerId": config.get("id"), "template": config.get("template"),
+                              "version": version.get("version")},
+            "submittedBy": None,
+            "submittedByName": "Payer configuration import",
+            "importedAt": datetime.now().isoformat(),
+        })
+    return {"source": config_path, "drafts": drafts}
+
+
+def find_configs(paths: List[str]) -> List[str]:
+    configs = []
+    for path in map(Path, paths):
+        configs.extend(str(p) for p in (sorted(path.rglob("*.json")) if path.is_dir() else [path]))
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefill draft questionnaire responses from existing payer configs")
+    parser.add_argument("configs", nargs="+", help="Payer config JSON files or directories of them")
+    parser.add_argument("--questionnaire", "-q", default=DEFAULT_QUESTIONNAIRE, help="Questionnaire JSON")
+    parser.add_argument("--output", "-o", default="payer_config_drafts.jsonl", help="Output JSONL file")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 2, help="Worker processes")
+    parser.add_argument("--save-index", help="Also write the option-to-question index to this JSON file")
+
+    args = parser.parse_args()
+
+    if not Path(args.questionnaire).exists():
+        print(f"❌ File not found: {args.questionnaire}")
+        sys.exit(1)
+
+    configs = find_configs(args.configs)
+    missing = [path for path in configs if not Path(path).exists()]
+    if not configs or missing:
+        print(f"❌ No configs found: {missing or args.configs}")
+        sys.exit(1)
+
+    with open(args.questionnaire, 'r') as f:
+        questionnaire = json.load(f)
+    index = build_option_index(questionnaire)
+    modes = _mode_options(questionnaire)
+    print(f"📋 Option index: {', '.join(f'{key} → {target.question}' for key, target in sorted(index.items()))}")
+    if args.save_index:
+        with open(args.save_index, 'w') as f:
+            json.dump({key: {"question": target.question, "options": sorted(target.options or []),
+                             "customQuestion": target.custom_question}
+                       for key, target in sorted(index.items())}, f, indent=2)
+
+    started = time.perf_counter()
+    written = failed = 0
+    unmapped_keys: Dict[str, int] = {}
+    with open(args.output, 'w') as output, \
+            ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                initargs=(index, modes)) as pool:
+        for result in pool.map(convert_config, configs, chunksize=64):
+            if "error" in result:
+                failed += 1
+                print(f"   ❌ {result['source']}: {result['error']}")
+                continue
+            for draft in result["drafts"]:
+                for key in draft["unmapped"]:
+                    unmapped_keys[key] = unmapped_keys.get(key, 0) + 1
+                output.write(json.dumps(draft) + "\n")
+                written += 1
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ {written} drafts from {len(configs) - failed} configs in {elapsed:.2f}s ({failed} failed)")
+    if unmapped_keys:
+        keys = ", ".join(f"{key} {count}" for key, count in sorted(unmapped_keys.items(), key=lambda item: -item[1]))
+        print(f"⚠️  Config values with no question (kept under 'unmapped'): {keys}")
+    print(f"💾 Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
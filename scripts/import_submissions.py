@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Bulk Submissions Importer
+
+This script loads historical questionnaire responses (JSONL, e.g. from
+harvest_filled_pdfs.py) into the backend through the submissions API:
+- POST /api/submissions/submit, or /draft with --draft
+- Pooled keep-alive connections (aiohttp) with a fixed number of workers
+- Idempotency key per record (hash of the record's responseId/source and
+  the request body), sent as the Idempotency-Key header and used to skip
+  records already imported
+- Retry with exponential backoff and jitter only where the backend cannot
+  have stored the record: 429 (rejected by the rate limiter, honoring
+  Retry-After) and failed connections. POST /submit and /draft are not
+  idempotent on the backend, so 5xx responses, timeouts and dropped
+  connections are logged as "unknown outcome" instead of being re-sent
+- Checkpoint file appended as records succeed, so an interrupted import
+  resumes where it stopped
+- Per-request latency percentiles (HDR histogram)
+
+Usage:
+    python import_submissions.py <responses.jsonl> [--url http://localhost:3002/api/submissions] [--draft]
+                                 [--concurrency 50] [--checkpoint responses.jsonl.checkpoint]
+
+The backend rate limiter allows 100 requests per 15 minutes by default; start
+the backend with RATE_LIMIT_MAX raised for imports.
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, Set, Tuple
+
+try:
+    import aiohttp
+except ImportError:
+    print("❌ aiohttp and hdrhistogram are required: pip install aiohttp hdrhistogram")
+    sys.exit(1)
+
+from load_test_mock_payer import LoadResults
+from validate_x12_batch import extract_answers
+
+# Statuses returned before the request reaches a route handler
+RETRY_STATUSES = {429}
+ORGANIZATION_FIELDS = {
+    "name": "organization-name",
+    "email": "organization-email",
+    "phone": "organization-phone",
+    "address": "organization-address",
+}
+
+
+def build_submission(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Submissions API request body for a response record or flat answers"""
+    answers = extract_answers(record)
+    organization = dict(record.get("organizationInfo") or {})
+    for key, question_id in ORGANIZATION_FIELDS.items():
+        if not organization.get(key) and answers.get(question_id):
+            organization[key] = answers[question_id]
+
+    return {
+        "organizationInfo": organization,
+        "questionnaireData": answers,
+        "implementationMode": record.get("implementationMode") or answers.get("implementation-mode-selection"),
+        "submittedBy": record.get("submittedBy"),
+        "submittedByName": record.get("submittedByName"),
+    }
+
+
+def record_identity(record: Dict[str, Any]) -> str:
+    """Where a record came from; different documents with identical answers are different records"""
+    return str(record.get("responseId") or record.get("source") or record.get("id") or "")
+
+
+def idempotency_key(endpoint: str, body: Dict[str, Any], identity: str = "") -> str:
+    """Same record and body to the same endpoint → same key, so re-runs never import a record twice"""
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{endpoint}\n{identity}\n{canonical}".encode()).hexdigest()
+
+
+def iter_records(responses_path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(line number, record) for every non-empty line of a JSONL file"""
+    with open(responses_path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                yield line_number, json.loads(line)
+
+
+class Checkpoint:
+    """Append-only log of imported idempotency keys"""
+
+    def __init__(self, checkpoint_path: str):
+        self.path = Path(checkpoint_path)
+        self.done: Set[str] = set()
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        self.done.add(json.loads(line)["key"])
+                    except (ValueError, KeyError):
+                        # Partial last line from an interrupted run
+                        continue
+        self.file = open(self.path, 'a')
+
+    def record(self, key: str, line_number: int, result: Dict[str, Any]):
+        self.done.add(key)
+        self.file.write(json.dumps({"key": key, "line": line_number, **result}) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class SubmissionImporter:
+    def __init__(self, base_url: str, endpoint: str, checkpoint: Checkpoint, failures_path: str,
+                 max_retries: int = 5, backoff: float = 0.5, timeout: float = 30.0):
+        self.url = f"{base_url.rstrip('/')}/{endpoint}"
+        self.endpoint = endpoint
+        self.checkpoint = checkpoint
+        self.failures = open(failures_path, 'a')
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.results = LoadResults()
+        self.imported = self.skipped = self.failed = self.unknown = self.retries = 0
+
+    def _delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        # Full jitter keeps retrying workers from hitting the backend in lockstep
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+    async def _post(self, session: aiohttp.ClientSession, body: Dict[str, Any],
+                    key: str) -> Tuple[bool, Dict[str, Any]]:
+        """Send one submission, retrying only requests the backend never processed; returns (ok, result)
+
+        A failed result carries "outcome": "unknown" when the record may have been stored.
+        """
+        error = ""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+            started = time.perf_counter()
+            retry_after = None
+            try:
+                async with session.post(self.url, json=body, headers={"Idempotency-Key": key}) as response:
+                    payload = await response.json(content_type=None)
+                    latency_us = int((time.perf_counter() - started) * 1_000_000)
+                    if not isinstance(payload, dict):
+                        payload = {}
+                    ok = response.status < 400 and bool(payload.get("success"))
+                    self.results.record(latency_us, str(response.status), ok)
+                    if ok:
+                        return True, payload.get("data") or {}
+                    error = f"HTTP {response.status}: {payload.get('error', '')}".strip()
+                    if response.status >= 500:
+                        return False, {"error": error, "outcome": "unknown"}
+                    if response.status not in RETRY_STATUSES:
+                        return False, {"error": error}
+                    retry_after = response.headers.get("Retry-After")
+            except aiohttp.ClientConnectorError as e:
+                # Connection refused or unreachable: the request was never sent
+                latency_us = int((time.perf_counter() - started) * 1_000_000)
+                self.results.record(latency_us, type(e).__name__, False)
+                error = f"{type(e).__name__}: {e}"
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                latency_us = int((time.perf_counter() - started) * 1_000_000)
+                self.results.record(latency_us, type(e).__name__, False)
+                return False, {"error": f"{type(e).__name__}: {e}", "outcome": "unknown"}
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._delay(attempt, retry_after))
+        return False, {"error": error}
+
+    async def run(self, records: Iterator[Tuple[int, Dict[str, Any]]], concurrency: int):
+        """Fixed pool of workers fed from a bounded queue, so the input file is streamed"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 4)
+        connector = aiohttp.TCPConnector(limit=concurrency)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+            async def worker():
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    line_number, body, key = item
+                    ok, result = await self._post(session, body, key)
+                    if ok:
+                        self.imported += 1
+                        self.checkpoint.record(key, line_number, {
+                            "submissionId": result.get("submissionId") or result.get("responseId"),
+                        })
+                    else:
+                        self.failed += 1
+                        if result.get("outcome") == "unknown":
+                            self.unknown += 1
+                        self.failures.write(json.dumps({"line": line_number, "key": key, **result}) + "\n")
+                        self.failures.flush()
+
+            workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+            queued: Set[str] = set()
+            for line_number, record in records:
+                body = build_submission(record)
+                key = idempotency_key(self.endpoint, body, record_identity(record))
+                # Already imported, or a duplicate record earlier in this file
+                if key in self.checkpoint.done or key in queued:
+                    self.skipped += 1
+                    continue
+                queued.add(key)
+                await queue.put((line_number, body, key))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        self.failures.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import questionnaire responses through the submissions API")
+    parser.add_argument("responses", help="JSONL file of response records")
+    parser.add_argument("--url", default="http://localhost:3002/api/submissions", help="Submissions API base URL")
+    parser.add_argument("--draft", action="store_true", help="Save as drafts (POST /draft) instead of submitting")
+    parser.add_argument("--concurrency", "-c", type=int, default=50, help="Concurrent requests")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <responses>.checkpoint)")
+    parser.add_argument("--failures", help="Failed records log (default: <responses>.failed.jsonl)")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per record on 429 and refused connections")
+    parser.add_argument("--backoff", type=float, default=0.5, help="Base backoff in seconds")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+
+    args = parser.parse_args()
+
+    if not Path(args.responses).exists():
+        print(f"❌ File not found: {args.responses}")
+        sys.exit(1)
+
+    endpoint = "draft" if args.draft else "submit"
+    checkpoint = Checkpoint(args.checkpoint or f"{args.responses}.checkpoint")
+    importer = SubmissionImporter(args.url, endpoint, checkpoint, args.failures or f"{args.responses}.failed.jsonl",
+                                  args.max_retries, args.backoff, args.timeout)
+
+    print(f"🚀 Importing {args.responses} → {importer.url} ({args.concurrency} concurrent)")
+    if checkpoint.done:
+        print(f"🔁 Resuming: {len(checkpoint.done)} records already imported")
+
+    started = time.perf_counter()
+    try:
+        asyncio.run(importer.run(iter_records(args.responses), args.concurrency))
+    finally:
+        checkpoint.close()
+    elapsed = time.perf_counter() - started
+
+    report = importer.results.to_report({"url": importer.url, "concurrency": args.concurrency}, elapsed)
+    latency = report["latency_ms"]
+    print(f"✅ Imported {importer.imported}, skipped {importer.skipped}, failed {importer.failed} "
+          f"({importer.retries} retries) in {elapsed:.1f}s — {importer.imported / elapsed if elapsed else 0:.1f} submissions/s")
+    if latency:
+        print(f"⏱️  p50 {latency['p50']:.1f}ms  p95 {latency['p95']:.1f}ms  p99 {latency['p99']:.1f}ms")
+    print(f"💾 Checkpoint: {checkpoint.path}")
+    if importer.failed:
+        print(f"⚠️  Failed records: {args.failures or f'{args.responses}.failed.jsonl'}")
+    if importer.unknown:
+        print(f"⚠️  {importer.unknown} of them have an unknown outcome (5xx, timeout or dropped connection) "
+              f"and may have been stored: check the backend before re-running")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Mock Payer Load Generator and Latency Profiler
+
+This script drives the backend's mock payer endpoints at load to size
+real-time B2B capacity (continuous threads) before go-live:
+- Replays 270 corpora (batch files or directories) one transaction per request
+- Open-loop target RPS or closed-loop fixed concurrency
+- Pooled keep-alive connections (aiohttp)
+- p50/p95/p99 latency and error rates recorded in HDR histograms
+- JSON and markdown report
+
+Usage:
+    python load_test_mock_payer.py <corpus> [--url http://localhost:3002/api/mock-payer] [--endpoint 270|execute-tests]
+                                   [--rps 50 | --concurrency 20] [--duration 60] [--output-dir load_reports]
+
+The backend rate limiter allows 100 requests per 15 minutes by default; start
+the backend with RATE_LIMIT_MAX raised for load runs.
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from itertools import cycle
+from pathlib import Path
+from typing import Dict, List, Any, Iterator
+
+try:
+    import aiohttp
+    from hdrh.histogram import HdrHistogram
+except ImportError:
+    print("❌ aiohttp and hdrhistogram are required: pip install aiohttp hdrhistogram")
+    sys.exit(1)
+
+from validate_x12_batch import X12Tokenizer
+
+# Latencies are recorded in microseconds, up to one minute, 3 significant digits
+HISTOGRAM_MAX_US = 60_000_000
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def iter_270_requests(corpus_path: str) -> Iterator[str]:
+    """Yield one single-transaction interchange per ST/SE in the corpus"""
+    path = Path(corpus_path)
+    files = sorted(p for p in path.rglob("*") if p.is_file() and p.stat().st_size) if path.is_dir() else [path]
+
+    for file_path in files:
+        with X12Tokenizer(file_path) as tokenizer:
+            isa = gs = None
+            body: List[str] = []
+            for segment in tokenizer.segments():
+                separators = tokenizer.separators
+                raw = separators.element.join(segment.elements).decode('ascii', errors='replace')
+                terminator = separators.segment.decode('ascii')
+                element = separators.element.decode('ascii')
+
+                if segment.segment_id == "ISA":
+                    isa = segment
+                    isa_raw = raw
+                elif segment.segment_id == "GS":
+                    gs = segment
+                    gs_raw = raw
+                elif segment.segment_id == "ST":
+                    body = [raw]
+                elif segment.segment_id == "SE":
+                    body.append(raw)
+                    if isa is None or gs is None:
+                        continue
+                    group_control = gs.elements[6].decode('ascii').strip()
+                    interchange_control = isa.elements[13].decode('ascii').strip()
+                    yield terminator.join([
+                        isa_raw, gs_raw, *body,
+                        f"GE{element}1{element}{group_control}",
+                        f"IEA{element}1{element}{interchange_control}",
+                    ]) + terminator
+                    body = []
+                elif body:
+                    body.append(raw)
+
+
+class LoadResults:
+    """Latency histograms and error counters"""
+
+    def __init__(self):
+        self.latency = HdrHistogram(1, HISTOGRAM_MAX_US, 3)
+        self.payer_latency = HdrHistogram(1, HISTOGRAM_MAX_US, 3)
+        self.requests = 0
+        self.errors = 0
+        self.status_codes: Dict[str, int] = {}
+        self.test_statuses: Dict[str, int] = {}
+
+    def record(self, latency_us: int, status: str, ok: bool, payer_results: List[Dict[str, Any]] = ()):
+        self.requests += 1
+        self.latency.record_value(min(max(latency_us, 1), HISTOGRAM_MAX_US))
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+        for result in payer_results:
+            test_status = result.get("status", "unknown")
+            self.test_statuses[test_status] = self.test_statuses.get(test_status, 0) + 1
+            if result.get("responseTime"):
+                self.payer_latency.record_value(min(int(result["responseTime"]) * 1000, HISTOGRAM_MAX_US))
+
+    @staticmethod
+    def _summary(histogram: HdrHistogram) -> Dict[str, float]:
+        if histogram.get_total_count() == 0:
+            return {}
+        summary = {f"p{p:g}": histogram.get_value_at_percentile(p) / 1000 for p in PERCENTILES}
+        summary.update({
+            "min": histogram.get_min_value() / 1000,
+            "mean": histogram.get_mean_value() / 1000,
+            "max": histogram.get_max_value() / 1000,
+        })
+        return summary
+
+    def to_report(self, settings: Dict[str, Any], elapsed: float) -> Dict[str, Any]:
+        return {
+            "settings": settings,
+            "elapsed_seconds": round(elapsed, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "achieved_rps": self.requests / elapsed if elapsed else 0.0,
+            "status_codes": self.status_codes,
+            "test_statuses": self.test_statuses,
+            "latency_ms": self._summary(self.latency),
+            "payer_reported_latency_ms": self._summary(self.payer_latency),
+        }
+
+
+class MockPayerLoadGenerator:
+    def __init__(self, base_url: str, endpoint: str, corpus: List[str], tests_per_request: int = 10,
+                 timeout: float = 30.0):
+        self.url = f"{base_url.rstrip('/')}/{endpoint}"
+        self.endpoint = endpoint
+        self.requests = cycle(corpus)
+        self.tests_per_request = tests_per_request
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.results = LoadResults()
+        self.sequence = 0
+
+    def _next_payload(self) -> Dict[str, Any]:
+        self.sequence += 1
+        if self.endpoint == "270":
+            return {"request270": next(self.requests), "testId": f"load_{self.sequence}"}
+        return {
+            "testCases": [
+                {"id": f"load_{self.sequence}_{i}", "request270": {"payload": next(self.requests)}}
+                for i in range(self.tests_per_request)
+            ]
+        }
+
+    async def _send(self, session: aiohttp.ClientSession):
+        payload = self._next_payload()
+        started = time.perf_counter()
+        try:
+            async with session.post(self.url, json=payload) as response:
+                body = await response.json(content_type=None)
+                latency_us = int((time.perf_counter() - started) * 1_000_000)
+                if not isinstance(body, dict):
+                    body = {}
+                data = body.get("data") or {}
+                payer_results = data.get("results", [data] if "status" in data else [])
+                ok = response.status < 400 and bool(body.get("success"))
+                self.results.record(latency_us, str(response.status), ok, payer_results)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            latency_us = int((time.perf_counter() - started) * 1_000_000)
+            self.results.record(latency_us, type(e).__name__, False)
+
+    async def run_concurrency(self, concurrency: int, duration: float, total: int):
+        """Closed loop: a fixed number of workers, each sending back-to-back"""
+        deadline = time.perf_counter() + duration
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+            async def worker():
+                while time.perf_counter() < deadline and (not total or self.sequence < total):
+                    await self._send(session)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def run_rps(self, rps: float, duration: float, total: int, max_in_flight: int):
+        """Open loop: requests are scheduled at a fixed rate regardless of latency"""
+        interval = 1.0 / rps
+        started = time.perf_counter()
+        connector = aiohttp.TCPConnector(limit=max_in_flight)
+        in_flight = set()
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+            sent = 0
+            while True:
+                now = time.perf_counter()
+                if now - started >= duration or (total and sent >= total):
+                    break
+                task = asyncio.create_task(self._send(session))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                sent += 1
+                # Schedule against the start time so slow sends do not drift the rate
+                await asyncio.sleep(max(0.0, started + sent * interval - time.perf_counter()))
+            if in_flight:
+                await asyncio.gather(*in_flight)
+
+
+def write_report(report: Dict[str, Any], output_dir: str) -> Path:
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+
+    with open(output_path / f"load_report_{stamp}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+
+    settings = report["settings"]
+    lines = [
+        f"# Mock Payer Load Report: {settings['url']}",
+        f"\n**Mode:** {settings['mode']}",
+        f"**Duration:** {report['elapsed_seconds']}s",
+        f"**Requests:** {report['requests']} ({report['achieved_rps']:.1f} req/s)",
+        f"**Error Rate:** {report['error_rate']:.2%}",
+        "\n## Client Latency (ms)\n",
+        "| Percentile | Latency |",
+        "|------------|---------|",
+    ]
+    for key, value in report["latency_ms"].items():
+        lines.append(f"| {key} | {value:.1f} |")
+
+    if report["payer_reported_latency_ms"]:
+        lines.extend(["\n## Payer Reported Response Time (ms)\n", "| Percentile | Latency |", "|------------|---------|"])
+        for key, value in report["payer_reported_latency_ms"].items():
+            lines.append(f"| {key} | {value:.1f} |")
+
+    lines.append("\n## Status Codes\n")
+    for status, count in sorted(report["status_codes"].items()):
+        lines.append(f"- **{status}**: {count}")
+    if report["test_statuses"]:
+        lines.append("\n## Test Results\n")
+        for status, count in sorted(report["test_statuses"].items()):
+            lines.append(f"- **{status}**: {count}")
+
+    report_path = output_path / f"load_report_{stamp}.md"
+    with open(report_path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+    return report_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the mock payer endpoints")
+    parser.add_argument("corpus", help="270 batch file or directory of batch files")
+    parser.add_argument("--url", default="http://localhost:3002/api/mock-payer", help="Mock payer base URL")
+    parser.add_argument("--endpoint", choices=["270", "execute-tests"], default="270", help="Endpoint to drive")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rps", type=float, help="Target requests per second (open loop)")
+    mode.add_argument("--concurrency", "-c", type=int, default=10, help="Concurrent workers (closed loop)")
+    parser.add_argument("--duration", "-d", type=float, default=60, help="Run duration in seconds")
+    parser.add_argument("--requests", "-n", type=int, default=0, help="Stop after this many requests (0 = no limit)")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="Connection pool size in RPS mode")
+    parser.add_argument("--tests-per-request", type=int, default=10, help="Test cases per execute-tests call")
+    parser.add_argument("--corpus-limit", type=int, default=10000, help="Maximum 270 requests loaded from the corpus")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--output-dir", "-o", default="load_reports", help="Report output directory")
+
+    args = parser.parse_args()
+
+    if not Path(args.corpus).exists():
+        print(f"❌ Corpus not found: {args.corpus}")
+        sys.exit(1)
+
+    corpus = []
+    for request in iter_270_requests(args.corpus):
+        corpus.append(request)
+        if len(corpus) >= args.corpus_limit:
+            break
+    if not corpus:
+        print("❌ No 270 transactions found in corpus")
+        sys.exit(1)
+
+    mode = f"{args.rps:g} req/s" if args.rps else f"{args.concurrency} concurrent"
+    print(f"🚀 Load testing {args.url.rstrip('/')}/{args.endpoint} at {mode} for {args.duration:g}s")
+    print(f"📦 Replaying {len(corpus)} 270 requests")
+
+    generator = MockPayerLoadGenerator(args.url, args.endpoint, corpus, args.tests_per_request, args.timeout)
+    started = time.perf_counter()
+    if args.rps:
+        asyncio.run(generator.run_rps(args.rps, args.duration, args.requests, args.max_in_flight))
+    else:
+        asyncio.run(generator.run_concurrency(args.concurrency, args.duration, args.requests))
+    elapsed = time.perf_counter() - started
+
+    settings = {
+        "url": f"{args.url.rstrip('/')}/{args.endpoint}",
+        "mode": mode,
+        "duration": args.duration,
+        "corpus_size": len(corpus),
+        "tests_per_request": args.tests_per_request if args.endpoint == "execute-tests" else 1,
+    }
+    report = generator.results.to_report(settings, elapsed)
+    report_path = write_report(report, args.output_dir)
+
+    latency = report["latency_ms"]
+    print(f"✅ {report['requests']} requests, {report['achieved_rps']:.1f} req/s, error rate {report['error_rate']:.2%}")
+    if latency:
+        print(f"⏱️  p50 {latency['p50']:.1f}ms  p95 {latency['p95']:.1f}ms  p99 {latency['p99']:.1f}ms")
+    print(f"📊 Report saved to: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Page Manifest
+
+Per-page content hashes of a PDF, kept next to its extraction outputs so a
+revised PDF can be re-extracted page by page:
+- A page hash covers its geometry, content streams, XObjects and widget
+  annotations (names, types, rects, values, flags)
+- page_manifest.json stores the hashes each output (fields_raw.json,
+  form_controls_analysis.json) was built from, plus which fields came from
+  which page
+- Pages are matched by position first, then by hash, so moved pages are
+  reused too; only pages with no match are extracted again
+
+Usage:
+    python page_manifest.py <old.pdf> <new.pdf>    # list changed pages
+"""
+
+import sys
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from run_journal import atomic_write
+
+MANIFEST_NAME = "page_manifest.json"
+
+
+def page_content_hash(page) -> str:
+    """Hash of everything that changes how a page looks: geometry, content streams, XObjects, widgets"""
+    doc = page.parent
+    digest = hashlib.sha256()
+    digest.update(f"{tuple(page.rect)}|{page.rotation}".encode())
+    digest.update(page.read_contents())
+    for xref in sorted({item[0] for item in page.get_xobjects()} | {item[0] for item in page.get_images()}):
+        digest.update(doc.xref_stream_raw(xref) or b"")
+    for widget in page.widgets():
+        digest.update(json.dumps([widget.field_name, widget.field_type, list(widget.rect),
+                                  str(widget.field_value), widget.field_flags, widget.xref]).encode())
+    return digest.hexdigest()
+
+
+def page_hashes(pdf_path) -> List[str]:
+    import fitz  # PyMuPDF
+    with fitz.open(pdf_path) as doc:
+        return [page_content_hash(page) for page in doc]
+
+
+def match_pages(old_hashes: List[str], new_hashes: List[str]) -> Dict[int, Optional[int]]:
+    """New page number → old page number with identical content, or None if the page must be re-extracted"""
+    old_pages_by_hash: Dict[str, int] = {}
+    for page, digest in enumerate(old_hashes, 1):
+        old_pages_by_hash.setdefault(digest, page)
+    matches = {}
+    for page, digest in enumerate(new_hashes, 1):
+        if page <= len(old_hashes) and old_hashes[page - 1] == digest:
+            matches[page] = page
+        else:
+            matches[page] = old_pages_by_hash.get(digest)
+    return matches
+
+
+def load_manifest(output_dir) -> Dict[str, Any]:
+    path = Path(output_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def update_manifest(output_dir, output_name: str, entry: Optional[Dict[str, Any]]):
+    """Record (or, with None, forget) the page state one output file was built from"""
+    manifest = load_manifest(output_dir)
+    if entry is None:
+        if output_name not in manifest:
+            return
+        manifest.pop(output_name)
+    else:
+        manifest[output_name] = entry
+    with atomic_write(Path(output_dir) / MANIFEST_NAME) as f:
+        json.dump(manifest, f, indent=2)
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python page_manifest.py <old.pdf> <new.pdf>")
+        sys.exit(1)
+
+    for path in sys.argv[1:]:
+        if not Path(path).exists():
+            print(f"❌ File not found: {path}")
+            sys.exit(1)
+
+    old_hashes, new_hashes = page_hashes(sys.argv[1]), page_hashes(sys.argv[2])
+    matches = match_pages(old_hashes, new_hashes)
+    changed = [page for page, old in matches.items() if old is None]
+    moved = {page: old for page, old in matches.items() if old is not None and old != page}
+    print(f"📄 {len(old_hashes)} → {len(new_hashes)} pages: {len(changed)} changed, {len(moved)} moved")
+    if changed:
+        print(f"   changed: {', '.join(map(str, changed))}")
+    for page, old in moved.items():
+        print(f"   page {page} was page {old}")
+
+
+if __name__ == "__main__":
+    main()
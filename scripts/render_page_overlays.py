@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Page Overlay Renderer
+
+This script renders every page of one or more PDFs with their widget rects
+drawn on top, colored by control type, for reviewing extraction quality next
+to form_controls_report.md:
+- Control types come from the PyMuPDF widget type codes, as in widget_table.py
+- Pages are rendered in a process pool at a configurable DPI, plus a small
+  thumbnail per page
+- Output is cached by page content hash (content streams, XObjects and
+  widget annotations) and render settings, so re-runs only render pages
+  that changed; identical pages across PDFs share one image
+- PNG by default; WebP when Pillow is installed
+- index.json lists every page with its image, thumbnail and widget boxes
+  (in image pixels) for a review UI
+
+Usage:
+    python render_page_overlays.py <pdf_file|pdf_dir> [more ...] [--output page_renders] [--dpi 110]
+                                   [--thumb-width 200] [--format png|webp] [--workers 4] [--prune]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from page_manifest import page_content_hash
+from run_journal import atomic_write
+
+# Bump when the overlay drawing changes so cached renders are not reused
+OVERLAY_VERSION = 2
+PAGES_PER_TASK = 8
+
+CONTROL_COLORS = {
+    "text": (0.12, 0.47, 0.91),
+    "checkbox": (0.13, 0.62, 0.30),
+    "radio": (0.95, 0.55, 0.10),
+    "choice": (0.56, 0.27, 0.68),
+    "signature": (0.84, 0.15, 0.16),
+    "button": (0.45, 0.45, 0.45),
+    "unknown": (0.0, 0.0, 0.0),
+}
+DEFAULT_COLOR = CONTROL_COLORS["unknown"]
+
+WIDGET_CONTROL_TYPES = {
+    fitz.PDF_WIDGET_TYPE_TEXT: "text",
+    fitz.PDF_WIDGET_TYPE_CHECKBOX: "checkbox",
+    fitz.PDF_WIDGET_TYPE_RADIOBUTTON: "radio",
+    fitz.PDF_WIDGET_TYPE_COMBOBOX: "choice",
+    fitz.PDF_WIDGET_TYPE_LISTBOX: "choice",
+    fitz.PDF_WIDGET_TYPE_SIGNATURE: "signature",
+}
+FLAG_RADIO = 32768
+FLAG_PUSHBUTTON = 65536
+
+
+def overlay_control_type(widget) -> str:
+    """Control type from the widget type code; flags only classify generic buttons"""
+    if widget.field_type == fitz.PDF_WIDGET_TYPE_BUTTON:
+        flags = widget.field_flags or 0
+        if flags & FLAG_RADIO:
+            return "radio"
+        return "button" if flags & FLAG_PUSHBUTTON else "checkbox"
+    return WIDGET_CONTROL_TYPES.get(widget.field_type, "unknown")
+
+
+def _to_image_bytes(pixmap, image_format: str) -> bytes:
+    if image_format == "png":
+        return pixmap.tobytes("png")
+    from PIL import Image
+    image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    buffer = BytesIO()
+    image.save(buffer, format="WEBP", quality=85)
+    return buffer.getvalue()
+
+
+def render_pages(task: Tuple[str, List[int], str, int, int, str]) -> List[Dict[str, Any]]:
+    """Render (or find cached) overlay images for some pages of one PDF"""
+    pdf_path, page_numbers, cache_dir, dpi, thumb_width, image_format = task
+    cache = Path(cache_dir)
+    results = []
+    doc = fitz.open(pdf_path)
+    try:
+        for page_number in page_numbers:
+            page = doc[page_number - 1]
+            content_hash = page_content_hash(page)
+            key = hashlib.sha256(
+                f"{content_hash}|{dpi}|{thumb_width}|{image_format}|{OVERLAY_VERSION}".encode()).hexdigest()[:32]
+            image_path = cache / f"{key}.{image_format}"
+            thumb_path = cache / f"{key}.thumb.{image_format}"
+
+            scale = dpi / 72
+            boxes = []
+            widgets = []
+            for widget in page.widgets():
+                if not widget.rect:
+                    continue
+                control_type = overlay_control_type(widget)
+                boxes.append((fitz.Rect(widget.rect), control_type))
+                widgets.append({
+                    "name": widget.field_name or "unnamed",
+                    "control_type": control_type,
+                    "rect": [round(v * scale, 1) for v in widget.rect],
+                })
+
+            cached = image_path.exists() and thumb_path.exists()
+            if not cached:
+                # Drawn on the in-memory page only; the PDF on disk is never modified
+                for rect, control_type in boxes:
+                    color = CONTROL_COLORS.get(control_type, DEFAULT_COLOR)
+                    page.draw_rect(rect, color=color, fill=color, fill_opacity=0.18, width=1.2)
+                pixmap = page.get_pixmap(dpi=dpi, annots=True)
+                with atomic_write(image_path, 'wb') as f:
+                    f.write(_to_image_bytes(pixmap, image_format))
+                thumb_scale = thumb_width / page.rect.width
+                thumb = page.get_pixmap(matrix=fitz.Matrix(thumb_scale, thumb_scale), annots=True)
+                with atomic_write(thumb_path, 'wb') as f:
+                    f.write(_to_image_bytes(thumb, image_format))
+                size = (pixmap.width, pixmap.height)
+            else:
+                size = (round(page.rect.width * scale), round(page.rect.height * scale))
+
+            results.append({
+                "page": page_number,
+                "content_hash": content_hash,
+                "image": f"cache/{image_path.name}",
+                "thumbnail": f"cache/{thumb_path.name}",
+                "width": size[0],
+                "height": size[1],
+                "cached": cached,
+                "widgets": widgets,
+            })
+    finally:
+        doc.close()
+    return results
+
+
+def find_pdfs(paths: List[str]) -> List[Path]:
+    pdfs = []
+    for path in map(Path, paths):
+        pdfs.extend(sorted(path.rglob("*.pdf")) if path.is_dir() else [path])
+    return pdfs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render PDF pages with widget overlays for extraction review")
+    parser.add_argument("pdfs", nargs="+", help="PDF files or directories of PDFs")
+    parser.add_argument("--output", "-o", default="page_renders", help="Output directory (images in cache/, index.json)")
+    parser.add_argument("--dpi", type=int, default=110, help="Render resolution")
+    parser.add_argument("--thumb-width", type=int, default=200, help="Thumbnail width in pixels")
+    parser.add_argument("--format", choices=["png", "webp"], default="png", help="Image format")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 2, help="Worker processes")
+    parser.add_argument("--prune", action="store_true", help="Delete cached images no longer in the index")
+
+    args = parser.parse_args()
+
+    if args.format == "webp":
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            print("❌ Pillow is required for WebP output: pip install Pillow")
+            sys.exit(1)
+
+    pdfs = find_pdfs(args.pdfs)
+    missing = [str(p) for p in pdfs if not p.exists()]
+    if not pdfs or missing:
+        print(f"❌ No PDFs found: {missing or args.pdfs}")
+        sys.exit(1)
+
+    output_dir = Path(args.output)
+    cache_dir = output_dir / "cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # Page counts first, so large documents are spread across workers in chunks
+    tasks = []
+    index: Dict[str, Dict[str, Any]] = {}
+    for pdf in pdfs:
+        try:
+            with fitz.open(pdf) as doc:
+                page_count = len(doc)
+        except Exception as e:
+            print(f"   ❌ {pdf}: {e}")
+            continue
+        index[str(pdf)] = {"pdf": str(pdf), "total_pages": page_count, "pages": []}
+        pages = list(range(1, page_count + 1))
+        for start in range(0, page_count, PAGES_PER_TASK):
+            tasks.append((str(pdf), pages[start:start + PAGES_PER_TASK], str(cache_dir), args.dpi,
+                          args.thumb_width, args.format))
+
+    started = time.perf_counter()
+    rendered = cached = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for task, results in zip(tasks, pool.map(render_pages, tasks)):
+            index[task[0]]["pages"].extend(results)
+            cached += sum(r["cached"] for r in results)
+            rendered += sum(not r["cached"] for r in results)
+    elapsed = time.perf_counter() - started
+
+    documents = sorted(index.values(), key=lambda d: d["pdf"])
+    with atomic_write(output_dir / "index.json") as f:
+        json.dump({
+            "generated_at": datetime.now().isoformat(),
+            "dpi": args.dpi,
+            "format": args.format,
+            "legend": {control: "#%02x%02x%02x" % tuple(round(c * 255) for c in color)
+                       for control, color in CONTROL_COLORS.items()},
+            "documents": documents,
+        }, f, indent=2)
+
+    if args.prune:
+        referenced = {Path(page[key]).name for doc in documents for page in doc["pages"]
+                      for key in ("image", "thumbnail")}
+        pruned = 0
+        for image in cache_dir.iterdir():
+            if image.name not in referenced:
+                image.unlink()
+                pruned += 1
+        print(f"🗑️  Pruned {pruned} cached images")
+
+    print(f"✅ {rendered + cached} pages from {len(documents)} PDFs in {elapsed:.2f}s "
+          f"({rendered} rendered, {cached} cached)")
+    print(f"💾 Index saved to: {output_dir / 'index.json'}")
+
+
+if __name__ == "__main__":
+    main()
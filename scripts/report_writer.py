@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Streaming Report Writers
+
+Markdown and paginated HTML writers behind the extraction reports
+(fields_analysis.md, form_controls_report.md, fields_extracted.md):
+- A report is a few header lines plus sections; each section yields its
+  entries (one field, one section summary) as short lists of markdown lines,
+  so the report is never assembled in memory
+- Markdown is written entry by entry to an atomically replaced file
+- HTML output is a directory: index.html with the header and a table of
+  contents, plus one file per section page (at most --page-size entries)
+  with previous/next links, so browsers never load one giant page
+
+Usage:
+    python report_writer.py <report.md> [--output report_html] [--page-size 200]
+"""
+
+import re
+import sys
+import html
+import argparse
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from run_journal import atomic_write
+
+DEFAULT_PAGE_SIZE = 200
+
+INLINE_PATTERN = re.compile(r'`([^`]*)`|\*\*(.+?)\*\*')
+CODE_PATTERN = re.compile(r'`([^`]*)`')
+HEADING_PATTERN = re.compile(r'^(#{1,6}) (.*)$')
+LIST_PATTERN = re.compile(r'^( *)- (.*)$')
+# Section page links in a generated index.html (see _page_name)
+PAGE_LINK_PATTERN = re.compile(r'<a href="(\d{2,}-[a-z0-9-]+-\d+\.html)">')
+
+PAGE_STYLE = """body { font-family: -apple-system, "Segoe UI", sans-serif; max-width: 60rem; margin: 2rem auto; padding: 0 1rem; color: #222; }
+code { background: #f2f2f2; padding: 0 .2rem; border-radius: 3px; }
+nav { display: flex; gap: 1rem; margin: 1rem 0; }
+h3 { border-top: 1px solid #e5e5e5; padding-top: .8rem; }"""
+
+
+class ReportSection(NamedTuple):
+    title: str
+    heading: List[str]               # markdown lines written once before the entries
+    entries: Iterable[List[str]]     # markdown lines per entry, consumed lazily
+
+
+def write_markdown_report(path, header: Iterable[str], sections: Iterable[ReportSection]) -> Path:
+    """Write a report entry by entry; each line is newline-terminated"""
+    with atomic_write(path, encoding='utf-8') as f:
+        for line in header:
+            f.write(f"{line}\n")
+        for section in sections:
+            for line in section.heading:
+                f.write(f"{line}\n")
+            for entry in section.entries:
+                for line in entry:
+                    f.write(f"{line}\n")
+    return Path(path)
+
+
+def _inline_match(match) -> str:
+    if match.group(1) is not None:
+        return f"<code>{match.group(1)}</code>"
+    bold = CODE_PATTERN.sub(r'<code>\1</code>', match.group(2))
+    return f"<strong>{bold}</strong>"
+
+
+def _inline(text: str) -> str:
+    # Escaping leaves ` and * alone, so the markup can be matched on the escaped text
+    text = html.escape(text, quote=False)
+    if "`" not in text and "*" not in text:
+        return text
+    return INLINE_PATTERN.sub(_inline_match, text)
+
+
+def markdown_to_html(lines: Iterable[str]) -> str:
+    """Render the markdown subset the reports use: headings, nested bullets, bold, code"""
+    out = []
+    depth = 0
+    for line in lines:
+        bullet = LIST_PATTERN.match(line)
+        level = len(bullet.group(1)) // 2 + 1 if bullet else 0
+        while depth > level:
+            out.append("</li></ul>")
+            depth -= 1
+        if bullet:
+            if depth == level:
+                out.append("</li>")
+            while depth < level:
+                out.append("<ul>")
+                depth += 1
+            out.append(f"<li>{_inline(bullet.group(2))}")
+            continue
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif line.strip():
+            out.append(f"<p>{_inline(line)}</p>")
+    out.extend(["</li></ul>"] * depth)
+    return "\n".join(out) + "\n"
+
+
+def _slug(title: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-') or "section"
+
+
+def _page_name(number: int, title: str, page: int) -> str:
+    return f"{number:02d}-{_slug(title)}-{page}.html"
+
+
+def _previous_pages(output_path: Path) -> List[str]:
+    """Section pages linked from the index.html a previous run left in output_path"""
+    index_path = output_path / "index.html"
+    if not index_path.exists():
+        return []
+    return PAGE_LINK_PATTERN.findall(index_path.read_text(encoding='utf-8', errors='replace'))
+
+
+def _document(title: str, body_start: str) -> str:
+    return (f"<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{html.escape(title)}</title>\n<style>\n{PAGE_STYLE}\n</style>\n</head>\n<body>\n{body_start}")
+
+
+def _nav(links: List[Tuple[Optional[str], str]]) -> str:
+    items = [f'<a href="{html.escape(href)}">{label}</a>' for href, label in links if href]
+    return f"<nav>{' '.join(items)}</nav>\n"
+
+
+def write_html_report(output_dir, title: str, header: Iterable[str], sections: Iterable[ReportSection],
+                      page_size: int = DEFAULT_PAGE_SIZE) -> Path:
+    """Write index.html and per-section pages of at most page_size entries; returns the index path
+
+    Entries are read with one entry of lookahead, so at most one page is open at a time.
+    Pages the previous index.html linked to that are no longer part of the report are
+    removed; other files in output_dir are left alone.
+    """
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1, got {page_size}")
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    previous_pages = _previous_pages(output_path)
+    header_html = markdown_to_html(header)
+    contents: List[Tuple[str, List[Tuple[str, int]]]] = []
+    written = {"index.html"}
+
+    for number, section in enumerate(sections, 1):
+        entries: Iterator[List[str]] = iter(section.entries)
+        pending = next(entries, None)
+        pages: List[Tuple[str, int]] = []
+        while pending is not None or not pages:
+            page = len(pages) + 1
+            name = _page_name(number, section.title, page)
+            count = 0
+            with atomic_write(output_path / name, encoding='utf-8') as f:
+                f.write(_document(f"{section.title} ({page}) - {title}", ""))
+                previous = _page_name(number, section.title, page - 1) if page > 1 else None
+                f.write(_nav([("index.html", "Index"), (previous, "← Previous")]))
+                f.write(markdown_to_html(section.heading))
+                while pending is not None and count < page_size:
+                    f.write(markdown_to_html(pending))
+                    count += 1
+                    pending = next(entries, None)
+                following = _page_name(number, section.title, page + 1) if pending is not None else None
+                f.write(_nav([("index.html", "Index"), (previous, "← Previous"), (following, "Next →")]))
+                f.write("</body>\n</html>\n")
+            pages.append((name, count))
+            written.add(name)
+        contents.append((section.title, pages))
+
+    with atomic_write(output_path / "index.html", encoding='utf-8') as f:
+        f.write(_document(title, header_html))
+        f.write("<h2>Contents</h2>\n<ul>\n")
+        for section_title, pages in contents:
+            total = sum(count for _, count in pages)
+            links = " ".join(f'<a href="{html.escape(name)}">{page}</a>' for page, (name, _) in enumerate(pages, 1))
+            f.write(f"<li>{html.escape(section_title)} ({total} entries): {links}</li>\n")
+        f.write("</ul>\n</body>\n</html>\n")
+
+    for name in previous_pages:
+        stale = output_path / name
+        if name not in written and stale.exists():
+            stale.unlink()
+    return output_path / "index.html"
+
+
+def sections_from_markdown(lines: Iterable[str]) -> Tuple[List[str], Iterator[ReportSection]]:
+    """Split an existing markdown report at its `## ` headings; entries start at `### ` headings"""
+    lines = iter(lines)
+    header: List[str] = []
+    line = next(lines, None)
+    while line is not None and not line.startswith("## "):
+        header.append(line)
+        line = next(lines, None)
+
+    def generate(first: Optional[str]) -> Iterator[ReportSection]:
+        current = first
+        while current is not None:
+            state = {"next": None}
+
+            def entries(heading_line: str) -> Iterator[List[str]]:
+                entry: List[str] = []
+                for item in lines:
+                    if item.startswith("## "):
+                        state["next"] = item
+                        break
+                    if item.startswith("### ") and any(l.strip() for l in entry):
+                        # Blank lines before a heading belong to the heading's entry
+                        trailing = []
+                        while entry and not entry[-1].strip():
+                            trailing.insert(0, entry.pop())
+                        yield entry
+                        entry = trailing
+                    entry.append(item)
+                if entry:
+                    yield entry
+
+            yield ReportSection(current[3:].strip(), [current], entries(current))
+            current = state["next"]
+
+    return header, generate(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a markdown report as paginated HTML")
+    parser.add_argument("report", help="Markdown report (fields_analysis.md, form_controls_report.md, ...)")
+    parser.add_argument("--output", "-o", help="Output directory (default: <report>_html)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Entries per HTML page")
+
+    args = parser.parse_args()
+
+    if args.page_size < 1:
+        print("❌ --page-size must be at least 1")
+        sys.exit(1)
+
+    report = Path(args.report)
+    if not report.exists():
+        print(f"❌ File not found: {report}")
+        sys.exit(1)
+
+    output_dir = Path(args.output) if args.output else report.with_name(f"{report.stem}_html")
+    with open(report, 'r', encoding='utf-8') as f:
+        header, sections = sections_from_markdown(line.rstrip("\n") for line in f)
+        title = next((line[2:].strip() for line in header if line.startswith("# ")), report.stem)
+        index = write_html_report(output_dir, title, header, sections, args.page_size)
+
+    pages = len(_previous_pages(output_dir))
+    print(f"✅ {pages} pages written")
+    print(f"💾 Index: {index}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Extraction Run Journal
+
+Append-only, fsync'd JSONL journal of per-document stage completion for
+long extraction batches (batch_extract.py), plus atomic file writes:
+- Every completed stage is journaled with the SHA-256 of the input PDF
+- On restart, documents whose journaled hash still matches skip finished
+  stages; changed PDFs are processed again from scratch
+- A torn last line (crash mid-append) is ignored
+- atomic_write() writes to a temporary file, fsyncs and renames it over the
+  target, so a crash never leaves a half-written fields_raw.json behind
+
+Usage:
+    python run_journal.py <journal.jsonl>    # summarize a journal
+"""
+
+import os
+import sys
+import json
+import hashlib
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Set
+
+JOURNAL_NAME = "run_journal.jsonl"
+
+
+@contextmanager
+def atomic_write(path, mode: str = 'w', encoding: Optional[str] = None):
+    """Open a temporary sibling of `path`; it replaces `path` only if the block completes"""
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, mode, encoding=encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def file_sha256(path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RunJournal:
+    """Stage completions per (document, input hash), replayed from an append-only JSONL file"""
+
+    def __init__(self, journal_path):
+        self.path = Path(journal_path)
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.finished: Dict[str, Dict[str, Any]] = {}
+        torn = False
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                for line in f:
+                    torn = not line.endswith("\n")
+                    try:
+                        self._apply(json.loads(line))
+                    except (ValueError, KeyError):
+                        # Torn last line from a crash mid-append
+                        continue
+        self.file = open(self.path, 'a')
+        if torn:
+            # Start the next entry on its own line
+            self.file.write("\n")
+
+    @staticmethod
+    def _key(pdf: str, sha256: str) -> str:
+        return f"{pdf}\0{sha256}"
+
+    def _apply(self, entry: Dict[str, Any]):
+        key = self._key(entry["pdf"], entry["sha256"])
+        if entry["event"] == "stage":
+            self.stages.setdefault(key, {})[entry["stage"]] = entry
+        elif entry["event"] == "document":
+            self.finished[key] = entry
+
+    def _append(self, entry: Dict[str, Any]):
+        entry["at"] = datetime.now().isoformat()
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._apply(entry)
+
+    def record_stage(self, pdf: str, sha256: str, stage: str, mode: str, output_dir: str, **details):
+        self._append({"event": "stage", "pdf": pdf, "sha256": sha256, "stage": stage, "mode": mode,
+                      "output_dir": output_dir, **details})
+
+    def record_document(self, pdf: str, sha256: str, status: str, output_dir: str):
+        self._append({"event": "document", "pdf": pdf, "sha256": sha256, "status": status,
+                      "output_dir": output_dir})
+
+    def completed_stages(self, pdf: str, sha256: str) -> Set[str]:
+        return set(self.stages.get(self._key(pdf, sha256), {}))
+
+    def document_status(self, pdf: str, sha256: str) -> Optional[str]:
+        """Final status of a document with this exact input, or None if it never finished"""
+        entry = self.finished.get(self._key(pdf, sha256))
+        return entry["status"] if entry else None
+
+    def close(self):
+        self.file.close()
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python run_journal.py <journal.jsonl>")
+        sys.exit(1)
+
+    if not Path(sys.argv[1]).exists():
+        print(f"❌ File not found: {sys.argv[1]}")
+        sys.exit(1)
+
+    journal = RunJournal(sys.argv[1])
+    journal.close()
+    statuses: Dict[str, int] = {}
+    for entry in journal.finished.values():
+        statuses[entry["status"]] = statuses.get(entry["status"], 0) + 1
+    in_progress = len(set(journal.stages) - set(journal.finished))
+    print(f"📒 {journal.path}: {len(journal.finished)} documents finished, {in_progress} in progress")
+    for status, count in sorted(statuses.items()):
+        print(f"   {status}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Questionnaire Schema Validator
+
+This script checks generated questionnaires before they are emitted, so
+structural mistakes fail the build instead of surfacing in the backend:
+- A JSON Schema is derived from the zod schemas in
+  backend/src/types/questionnaire.ts (objects, arrays, enums, optional and
+  defaulted fields), so it follows the backend types as they change
+- The schema is compiled to Python code with fastjsonschema once per process;
+  --emit-schema / --emit-validator write the schema and the generated code
+- Radio, select and multi-select questions must have options
+- Cross-references the schema cannot express: duplicate section and question
+  ids, dependsOn pointing at no question, showWhen/hideWhen values that are
+  not options of the question they depend on
+- convert_questionnaire_to_backend.py and generate_complete_questionnaire.py
+  run it before writing their output
+
+Usage:
+    python validate_questionnaire_schema.py <questionnaire.json|dir> [more ...]
+    python validate_questionnaire_schema.py --emit-schema questionnaire.schema.json --emit-validator questionnaire_validator.py
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+# Resolved from the repository root so the generators can run from any directory
+TYPES_PATH = Path(__file__).resolve().parent.parent / "backend" / "src" / "types" / "questionnaire.ts"
+ROOT_SCHEMA = "Questionnaire"
+OPTION_QUESTION_TYPES = ["radio", "select", "multi_select"]
+
+# Fields convert_questionnaire_to_backend.py adds; the generated JSON does not carry them
+CONVERTER_DEFAULTS = {
+    "createdAt": "2024-01-01T00:00:00Z",
+    "updatedAt": "2024-01-01T00:00:00Z",
+    "createdBy": "system",
+    "isActive": True,
+}
+
+_TOKEN = re.compile(r"\s+|//[^\n]*|/\*.*?\*/|'(?:\\.|[^'\\])*'|\"(?:\\.|[^\"\\])*\"|-?\d+(?:\.\d+)?|\w+|.",
+                    re.DOTALL)
+
+
+class ZodSchemaParser:
+    """Translates the subset of zod used by the backend types into JSON Schema"""
+
+    def __init__(self, source: str):
+        self.tokens = [t for t in _TOKEN.findall(source) if not t.isspace() and not t.startswith(("//", "/*"))]
+        self.pos = 0
+        self.enums: Dict[str, List[str]] = {}
+        self.definitions: Dict[str, Dict[str, Any]] = {}
+
+    def _peek(self, offset: int = 0) -> Optional[str]:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def _next(self, expected: Optional[str] = None) -> str:
+        token = self._peek()
+        if token is None or (expected is not None and token != expected):
+            raise ValueError(f"Expected {expected!r} at token {self.pos}, got {token!r}")
+        self.pos += 1
+        return token
+
+    @staticmethod
+    def _literal(token: str) -> Any:
+        if token[0] in "'\"":
+            return token[1:-1]
+        if token in ("true", "false"):
+            return token == "true"
+        return float(token) if "." in token else int(token)
+
+    def parse(self) -> Dict[str, Dict[str, Any]]:
+        while self._peek() is not None:
+            if self._peek() == "export" and self._peek(1) == "enum":
+                self.pos += 2
+                self._parse_enum()
+            elif self._peek() == "export" and self._peek(1) == "const" and self._peek(3) == "=" \
+                    and (self._peek(4) == "z" or self._peek(4) in self._schema_names()):
+                self.pos += 2
+                name = self._next()
+                self._next("=")
+                schema, _ = self._parse_expression()
+                self.definitions[name[:-len("Schema")] if name.endswith("Schema") else name] = schema
+            else:
+                self.pos += 1
+        return self.definitions
+
+    def _schema_names(self) -> List[str]:
+        return [f"{name}Schema" for name in self.definitions]
+
+    def _parse_enum(self):
+        name = self._next()
+        self._next("{")
+        values = []
+        while self._peek() != "}":
+            self._next()  # member name
+            self._next("=")
+            values.append(self._literal(self._next()))
+            if self._peek() == ",":
+                self._next()
+        self._next("}")
+        self.enums[name] = values
+
+    def _parse_arguments(self) -> List[Tuple[Dict[str, Any], bool]]:
+        """Comma-separated zod expressions up to the closing parenthesis"""
+        args = []
+        while self._peek() != ")":
+            args.append(self._parse_expression())
+            if self._peek() == ",":
+                self._next()
+        self._next(")")
+        return args
+
+    def _parse_expression(self) -> Tuple[Dict[str, Any], bool]:
+        """(JSON Schema, optional) for one zod expression with its method chain"""
+        token = self._next()
+        if token == "z":
+            self._next(".")
+            schema = self._parse_constructor(self._next())
+        elif token.endswith("Schema") and token[:-len("Schema")] in self.definitions:
+            schema = {"$ref": f"#/definitions/{token[:-len('Schema')]}"}
+        elif token == "[":
+            items = []
+            while self._peek() != "]":
+                items.append(self._parse_expression()[0])
+                if self._peek() == ",":
+                    self._next()
+            self._next("]")
+            return {"items": items}, False
+        else:
+            return {"const": self._literal(token)}, False
+
+        optional = False
+        while self._peek() == ".":
+            self._next(".")
+            method = self._next()
+            self._next("(")
+            if method in ("optional", "nullish"):
+                optional = True
+                self._parse_arguments()
+            elif method == "nullable":
+                schema = {"anyOf": [schema, {"type": "null"}]}
+                self._parse_arguments()
+            elif method == "default":
+                optional = True
+                args = self._parse_arguments()
+                if args and "const" in args[0][0]:
+                    schema = {**schema, "default": args[0][0]["const"]}
+            elif method in ("min", "max", "length"):
+                args = self._parse_arguments()
+                bound = args[0][0].get("const") if args else None
+                kind = "Items" if schema.get("type") == "array" else "Length" if schema.get("type") == "string" else ""
+                if bound is not None and kind:
+                    if method == "length":
+                        schema = {**schema, f"min{kind}": bound, f"max{kind}": bound}
+                    else:
+                        schema = {**schema, f"{method}{kind}": bound}
+                elif bound is not None:
+                    schema = {**schema, "minimum" if method == "min" else "maximum": bound}
+            elif method in ("email", "url", "uuid"):
+                self._parse_arguments()
+                schema = {**schema, "format": {"url": "uri"}.get(method, method)}
+            else:
+                # Refinements and transforms have no JSON Schema equivalent
+                self._parse_arguments()
+        return schema, optional
+
+    def _parse_constructor(self, name: str) -> Dict[str, Any]:
+        self._next("(")
+        if name == "object":
+            self._next("{")
+            properties, required = {}, []
+            while self._peek() != "}":
+                key = self._next()
+                self._next(":")
+                schema, optional = self._parse_expression()
+                properties[key] = schema
+                if not optional:
+                    required.append(key)
+                if self._peek() == ",":
+                    self._next()
+            self._next("}")
+            self._next(")")
+            schema = {"type": "object", "properties": properties}
+            if required:
+                schema["required"] = required
+            return schema
+        if name == "nativeEnum":
+            enum_name = self._next()
+            self._next(")")
+            return {"type": "string", "enum": self.enums[enum_name]}
+
+        args = self._parse_arguments()
+        if name in ("string", "number", "boolean"):
+            return {"type": name}
+        if name == "date":
+            # Dates travel as strings in JSON
+            return {"type": "string"}
+        if name == "array":
+            return {"type": "array", "items": args[0][0]}
+        if name == "union":
+            return {"anyOf": args[0][0]["items"]}
+        if name == "enum":
+            return {"type": "string", "enum": [item["const"] for item in args[0][0]["items"]]}
+        if name == "literal":
+            return {"const": args[0][0]["const"]}
+        if name == "record":
+            return {"type": "object", "additionalProperties": args[-1][0]}
+        # z.any(), z.unknown() and anything else unconstrained
+        return {}
+
+
+def derive_schema(types_path=TYPES_PATH) -> Dict[str, Any]:
+    """JSON Schema for a questionnaire from the zod schemas in the backend types"""
+    definitions = ZodSchemaParser(Path(types_path).read_text()).parse()
+    if ROOT_SCHEMA not in definitions:
+        raise ValueError(f"No {ROOT_SCHEMA}Schema in {types_path}")
+
+    # Choice questions are unusable without options
+    definitions["Question"]["allOf"] = [{
+        "if": {"properties": {"type": {"enum": OPTION_QUESTION_TYPES}}, "required": ["type"]},
+        "then": {"required": ["options"], "properties": {"options": {"minItems": 1}}},
+    }]
+    return {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "title": ROOT_SCHEMA,
+        **definitions[ROOT_SCHEMA],
+        "definitions": {name: schema for name, schema in definitions.items() if name != ROOT_SCHEMA},
+    }
+
+
+def check_references(questionnaire: Dict[str, Any]) -> List[str]:
+    """Id uniqueness and conditional-logic targets across the whole questionnaire"""
+    errors = []
+    questions: Dict[str, Dict[str, Any]] = {}
+    section_ids = set()
+    for section in questionnaire["sections"]:
+        if section["id"] in section_ids:
+            errors.append(f"sections.{section['id']}: duplicate section id")
+        section_ids.add(section["id"])
+        for question in section["questions"]:
+            if question["id"] in questions:
+                errors.append(f"sections.{section['id']}.{question['id']}: duplicate question id")
+            questions.setdefault(question["id"], question)
+
+    owners = [(f"sections.{s['id']}", s.get("conditionalLogic")) for s in questionnaire["sections"]]
+    owners += [(f"sections.{s['id']}.{q['id']}", q.get("conditionalLogic"))
+               for s in questionnaire["sections"] for q in s["questions"]]
+    for location, logic in owners:
+        if not logic or not logic.get("dependsOn"):
+            continue
+        target = questions.get(logic["dependsOn"])
+        if target is None:
+            errors.append(f"{location}: dependsOn '{logic['dependsOn']}' is not a question")
+            continue
+        if location.endswith(f".{logic['dependsOn']}"):
+            errors.append(f"{location}: depends on itself")
+        options = {option["value"] for option in target.get("options") or []}
+        for key in ("showWhen", "hideWhen"):
+            unknown = [value for value in logic.get(key) or [] if options and value not in options]
+            if unknown:
+                errors.append(f"{location}: {key} {unknown} not among the options of '{logic['dependsOn']}'")
+    return errors
+
+
+class QuestionnaireSchemaValidator:
+    """Compiled schema validator plus the cross-reference checks"""
+
+    def __init__(self, types_path=TYPES_PATH):
+        if fastjsonschema is None:
+            raise ImportError("fastjsonschema is required: pip install fastjsonschema")
+        self.schema = derive_schema(types_path)
+        self._validate = fastjsonschema.compile(self.schema)
+
+    def generated_code(self) -> str:
+        return fastjsonschema.compile_to_code(self.schema)
+
+    def validate(self, questionnaire: Dict[str, Any]) -> List[str]:
+        """Error messages; empty when the questionnaire is valid"""
+        try:
+            self._validate({**CONVERTER_DEFAULTS, **questionnaire})
+        except fastjsonschema.JsonSchemaValueException as e:
+            # Cross-reference checks need a structurally valid questionnaire
+            return [e.message]
+        return check_references(questionnaire)
+
+
+_default_validator: Optional[QuestionnaireSchemaValidator] = None
+
+
+def check_before_emit(questionnaire: Dict[str, Any]) -> List[str]:
+    """Pipeline hook for the generators; skipped with a warning when fastjsonschema or the types are missing"""
+    global _default_validator
+    if _default_validator is None:
+        if fastjsonschema is None or not TYPES_PATH.exists():
+            print("⚠️  Skipping questionnaire schema validation (needs fastjsonschema and "
+                  f"{TYPES_PATH}; pip install fastjsonschema)")
+            return []
+        _default_validator = QuestionnaireSchemaValidator()
+    return _default_validator.validate(questionnaire)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate generated questionnaires against the backend types")
+    parser.add_argument("paths", nargs="*", help="Questionnaire JSONs or directories (complete_questionnaire.json)")
+    parser.add_argument("--types", default=str(TYPES_PATH), help="Backend questionnaire types")
+    parser.add_argument("--emit-schema", help="Write the derived JSON Schema to this file")
+    parser.add_argument("--emit-validator", help="Write the generated validator code to this file")
+
+    args = parser.parse_args()
+
+    if fastjsonschema is None:
+        print("❌ fastjsonschema is required: pip install fastjsonschema")
+        sys.exit(1)
+    if not Path(args.types).exists():
+        print(f"❌ File not found: {args.types}")
+        sys.exit(1)
+
+    validator = QuestionnaireSchemaValidator(args.types)
+    if args.emit_schema:
+        with open(args.emit_schema, 'w') as f:
+            json.dump(validator.schema, f, indent=2)
+        print(f"💾 Schema saved to: {args.emit_schema}")
+    if args.emit_validator:
+        with open(args.emit_validator, 'w') as f:
+            f.write(validator.generated_code())
+        print(f"💾 Validator saved to: {args.emit_validator}")
+
+    paths = []
+    for path in map(Path, args.paths):
+        paths.extend(sorted(path.rglob("complete_questionnaire.json")) if path.is_dir() else [path])
+
+    started = time.perf_counter()
+    invalid = 0
+    for path in paths:
+        try:
+            with open(path, 'r') as f:
+                errors = validator.validate(json.load(f))
+        except (OSError, ValueError) as e:
+            errors = [str(e)]
+        if errors:
+            invalid += 1
+            print(f"❌ {path}")
+            for error in errors:
+                print(f"   {error}")
+    elapsed = time.perf_counter() - started
+
+    if paths:
+        print(f"✅ {len(paths) - invalid}/{len(paths)} questionnaires valid in {elapsed * 1000:.1f}ms")
+    if invalid:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
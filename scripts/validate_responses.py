@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Bulk Questionnaire Response Validator
+
+This script re-validates a whole response store (JSONL export, e.g. from
+harvest_filled_pdfs.py or the submissions API) against a questionnaire
+version:
+- The questionnaire is compiled once per worker: precompiled validation
+  patterns, option sets, a required-question bitmap and one visibility mask
+  per conditionalLogic rule
+- Required questions hidden by conditional logic (dependsOn/showWhen/
+  hideWhen, section requiredModes) are not reported as missing, matching
+  questionnaireService.evaluateConditionalLogic
+- maxLength/minLength/min/max, email/url/number/date formats and option
+  values are checked for every answered, visible question
+- Responses are validated in a multiprocessing pool in chunks of lines; one
+  JSONL line per response with its error list is written in input order
+
+Usage:
+    python validate_responses.py <responses.jsonl> [--questionnaire extracted_fields/complete_questionnaire.json]
+                                 [--output responses.validation.jsonl] [--workers 4] [--strict]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator, NamedTuple, FrozenSet
+
+from fill_pdf_responses import DEFAULT_QUESTIONNAIRE
+from validate_x12_batch import extract_answers
+
+CHUNK_LINES = 500
+MODE_QUESTION = "implementation-mode-selection"
+
+FORMAT_PATTERNS = {
+    "email": re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$"),
+    "url": re.compile(r"^(https?://)?[\w.-]+\.[a-z]{2,}(/\S*)?$", re.IGNORECASE),
+    "date": re.compile(r"^(\d{4}-\d{2}-\d{2}(T[\d:.]+Z?)?|\d{1,2}/\d{1,2}/\d{2,4})$"),
+}
+OPTION_TYPES = {"radio", "select"}
+MULTI_OPTION_TYPES = {"checkbox", "multi_select"}
+
+
+class QuestionRule(NamedTuple):
+    bit: int
+    id: str
+    type: str
+    pattern: Optional["re.Pattern"]
+    max_length: Optional[int]
+    min_length: Optional[int]
+    minimum: Optional[float]
+    maximum: Optional[float]
+    options: Optional[FrozenSet[str]]
+
+
+class VisibilityRule(NamedTuple):
+    """Questions in `mask` are hidden unless the condition holds"""
+    mask: int
+    depends_on: Optional[str]
+    show_when: Optional[FrozenSet[str]]
+    hide_when: Optional[FrozenSet[str]]
+    required_modes: Optional[FrozenSet[str]]
+
+
+def _value_set(values) -> Optional[FrozenSet[str]]:
+    return frozenset(str(v) for v in values) if values else None
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+class CompiledQuestionnaire:
+    """A questionnaire reduced to per-question rules and bitmaps over question positions"""
+
+    def __init__(self, questionnaire: Dict[str, Any]):
+        self.version = questionnaire.get("version", "")
+        self.rules: Dict[str, QuestionRule] = {}
+        self.required_mask = 0
+        self.visibility: List[VisibilityRule] = []
+
+        bit = 0
+        for section in questionnaire.get("sections", []):
+            section_mask = 0
+            for question in section.get("questions", []):
+                if question.get("type") == "display":
+                    continue
+                question_bit = 1 << bit
+                bit += 1
+                section_mask |= question_bit
+                self.rules[question["id"]] = self._compile_question(question_bit, question)
+                if question.get("required"):
+                    self.required_mask |= question_bit
+                self._add_visibility(question_bit, question.get("conditionalLogic"))
+            self._add_visibility(section_mask, section.get("conditionalLogic"))
+        self.question_count = bit
+
+    @staticmethod
+    def _compile_question(bit: int, question: Dict[str, Any]) -> QuestionRule:
+        validation = question.get("validation") or {}
+        pattern = validation.get("pattern")
+        return QuestionRule(
+            bit=bit,
+            id=question["id"],
+            type=question.get("type", "text"),
+            pattern=re.compile(pattern) if pattern else None,
+            max_length=validation.get("maxLength"),
+            min_length=validation.get("minLength"),
+            minimum=validation.get("min"),
+            maximum=validation.get("max"),
+            options=_value_set(opt["value"] for opt in question.get("options") or []),
+        )
+
+    def _add_visibility(self, mask: int, logic: Optional[Dict[str, Any]]):
+        if not mask or not logic:
+            return
+        rule = VisibilityRule(
+            mask=mask,
+            depends_on=logic.get("dependsOn"),
+            show_when=_value_set(logic.get("showWhen")),
+            hide_when=_value_set(logic.get("hideWhen")),
+            required_modes=_value_set(logic.get("requiredModes")),
+        )
+        if rule.depends_on or rule.required_modes:
+            self.visibility.append(rule)
+
+    def hidden_mask(self, answers: Dict[str, Any], mode: Optional[str]) -> int:
+        hidden = 0
+        for rule in self.visibility:
+            if rule.required_modes and mode and mode not in rule.required_modes:
+                hidden |= rule.mask
+                continue
+            if not rule.depends_on:
+                continue
+            value = answers.get(rule.depends_on)
+            # Multi-select answers match when any selected value does
+            values = {str(v) for v in value} if isinstance(value, list) else {str(value)}
+            if rule.show_when is not None:
+                if not values & rule.show_when:
+                    hidden |= rule.mask
+            elif rule.hide_when is not None and values & rule.hide_when:
+                hidden |= rule.mask
+        return hidden
+
+    def validate(self, record: Dict[str, Any], strict: bool = False) -> List[Dict[str, str]]:
+        answers = extract_answers(record)
+        mode = record.get("implementationMode") or answers.get(MODE_QUESTION)
+        hidden = self.hidden_mask(answers, mode)
+        answered = 0
+        errors = []
+
+        for question_id, value in answers.items():
+            rule = self.rules.get(question_id)
+            if rule is None:
+                if strict:
+                    errors.append(_error(question_id, "unknown-question", "Not a question of this questionnaire"))
+                continue
+            if _is_empty(value):
+                continue
+            answered |= rule.bit
+            if rule.bit & hidden:
+                continue
+            errors.extend(_check_value(rule, value))
+
+        missing = self.required_mask & ~answered & ~hidden
+        if missing:
+            errors.extend(_error(rule.id, "required", "Required question not answered")
+                          for rule in self.rules.values() if rule.bit & missing)
+        return errors
+
+
+def _error(question_id: str, rule: str, message: str) -> Dict[str, str]:
+    return {"question": question_id, "rule": rule, "message": message}
+
+
+def _check_value(rule: QuestionRule, value: Any) -> Iterator[Dict[str, str]]:
+    if rule.type in MULTI_OPTION_TYPES:
+        values = value if isinstance(value, list) else [value]
+        if rule.options is not None:
+            for v in values:
+                if str(v) not in rule.options:
+                    yield _error(rule.id, "option", f"'{v}' is not an option")
+        return
+    if rule.type in OPTION_TYPES:
+        if rule.options is not None and str(value) not in rule.options:
+            yield _error(rule.id, "option", f"'{value}' is not an option")
+        return
+
+    text = str(value)
+    if rule.max_length is not None and len(text) > rule.max_length:
+        yield _error(rule.id, "maxLength", f"{len(text)} characters, at most {rule.max_length} allowed")
+    if rule.min_length is not None and len(text) < rule.min_length:
+        yield _error(rule.id, "minLength", f"{len(text)} characters, at least {rule.min_length} required")
+    if rule.pattern is not None and not rule.pattern.search(text):
+        yield _error(rule.id, "pattern", f"Does not match {rule.pattern.pattern}")
+    if rule.type in FORMAT_PATTERNS and not FORMAT_PATTERNS[rule.type].match(text.strip()):
+        yield _error(rule.id, "format", f"Not a valid {rule.type}")
+    if rule.type == "number" or rule.minimum is not None or rule.maximum is not None:
+        try:
+            number = float(text)
+        except ValueError:
+            if rule.type == "number":
+                yield _error(rule.id, "format", "Not a valid number")
+            return
+        if rule.minimum is not None and number < rule.minimum:
+            yield _error(rule.id, "min", f"{number:g} is below {rule.minimum}")
+        if rule.maximum is not None and number > rule.maximum:
+            yield _error(rule.id, "max", f"{number:g} is above {rule.maximum}")
+
+
+# Worker state, set once per process by _init_worker
+_compiled: Optional[CompiledQuestionnaire] = None
+_strict = False
+
+
+def _init_worker(questionnaire: Dict[str, Any], strict: bool):
+    global _compiled, _strict
+    _compiled = CompiledQuestionnaire(questionnaire)
+    _strict = strict
+
+
+def validate_chunk(chunk: List[tuple]) -> List[Dict[str, Any]]:
+    """Validate (line number, raw JSON line) pairs in a worker"""
+    results = []
+    for line_number, line in chunk:
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"expected a JSON object, got {type(record).__name__}")
+        except ValueError as e:
+            results.append({"line": line_number, "responseId": None, "valid": False,
+                            "errors": [_error("", "json", str(e))]})
+            continue
+        errors = _compiled.validate(record, _strict)
+        results.append({"line": line_number, "responseId": record.get("responseId") or record.get("id"),
+                        "valid": not errors, "errors": errors})
+    return results
+
+
+def iter_chunks(responses_path: str, size: int = CHUNK_LINES) -> Iterator[List[tuple]]:
+    with open(responses_path, 'r') as f:
+        lines = ((n, line) for n, line in enumerate(f, 1) if line.strip())
+        while True:
+            chunk = list(islice(lines, size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def map_bounded(pool: ProcessPoolExecutor, fn, items: Iterator, window: int) -> Iterator:
+    """Like pool.map, in order, but with at most `window` items in flight so the input is never read ahead"""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate stored questionnaire responses against a questionnaire")
+    parser.add_argument("responses", help="Responses JSONL (one response record or answers object per line)")
+    parser.add_argument("--questionnaire", "-q", default=DEFAULT_QUESTIONNAIRE, help="Questionnaire JSON")
+    parser.add_argument("--output", "-o", help="Per-response results JSONL (default: <responses>.validation.jsonl)")
+    parser.add_argument("--workers", "-w", type=int, default=os.cpu_count() or 2, help="Worker processes")
+    parser.add_argument("--strict", action="store_true", help="Report answers to questions not in the questionnaire")
+
+    args = parser.parse_args()
+
+    for path in (args.responses, args.questionnaire):
+        if not Path(path).exists():
+            print(f"❌ File not found: {path}")
+            sys.exit(1)
+
+    with open(args.questionnaire, 'rb') as f:
+        raw = f.read()
+    questionnaire = json.loads(raw)
+    compiled = CompiledQuestionnaire(questionnaire)
+    output_path = args.output or f"{args.responses}.validation.jsonl"
+    print(f"📋 Questionnaire {compiled.version} ({hashlib.sha256(raw).hexdigest()[:12]}): "
+          f"{compiled.question_count} questions, {bin(compiled.required_mask).count('1')} required, "
+          f"{len(compiled.visibility)} visibility rules")
+
+    started = time.perf_counter()
+    total = invalid = 0
+    by_rule: Dict[str, int] = {}
+    with open(output_path, 'w') as output, \
+            ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                                initargs=(questionnaire, args.strict)) as pool:
+        for results in map_bounded(pool, validate_chunk, iter_chunks(args.responses), 2 * args.workers):
+            for result in results:
+                total += 1
+                if not result["valid"]:
+                    invalid += 1
+                    for error in result["errors"]:
+                        by_rule[error["rule"]] = by_rule.get(error["rule"], 0) + 1
+                output.write(json.dumps(result) + "\n")
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ Validated {total} responses in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.0f}/s)")
+    if invalid:
+        rules = ", ".join(f"{rule} {count}" for rule, count in sorted(by_rule.items(), key=lambda item: -item[1]))
+        print(f"⚠️  {invalid} invalid responses ({rules})")
+    print(f"💾 Saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Streaming X12 270/271 Batch File Validator
+
+This script checks real EDI batch files against a payer's questionnaire answers:
+- Memory-mapped, segment-at-a-time tokenizing (constant memory for multi-GB files)
+- Element, sub-element, repetition and segment separators auto-detected from each ISA header
+- ISA/IEA, GS/GE and ST/SE envelope pairing, counts and control numbers
+- ISA06/ISA08/GS02/GS03 checked against the enveloping requirement answers
+- X12 basic/extended character set and inbound file naming convention checks
+
+Usage:
+    python validate_x12_batch.py <batch_file> [--answers answers.json] [--direction 270|271] [--output report.json]
+"""
+
+import sys
+import json
+import mmap
+import argparse
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterator, NamedTuple
+
+# X12 basic character set (uppercase, digits, space and basic specials)
+X12_BASIC_CHARACTERS = frozenset(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 !\"&'()*+,-./:;?="
+)
+
+# Enveloping answers from the questionnaire, keyed by direction.
+# The form labels the 271 receiver question ISA07, but it asks for the
+# receiver ID, which is carried in ISA08.
+ENVELOPE_ANSWER_KEYS = {
+    "270": {
+        "ISA06": "isa06-270",
+        "ISA08": "isa08-270",
+        "GS02": "gs02-270",
+        "GS03": "gs03-270",
+    },
+    "271": {
+        "ISA06": "isa06-271",
+        "ISA08": "isa07-271",
+        "GS02": "gs02-271",
+        "GS03": "gs03-271",
+    },
+}
+
+EXPECTED_FUNCTIONAL_IDS = {"270": "HS", "271": "HB"}
+EXPECTED_VERSION = "005010X279A1"
+
+
+class Separators(NamedTuple):
+    element: bytes
+    repetition: bytes
+    component: bytes
+    segment: bytes
+
+
+class Segment(NamedTuple):
+    offset: int
+    segment_id: str
+    elements: List[bytes]
+
+
+class X12Tokenizer:
+    """Memory-mapped, streaming X12 segment tokenizer"""
+
+    def __init__(self, file_path: str):
+        self.file_path = Path(file_path)
+        self.separators: Optional[Separators] = None
+        self._file = None
+        self._mm = None
+
+    def __enter__(self):
+        self._file = open(self.file_path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self
+
+    def __exit__(self, *exc):
+        self._mm.close()
+        self._file.close()
+
+    @staticmethod
+    def detect_separators(header: bytes) -> Separators:
+        """Detect separators from an ISA header (tolerates non fixed-width ISA)"""
+        if not header.startswith(b"ISA") or len(header) < 4:
+            raise ValueError("Interchange does not start with an ISA segment")
+
+        element = header[3:4]
+        position = 3
+        for _ in range(15):
+            position = header.find(element, position + 1)
+            if position == -1:
+                raise ValueError("ISA header is truncated")
+
+        component = header[position + 1:position + 2]
+        segment = header[position + 2:position + 3]
+        isa_elements = header[:position].split(element)
+        # ISA11 is the repetition separator from version 00501 onward
+        repetition = isa_elements[11][:1] if len(isa_elements) > 12 and isa_elements[12] >= b"00501" else b""
+
+        if not component or not segment:
+            raise ValueError("ISA header is truncated")
+        return Separators(element, repetition, component, segment)
+
+    def segments(self) -> Iterator[Segment]:
+        """Yield segments one at a time, re-detecting separators at each ISA"""
+        mm = self._mm
+        size = len(mm)
+        position = 0
+
+        while position < size:
+            # Skip line breaks and padding between segments
+            while position < size and mm[position:position + 1] in (b"\r", b"\n", b" ", b"\t"):
+                position += 1
+            if position >= size:
+                break
+
+            if mm[position:position + 3] == b"ISA":
+                self.separators = self.detect_separators(mm[position:position + 128])
+            elif self.separators is None:
+                raise ValueError(f"Data found before the first ISA segment at byte {position}")
+
+            end = mm.find(self.separators.segment, position)
+            if end == -1:
+                end = size
+            raw = mm[position:end]
+            elements = raw.split(self.separators.element)
+            yield Segment(position, elements[0].decode('ascii', errors='replace'), elements)
+            position = end + 1
+
+
+class EnvelopeValidator:
+    """Validate envelopes, control numbers and answer-driven rules in one pass"""
+
+    def __init__(self, answers: Dict[str, Any] = None, direction: str = "270", max_errors: int = 1000):
+        self.answers = answers or {}
+        self.direction = direction
+        self.max_errors = max_errors
+        self.expected_ids = self._resolve_expected_ids()
+        self.check_basic_set = self._answer_is_no("x12-extended-character-set")
+        self.check_spaces = self._answer_is_no("x12-basic-character-set")
+        self.errors: List[Dict[str, Any]] = []
+        self.error_count = 0
+        self.stats = {
+            "segments": 0,
+            "interchanges": 0,
+            "functional_groups": 0,
+            "transactions": 0,
+        }
+
+    def _answer_is_no(self, question_id: str) -> bool:
+        return str(self.answers.get(question_id, "")).strip().lower() == "no"
+
+    def _resolve_expected_ids(self) -> Dict[str, str]:
+        """Resolve the enveloping radio answers (and their custom values) to IDs"""
+        expected = {}
+        for element, question_id in ENVELOPE_ANSWER_KEYS[self.direction].items():
+            value = str(self.answers.get(question_id, "")).strip()
+            if value == "custom":
+                value = str(self.answers.get(f"{question_id}-custom", "")).strip()
+            # "Availity defines" / "01" are qualifiers rather than IDs we can check
+            if value and value not in ("availity_defines", "01"):
+                expected[element] = value
+        return expected
+
+    def _error(self, segment: Segment, rule: str, message: str):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({
+                "offset": segment.offset,
+                "segment": segment.segment_id,
+                "rule": rule,
+                "message": message,
+            })
+
+    @staticmethod
+    def _element(segment: Segment, index: int) -> str:
+        if index < len(segment.elements):
+            return segment.elements[index].decode('ascii', errors='replace').strip()
+        return ""
+
+    def validate_file_name(self, file_path: Path):
+        """Check the file name against the naming convention answer, if it is a pattern"""
+        convention = str(self.answers.get("naming-convention-inbound-files", "")).strip()
+        if convention and any(char in convention for char in "*?[") and " " not in convention:
+            if not fnmatch(file_path.name, convention):
+                self.error_count += 1
+                self.errors.append({
+                    "offset": 0,
+                    "segment": "",
+                    "rule": "FILE_NAMING_CONVENTION",
+                    "message": f"File name '{file_path.name}' does not match '{convention}'",
+                })
+
+    def validate(self, file_path: str) -> Dict[str, Any]:
+        """Validate a batch file in a single streaming pass"""
+        path = Path(file_path)
+        self.validate_file_name(path)
+
+        isa = gs = st = None
+        group_count = transaction_count = segment_count = 0
+        interchange_controls = set()
+        group_controls = set()
+        transaction_controls = set()
+
+        with X12Tokenizer(path) as tokenizer:
+            for segment in tokenizer.segments():
+                self.stats["segments"] += 1
+                segment_id = segment.segment_id
+                if st is not None:
+                    segment_count += 1
+
+                if segment_id != "ISA":
+                    self._check_character_set(segment, tokenizer.separators)
+
+                if segment_id == "ISA":
+                    if isa is not None:
+                        self._error(segment, "ISA_WITHOUT_IEA", "ISA found before the previous IEA")
+                    isa = segment
+                    group_count = 0
+                    group_controls = set()
+                    self.stats["interchanges"] += 1
+                    control = self._element(segment, 13)
+                    if control in interchange_controls:
+                        self._error(segment, "DUPLICATE_ISA13", f"Duplicate interchange control number {control}")
+                    interchange_controls.add(control)
+                    self._check_expected(segment, "ISA06", 6)
+                    self._check_expected(segment, "ISA08", 8)
+
+                elif segment_id == "GS":
+                    if isa is None:
+                        self._error(segment, "GS_OUTSIDE_ISA", "GS found outside an interchange")
+                    if gs is not None:
+                        self._error(segment, "GS_WITHOUT_GE", "GS found before the previous GE")
+                    gs = segment
+                    group_count += 1
+                    transaction_count = 0
+                    transaction_controls = set()
+                    self.stats["functional_groups"] += 1
+                    control = self._element(segment, 6)
+                    if control in group_controls:
+                        self._error(segment, "DUPLICATE_GS06", f"Duplicate group control number {control}")
+                    group_controls.add(control)
+                    expected_id = EXPECTED_FUNCTIONAL_IDS[self.direction]
+                    if self._element(segment, 1) != expected_id:
+                        self._error(segment, "GS01", f"Expected functional ID {expected_id}, got {self._element(segment, 1)}")
+                    if self._element(segment, 8) != EXPECTED_VERSION:
+                        self._error(segment, "GS08", f"Expected version {EXPECTED_VERSION}, got {self._element(segment, 8)}")
+                    self._check_expected(segment, "GS02", 2)
+                    self._check_expected(segment, "GS03", 3)
+
+                elif segment_id == "ST":
+                    if gs is None:
+                        self._error(segment, "ST_OUTSIDE_GS", "ST found outside a functional group")
+                    if st is not None:
+                        self._error(segment, "ST_WITHOUT_SE", "ST found before the previous SE")
+                    st = segment
+                    segment_count = 1
+                    transaction_count += 1
+                    self.stats["transactions"] += 1
+                    control = self._element(segment, 2)
+                    if control in transaction_controls:
+                        self._error(segment, "DUPLICATE_ST02", f"Duplicate transaction control number {control}")
+                    transaction_controls.add(control)
+                    if self._element(segment, 1) != self.direction:
+                        self._error(segment, "ST01", f"Expected transaction set {self.direction}, got {self._element(segment, 1)}")
+
+                elif segment_id == "SE":
+                    if st is None:
+                        self._error(segment, "SE_WITHOUT_ST", "SE found without a matching ST")
+                    else:
+                        if self._element(segment, 2) != self._element(st, 2):
+                            self._error(segment, "SE02", f"SE02 {self._element(segment, 2)} does not match ST02 {self._element(st, 2)}")
+                        if self._element(segment, 1) != str(segment_count):
+                            self._error(segment, "SE01", f"SE01 says {self._element(segment, 1)} segments, counted {segment_count}")
+                    st = None
+
+                elif segment_id == "GE":
+                    if gs is None:
+                        self._error(segment, "GE_WITHOUT_GS", "GE found without a matching GS")
+                    else:
+                        if self._element(segment, 2) != self._element(gs, 6):
+                            self._error(segment, "GE02", f"GE02 {self._element(segment, 2)} does not match GS06 {self._element(gs, 6)}")
+                        if self._element(segment, 1) != str(transaction_count):
+                            self._error(segment, "GE01", f"GE01 says {self._element(segment, 1)} transactions, counted {transaction_count}")
+                    gs = None
+
+                elif segment_id == "IEA":
+                    if isa is None:
+                        self._error(segment, "IEA_WITHOUT_ISA", "IEA found without a matching ISA")
+                    else:
+                        if self._element(segment, 2) != self._element(isa, 13):
+                            self._error(segment, "IEA02", f"IEA02 {self._element(segment, 2)} does not match ISA13 {self._element(isa, 13)}")
+                        if self._element(segment, 1) != str(group_count):
+                            self._error(segment, "IEA01", f"IEA01 says {self._element(segment, 1)} groups, counted {group_count}")
+                    isa = None
+
+                elif st is None:
+                    self._error(segment, "SEGMENT_OUTSIDE_ST", f"{segment_id} found outside a transaction set")
+
+        if st is not None or gs is not None or isa is not None:
+            self.error_count += 1
+            self.errors.append({
+                "offset": -1,
+                "segment": "",
+                "rule": "UNTERMINATED_ENVELOPE",
+                "message": "File ended inside an open ST, GS or ISA envelope",
+            })
+
+        return {
+            "file": str(path),
+            "direction": self.direction,
+            "valid": self.error_count == 0,
+            "expected_ids": self.expected_ids,
+            "stats": self.stats,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+    def _check_expected(self, segment: Segment, element_name: str, index: int):
+        expected = self.expected_ids.get(element_name)
+        actual = self._element(segment, index)
+        if expected and actual != expected:
+            self._error(segment, element_name, f"{element_name} is '{actual}', questionnaire answer is '{expected}'")
+
+    def _check_character_set(self, segment: Segment, separators: Separators):
+        if not (self.check_basic_set or self.check_spaces):
+            return
+        delimiters = set(separators.element + separators.component + separators.repetition)
+        for element in segment.elements[1:]:
+            for byte in element:
+                if byte in delimiters:
+                    continue
+                if byte == 0x20:
+                    if self.check_spaces:
+                        self._error(segment, "CHARACTER_SET", "Space found but the payer does not accept spaces")
+                        return
+                elif self.check_basic_set and byte not in X12_BASIC_CHARACTERS:
+                    self._error(segment, "CHARACTER_SET", f"Character '{chr(byte)}' is outside the X12 basic character set")
+                    return
+
+
+def extract_answers(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Questionnaire answers from flat answers or a stored response record"""
+    for key in ("responses", "questionnaireData", "answers"):
+        if isinstance(data.get(key), dict):
+            return data[key]
+    return data
+
+
+def load_answers(answers_path: str) -> Dict[str, Any]:
+    """Load questionnaire answers from a flat answers file or a stored response record"""
+    with open(answers_path, 'r') as f:
+        return extract_answers(json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate an X12 270/271 batch file against questionnaire answers")
+    parser.add_argument("batch_file", help="Path to X12 batch file")
+    parser.add_argument("--answers", "-a", help="Questionnaire answers JSON (flat answers or a response record)")
+    parser.add_argument("--direction", "-d", choices=["270", "271"], default="270",
+                       help="Transaction set expected in the file")
+    parser.add_argument("--output", "-o", help="Write the validation report to this JSON file")
+    parser.add_argument("--max-errors", type=int, default=1000,
+                       help="Maximum number of errors kept in the report")
+
+    args = parser.parse_args()
+
+    if not Path(args.batch_file).exists():
+        print(f"❌ File not found: {args.batch_file}")
+        sys.exit(1)
+
+    answers = load_answers(args.answers) if args.answers else {}
+
+    print(f"🔍 Validating {args.direction} batch file: {args.batch_file}")
+    validator = EnvelopeValidator(answers, args.direction, args.max_errors)
+    try:
+        report = validator.validate(args.batch_file)
+    except ValueError as e:
+        print(f"❌ Cannot tokenize file: {e}")
+        sys.exit(1)
+
+    stats = report["stats"]
+    print(f"📊 {stats['segments']} segments, {stats['interchanges']} interchanges, "
+          f"{stats['functional_groups']} groups, {stats['transactions']} transactions")
+
+    for error in report["errors"][:20]:
+        print(f"   ❌ [{error['rule']}] byte {error['offset']}: {error['message']}")
+    if report["error_count"] > 20:
+        print(f"   ... and {report['error_count'] - 20} more errors")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report saved to: {args.output}")
+
+    if report["valid"]:
+        print("✅ Batch file is valid")
+    else:
+        print(f"❌ Found {report['error_count']} errors")
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Vector Geometry Field Detector
+
+This script finds form fields on flattened PDFs (no AcroForm, no widgets)
+from the page's vector drawings and text:
+- Empty rectangles → text input boxes
+- Small squares → checkboxes, small circles → radio buttons
+- Horizontal rules → underline (fill-in-the-blank) fields
+- Labels taken from the words beside the field on the same row (right of
+  checkboxes, left of inputs, above boxes with no label beside them)
+
+Shape filtering, containment tests and row clustering are done over NumPy
+arrays for the whole page at once.
+
+Usage:
+    python vector_field_detector.py <pdf_file>
+"""
+
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+# Geometry thresholds, in PDF points
+CHECKBOX_MIN, CHECKBOX_MAX = 6.0, 20.0
+SQUARE_TOLERANCE = 1.5
+BOX_MIN_WIDTH, BOX_MIN_HEIGHT, BOX_MAX_HEIGHT = 30.0, 10.0, 150.0
+RULE_MAX_THICKNESS = 2.0
+RULE_MIN_LENGTH = 30.0
+ROW_TOLERANCE = 4.0
+LABEL_GAP = 15.0   # between words of one label
+FIELD_GAP = 120.0  # between the label and its field (labels often sit in a fixed column)
+
+
+def _collect_shapes(page) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split page drawings into rectangles, horizontal rules and round shapes"""
+    rects, rules, rounds = [], [], []
+    for path in page.get_drawings():
+        items = path["items"]
+        kinds = {item[0] for item in items}
+        if kinds == {"c"}:
+            rounds.append(tuple(path["rect"]))
+            continue
+        # Boxes drawn as four closed line segments
+        if kinds == {"l"} and len(items) >= 4 and path.get("closePath", len(items) == 4):
+            bbox = path["rect"]
+            if bbox.width > RULE_MAX_THICKNESS and bbox.height > RULE_MAX_THICKNESS:
+                rects.append(tuple(bbox))
+                continue
+        for item in items:
+            if item[0] == "re":
+                rects.append(tuple(item[1]))
+            elif item[0] == "qu":
+                rects.append(tuple(item[1].rect))
+            elif item[0] == "l":
+                p1, p2 = item[1], item[2]
+                rules.append((min(p1.x, p2.x), min(p1.y, p2.y), max(p1.x, p2.x), max(p1.y, p2.y)))
+
+    def as_array(shapes):
+        # Filled + stroked copies of the same shape collapse to one row
+        array = np.round(np.array(shapes, dtype=np.float32).reshape(-1, 4) * 2) / 2
+        return np.unique(array, axis=0)
+
+    return as_array(rects), as_array(rules), as_array(rounds)
+
+
+def _contains_points(boxes: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """(boxes x points) containment matrix"""
+    return ((xs[None, :] > boxes[:, 0:1]) & (xs[None, :] < boxes[:, 2:3]) &
+            (ys[None, :] > boxes[:, 1:2]) & (ys[None, :] < boxes[:, 3:4]))
+
+
+def _cluster_rows(centers: np.ndarray) -> np.ndarray:
+    """Assign a row id to each y center; centers closer than ROW_TOLERANCE share a row"""
+    if not len(centers):
+        return np.zeros(0, dtype=np.int32)
+    order = np.argsort(centers)
+    breaks = np.concatenate([[0], np.diff(centers[order]) > ROW_TOLERANCE]).astype(np.int32)
+    rows = np.empty(len(centers), dtype=np.int32)
+    rows[order] = np.cumsum(breaks)
+    return rows
+
+
+def detect_page_fields(page) -> List[Dict[str, Any]]:
+    """Return candidate fields on one page: kind, rect, label and value"""
+    rects, rules, rounds = _collect_shapes(page)
+    words = page.get_text("words")
+    word_boxes = np.array([w[:4] for w in words], dtype=np.float32).reshape(-1, 4)
+    word_text = [w[4] for w in words]
+    word_cx = (word_boxes[:, 0] + word_boxes[:, 2]) / 2
+    word_cy = (word_boxes[:, 1] + word_boxes[:, 3]) / 2
+    page_width = page.rect.width
+
+    # Checkboxes: small squares
+    widths, heights = rects[:, 2] - rects[:, 0], rects[:, 3] - rects[:, 1]
+    squares = ((widths >= CHECKBOX_MIN) & (widths <= CHECKBOX_MAX) &
+               (np.abs(widths - heights) <= SQUARE_TOLERANCE))
+
+    # Input boxes: empty, wider than tall, not a page frame
+    boxes = ((widths >= BOX_MIN_WIDTH) & (heights >= BOX_MIN_HEIGHT) & (heights <= BOX_MAX_HEIGHT) &
+             (widths >= heights * 1.5) & (widths < page_width * 0.95))
+    if boxes.any() and len(words):
+        boxes[boxes] &= ~_contains_points(rects[boxes], word_cx, word_cy).any(axis=1)
+    # Drop boxes that enclose other shapes (section frames, tables)
+    if boxes.sum() > 1:
+        inner = rects[squares | boxes]
+        inner_cx, inner_cy = (inner[:, 0] + inner[:, 2]) / 2, (inner[:, 1] + inner[:, 3]) / 2
+        enclosing = _contains_points(rects[boxes], inner_cx, inner_cy).sum(axis=1) > 1
+        boxes[boxes] &= ~enclosing
+
+    # Thin filled rectangles are rules too
+    thin = (heights <= RULE_MAX_THICKNESS) & (widths >= RULE_MIN_LENGTH)
+    rules = np.concatenate([rules, rects[thin]])
+    lengths = rules[:, 2] - rules[:, 0]
+    underline = ((rules[:, 3] - rules[:, 1] <= RULE_MAX_THICKNESS) &
+                 (lengths >= RULE_MIN_LENGTH) & (lengths < page_width * 0.8))
+    # Edges of detected boxes are not underlines
+    box_rects = rects[boxes]
+    if underline.any() and len(box_rects):
+        y = rules[:, 1:2]
+        on_edge = (((np.abs(y - box_rects[:, 1]) <= 1.5) | (np.abs(y - box_rects[:, 3]) <= 1.5)) &
+                   (rules[:, 0:1] < box_rects[:, 2]) & (rules[:, 2:3] > box_rects[:, 0]))
+        underline &= ~on_edge.any(axis=1)
+
+    rw, rh = rounds[:, 2] - rounds[:, 0], rounds[:, 3] - rounds[:, 1]
+    radios = (rw >= CHECKBOX_MIN) & (rw <= CHECKBOX_MAX) & (np.abs(rw - rh) <= SQUARE_TOLERANCE)
+
+    kinds = (["checkbox"] * int(squares.sum()) + ["text"] * int(boxes.sum()) +
+             ["underline"] * int(underline.sum()) + ["radio"] * int(radios.sum()))
+    fields = np.concatenate([rects[squares], rects[boxes], rules[underline], rounds[radios]])
+    if not len(fields):
+        return []
+
+    # Underline labels and values sit on the text row just above the rule
+    is_rule = np.array([kind == "underline" for kind in kinds])
+    row_y = np.where(is_rule, fields[:, 1] - 5, (fields[:, 1] + fields[:, 3]) / 2)
+    rows = _cluster_rows(row_y)
+    order = np.lexsort((fields[:, 0], rows))
+    word_rows = ((word_boxes[:, 1][None, :] < row_y[:, None]) &
+                 (word_boxes[:, 3][None, :] > row_y[:, None]))
+
+    detected = []
+    for position, index in enumerate(order):
+        x0, y0, x1, y1 = (float(v) for v in fields[index])
+        kind = kinds[index]
+        same_row = word_rows[index]
+        # The label ends where the previous field on this row ends
+        previous = order[position - 1] if position else None
+        left_limit = float(fields[previous, 2]) if previous is not None and rows[previous] == rows[index] else 0.0
+
+        label_words = []
+        # Checkbox options usually read "□ Label"; other fields have the label first
+        if kind in ("checkbox", "radio"):
+            next_index = order[position + 1] if position + 1 < len(order) else None
+            right_limit = (float(fields[next_index, 0])
+                           if next_index is not None and rows[next_index] == rows[index] else page_width)
+            label_words = _adjacent_words(word_boxes, word_text, same_row, x1, right_limit, leftwards=False)
+        if not label_words:
+            label_words = _adjacent_words(word_boxes, word_text, same_row, x0, left_limit, leftwards=True)
+        if kind == "text" and not label_words:
+            above = ((word_boxes[:, 3] <= y0 + 1) & (word_boxes[:, 3] >= y0 - 16) &
+                     (word_boxes[:, 0] >= x0 - 2) & (word_boxes[:, 0] < x1))
+            label_words = [word_text[i] for i in np.flatnonzero(above)[np.argsort(word_boxes[above, 0])]]
+
+        value = ""
+        if kind == "underline":
+            on_rule = same_row & (word_boxes[:, 0] >= x0 - 1) & (word_boxes[:, 2] <= x1 + 1)
+            on_rule_ids = np.flatnonzero(on_rule)
+            # Text starting flush with the rule is underlined text, not a field
+            if not label_words or (len(on_rule_ids) and word_boxes[on_rule_ids, 0].min() - x0 < 1):
+                continue
+            value = " ".join(word_text[i] for i in on_rule_ids[np.argsort(word_boxes[on_rule_ids, 0])])
+
+        detected.append({
+            "kind": kind,
+            "rect": [x0, y0, x1, y1],
+            "label": " ".join(label_words).strip(" :"),
+            "value": value,
+        })
+    return detected
+
+
+def _adjacent_words(word_boxes: np.ndarray, word_text: List[str], same_row: np.ndarray,
+                    edge: float, limit: float, leftwards: bool) -> List[str]:
+    """Contiguous words on the row next to a field edge, up to the neighbouring field"""
+    if leftwards:
+        candidates = same_row & (word_boxes[:, 2] <= edge + 2) & (word_boxes[:, 0] >= limit)
+        ids = np.flatnonzero(candidates)
+        ids = ids[np.argsort(-word_boxes[ids, 2])]
+    else:
+        candidates = same_row & (word_boxes[:, 0] >= edge - 2) & (word_boxes[:, 2] <= limit + 2)
+        ids = np.flatnonzero(candidates)
+        ids = ids[np.argsort(word_boxes[ids, 0])]
+
+    picked = []
+    cursor = edge
+    for i in ids:
+        gap = cursor - word_boxes[i, 2] if leftwards else word_boxes[i, 0] - cursor
+        if gap > (LABEL_GAP if picked else FIELD_GAP):
+            break
+        picked.append(word_text[i])
+        cursor = word_boxes[i, 0] if leftwards else word_boxes[i, 2]
+    return picked[::-1] if leftwards else picked
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python vector_field_detector.py <pdf_file>")
+        sys.exit(1)
+
+    pdf_file = sys.argv[1]
+    if not Path(pdf_file).exists():
+        print(f"❌ File not found: {pdf_file}")
+        sys.exit(1)
+
+    import fitz  # PyMuPDF
+
+    started = time.perf_counter()
+    with fitz.open(pdf_file) as doc:
+        results = [(page_num + 1, detect_page_fields(doc[page_num])) for page_num in range(len(doc))]
+    elapsed = time.perf_counter() - started
+
+    total = 0
+    for page_num, fields in results:
+        for field in fields:
+            total += 1
+            value = f" = '{field['value']}'" if field["value"] else ""
+            print(f"   p{page_num} {field['kind']:<9} {field['label'] or '(no label)'}{value}")
+    print(f"✅ Detected {total} fields across {len(results)} pages in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
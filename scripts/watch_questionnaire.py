@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Questionnaire Watch Mode
+
+This script watches complete_questionnaire.json during form onboarding and
+keeps backend/src/data/x12-270-271-complete.ts in sync incrementally:
+- inotify on Linux (no extra packages), mtime polling elsewhere
+- Bursts of saves are debounced into one regeneration
+- Per-section hashes find the sections that changed; only their fragments
+  of the TS file are re-rendered and spliced in, everything else in the
+  file (including hand edits) is left byte-for-byte as it was
+- Added, removed or reordered sections regenerate the sections array
+- Changes to the top-level fields (id, title, description, version,
+  transactionType) re-render the header above the sections array
+- x12Field mappings are dropped as remove_x12_mappings.py would (--keep-x12
+  keeps them)
+- Every change passes the same schema gate as convert_questionnaire_to_backend.py
+  (check_before_emit) before anything is written; invalid saves are skipped
+
+The state at startup is the baseline: nothing is written until the JSON
+changes. Running fix_field_names.py rewrites the JSON, so its changes are
+picked up too.
+
+Usage:
+    python watch_questionnaire.py [--questionnaire extracted_fields/complete_questionnaire.json]
+                                  [--output backend/src/data/x12-270-271-complete.ts] [--debounce 0.15] [--keep-x12]
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import ctypes
+import select
+import struct
+import hashlib
+import argparse
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from convert_questionnaire_to_backend import (
+    QUESTIONNAIRE_PATH, BACKEND_PATH, build_backend_questionnaire, convert_section,
+    generate_typescript_file, render_section, render_typescript
+)
+from run_journal import atomic_write
+from validate_questionnaire_schema import check_before_emit
+
+DEBOUNCE_SECONDS = 0.15
+POLL_INTERVAL = 0.1
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+_EVENT_HEADER = struct.Struct("iIII")
+
+SECTION_START = "    {\n"
+SECTION_END = re.compile(r"^    },?\n$")
+SECTION_ID = re.compile(r"^      id: '([^']*)',")
+
+
+class InotifyWatcher:
+    """Change notifications for one file through the Linux inotify API"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch the directory: editors often save by writing a new file and renaming it over the old one
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, str(path.parent).encode(), mask) < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {path.parent}")
+
+    def _drain(self) -> bool:
+        """Read pending events; True if any concern the watched file"""
+        changed = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+                offset += length
+                changed |= name == self.path.name
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+            if self._drain():
+                return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """mtime polling where inotify is not available"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.last = self._stamp()
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while deadline is None or time.monotonic() < deadline:
+            stamp = self._stamp()
+            if stamp != self.last:
+                self.last = stamp
+                return True
+            time.sleep(POLL_INTERVAL)
+        return False
+
+    def close(self):
+        pass
+
+
+def make_watcher(path: Path):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(path)
+
+
+def section_hashes(questionnaire: Dict[str, Any]) -> List[Tuple[str, str]]:
+    return [
+        (section["id"], hashlib.sha1(json.dumps(section, sort_keys=True).encode()).hexdigest())
+        for section in questionnaire.get("sections", [])
+    ]
+
+
+def header_hash(questionnaire: Dict[str, Any]) -> str:
+    """Hash of everything outside the sections array"""
+    fields = {key: value for key, value in questionnaire.items() if key != "sections"}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+
+def render_header(questionnaire: Dict[str, Any]) -> str:
+    """Generated file content up to and including the `sections: [` line"""
+    backend = build_backend_questionnaire({**questionnaire, "sections": []})
+    return split_sections(render_typescript(backend))[0]
+
+
+def split_sections(ts_content: str) -> Optional[Tuple[str, List[Tuple[str, str]], str]]:
+    """(header, [(section id, fragment)], footer) of a generated file, or None if its layout is unexpected"""
+    lines = ts_content.splitlines(keepends=True)
+    try:
+        start = lines.index("  sections: [\n") + 1
+    except ValueError:
+        return None
+
+    fragments = []
+    index = start
+    while index < len(lines) and lines[index] == SECTION_START:
+        end = index + 1
+        while end < len(lines) and not SECTION_END.match(lines[end]):
+            end += 1
+        id_match = SECTION_ID.match(lines[index + 1]) if index + 1 < len(lines) else None
+        if end >= len(lines) or not id_match:
+            return None
+        fragments.append((id_match.group(1), "".join(lines[index:end + 1])))
+        index = end + 1
+    return "".join(lines[:start]), fragments, "".join(lines[index:])
+
+
+def prepare_section(section: Dict[str, Any], keep_x12: bool) -> Dict[str, Any]:
+    backend_section = convert_section(section)
+    if not keep_x12:
+        for question in backend_section["questions"]:
+            question.pop("x12Field", None)
+    return backend_section
+
+
+class QuestionnaireSync:
+    """Re-emits the TS fragments of sections whose JSON changed since the last sync"""
+
+    def __init__(self, questionnaire_path: Path, output_path: Path, keep_x12: bool = False):
+        self.questionnaire_path = questionnaire_path
+        self.output_path = output_path
+        self.keep_x12 = keep_x12
+        questionnaire = self._load()
+        self.hashes = section_hashes(questionnaire)
+        self.header_hash = header_hash(questionnaire)
+
+    def _load(self) -> Dict[str, Any]:
+        with open(self.questionnaire_path, 'r') as f:
+            return json.load(f)
+
+    def sync(self) -> Dict[str, Any]:
+        questionnaire = self._load()
+        hashes = section_hashes(questionnaire)
+        previous = dict(self.hashes)
+        changed = [section_id for section_id, digest in hashes if previous.get(section_id) != digest]
+        same_structure = [section_id for section_id, _ in hashes] == [section_id for section_id, _ in self.hashes]
+        header_digest = header_hash(questionnaire)
+        header_changed = header_digest != self.header_hash
+        if not changed and same_structure and not header_changed:
+            return {"mode": "unchanged", "sections": [], "header": False}
+
+        errors = check_before_emit(questionnaire)
+        if errors:
+            raise ValueError(f"schema validation failed: {'; '.join(errors)}")
+
+        sections = questionnaire["sections"]
+        parsed = split_sections(self.output_path.read_text()) if self.output_path.exists() else None
+
+        if parsed is None:
+            # No file, or not in the generated layout: write it from scratch
+            backend = build_backend_questionnaire(questionnaire)
+            backend["sections"] = [prepare_section(section, self.keep_x12) for section in sections]
+            with redirect_stdout(io.StringIO()):
+                generate_typescript_file(backend, self.output_path)
+            result = {"mode": "full", "sections": [section["id"] for section in sections], "header": True}
+        else:
+            header, fragments, footer = parsed
+            if header_changed:
+                header = render_header(questionnaire)
+            current = dict(fragments)
+            by_id = {section["id"]: section for section in sections}
+            if same_structure and all(section_id in current for section_id in changed):
+                # Splice changed sections in place; every other fragment is kept as it is
+                rendered = [
+                    render_section(prepare_section(by_id[section_id], self.keep_x12),
+                                   last=not fragment.endswith(",\n"))
+                    if section_id in changed else fragment
+                    for section_id, fragment in fragments
+                ]
+                mode = "incremental"
+            else:
+                # Sections added, removed or moved: follow the JSON order, reusing unchanged fragments
+                rendered = []
+                for i, section in enumerate(sections):
+                    last = i == len(sections) - 1
+                    fragment = current.get(section["id"])
+                    if fragment is not None and section["id"] not in changed:
+                        rendered.append(fragment.rstrip("\n").rstrip(",") + ("\n" if last else ",\n"))
+                    else:
+                        rendered.append(render_section(prepare_section(section, self.keep_x12), last=last))
+                mode = "restructured"
+            with atomic_write(self.output_path) as f:
+                f.write(header + "".join(rendered) + footer)
+            result = {"mode": mode, "sections": changed, "header": header_changed}
+
+        self.hashes = hashes
+        self.header_hash = header_digest
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate backend questionnaire sections as the JSON changes")
+    parser.add_argument("--questionnaire", "-q", default=str(QUESTIONNAIRE_PATH), help="Questionnaire JSON to watch")
+    parser.add_argument("--output", "-o", default=str(BACKEND_PATH), help="Backend TypeScript module")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS, help="Quiet period before regenerating")
+    parser.add_argument("--keep-x12", action="store_true", help="Keep x12Field mappings in the TypeScript output")
+
+    args = parser.parse_args()
+
+    questionnaire_path = Path(args.questionnaire)
+    if not questionnaire_path.exists():
+        print(f"❌ File not found: {questionnaire_path}")
+        sys.exit(1)
+
+    sync = QuestionnaireSync(questionnaire_path, Path(args.output), args.keep_x12)
+    watcher = make_watcher(questionnaire_path)
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"👀 Watching {questionnaire_path} ({kind}, {len(sync.hashes)} sections) → {args.output}")
+
+    try:
+        while True:
+            watcher.wait()
+            # Debounce: wait until saves stop arriving
+            while watcher.wait(args.debounce):
+                pass
+            started = time.perf_counter()
+            try:
+                result = sync.sync()
+            except (ValueError, KeyError) as e:
+                print(f"⚠️  Skipping invalid questionnaire: {e}")
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            if result["mode"] == "unchanged":
+                continue
+            parts = (["header"] if result["header"] and result["mode"] != "full" else []) + result["sections"]
+            print(f"🔄 {result['mode']}: {', '.join(parts) or 'section order'} ({elapsed:.0f}ms)")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Columnar Widget Table
+
+This script loads PDF form widgets into a compact columnar table instead of
+one nested dict per widget:
+- NumPy structured array for document, page, type code, flags and rect
+- Interned string columns for field names and values
+- Control type classification from the PyMuPDF widget type code, refined
+  by flag bits (pushbutton, multiline, password, required, readonly), as
+  vectorized operations
+- Save/load as a single .npz file so large corpora are analyzed without
+  reopening the PDFs
+
+Control type labels and flag bits are those of analyze_form_controls.py;
+the type itself comes from the fitz.PDF_WIDGET_TYPE_* codes (as in
+render_page_overlays.py), not from determine_precise_control_type.
+
+Usage:
+    python widget_table.py <pdf_file_or_dir> [more ...] [--save extracted_fields/widgets.npz]
+    python widget_table.py --load extracted_fields/widgets.npz
+"""
+
+import sys
+import time
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# Field flag bits (PDF 32000-1, 12.7.3.1 and 12.7.4)
+FLAG_READONLY = 1
+FLAG_REQUIRED = 2
+FLAG_MULTILINE = 4096
+FLAG_PASSWORD = 8192
+FLAG_RADIO = 32768
+FLAG_PUSHBUTTON = 65536
+FLAG_COMBO = 131072
+
+# PyMuPDF widget type codes
+TYPE_BUTTON = fitz.PDF_WIDGET_TYPE_BUTTON
+TYPE_CHECKBOX = fitz.PDF_WIDGET_TYPE_CHECKBOX
+TYPE_COMBOBOX = fitz.PDF_WIDGET_TYPE_COMBOBOX
+TYPE_LISTBOX = fitz.PDF_WIDGET_TYPE_LISTBOX
+TYPE_RADIOBUTTON = fitz.PDF_WIDGET_TYPE_RADIOBUTTON
+TYPE_SIGNATURE = fitz.PDF_WIDGET_TYPE_SIGNATURE
+TYPE_TEXT = fitz.PDF_WIDGET_TYPE_TEXT
+
+# Control code -> (control_type, control_subtype), same labels as analyze_form_controls.py
+CONTROL_TYPES: List[Tuple[str, str]] = [
+    ("unknown", "unknown"),
+    ("checkbox", "checkbox"),
+    ("radio", "radio_button"),
+    ("button", "push_button"),
+    ("text", "textbox"),
+    ("text", "textarea"),
+    ("text", "password"),
+    ("choice", "listbox"),
+    ("choice", "combobox"),
+    ("signature", "signature"),
+]
+
+WIDGET_DTYPE = np.dtype([
+    ("doc", np.uint32),
+    ("page", np.uint16),
+    ("type_code", np.uint8),
+    ("flags", np.uint32),
+    ("rect", np.float32, (4,)),
+    ("name", np.uint32),
+    ("value", np.uint32),
+])
+
+
+class StringPool:
+    """Interned strings; columns store the integer id"""
+
+    def __init__(self, strings: Iterable[str] = ()):
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for string in strings:
+            self.intern(string)
+
+    def intern(self, string: str) -> int:
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = self.ids[string] = len(self.strings)
+            self.strings.append(string)
+        return string_id
+
+    def __getitem__(self, string_id: int) -> str:
+        return self.strings[string_id]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class WidgetTable:
+    """All widgets of one or more PDFs as parallel columns"""
+
+    def __init__(self, rows: np.ndarray = None, names: StringPool = None,
+                 values: StringPool = None, sources: List[str] = None):
+        self.rows = rows if rows is not None else np.zeros(0, dtype=WIDGET_DTYPE)
+        self.names = names or StringPool()
+        self.values = values or StringPool([""])
+        self.sources = sources or []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def from_pdfs(cls, pdf_paths: Iterable[str]) -> "WidgetTable":
+        table = cls()
+        chunks = []
+        for pdf_path in pdf_paths:
+            doc_id = len(table.sources)
+            table.sources.append(str(pdf_path))
+            with fitz.open(pdf_path) as doc:
+                chunks.append(table._read_document(doc, doc_id))
+        if chunks:
+            table.rows = np.concatenate(chunks)
+        return table
+
+    def _read_document(self, doc, doc_id: int) -> np.ndarray:
+        widgets = []
+        for page_num in range(len(doc)):
+            for widget in doc[page_num].widgets():
+                rect = widget.rect
+                widgets.append((
+                    doc_id,
+                    page_num + 1,
+                    widget.field_type or 0,
+                    widget.field_flags or 0,
+                    (rect.x0, rect.y0, rect.x1, rect.y1) if rect else (0, 0, 0, 0),
+                    self.names.intern(widget.field_name or f"unnamed_field_{len(widgets)}"),
+                    self.values.intern(str(widget.field_value or "")),
+                ))
+        return np.array(widgets, dtype=WIDGET_DTYPE)
+
+    # Vectorized flag masks
+
+    def has_flag(self, flag: int) -> np.ndarray:
+        return (self.rows["flags"] & flag) != 0
+
+    @property
+    def is_readonly(self) -> np.ndarray:
+        return self.has_flag(FLAG_READONLY)
+
+    @property
+    def is_required(self) -> np.ndarray:
+        return self.has_flag(FLAG_REQUIRED)
+
+    # The type code decides; button flags only classify a generic button widget
+
+    @property
+    def is_radio(self) -> np.ndarray:
+        type_code = self.rows["type_code"]
+        return (type_code == TYPE_RADIOBUTTON) | ((type_code == TYPE_BUTTON) & self.has_flag(FLAG_RADIO))
+
+    @property
+    def is_checkbox(self) -> np.ndarray:
+        type_code = self.rows["type_code"]
+        return (type_code == TYPE_CHECKBOX) | (
+            (type_code == TYPE_BUTTON) & ~self.has_flag(FLAG_RADIO) & ~self.has_flag(FLAG_PUSHBUTTON))
+
+    @property
+    def is_pushbutton(self) -> np.ndarray:
+        return (self.rows["type_code"] == TYPE_BUTTON) & ~self.has_flag(FLAG_RADIO) & self.has_flag(FLAG_PUSHBUTTON)
+
+    @property
+    def is_multiline(self) -> np.ndarray:
+        return (self.rows["type_code"] == TYPE_TEXT) & self.has_flag(FLAG_MULTILINE)
+
+    @property
+    def is_password(self) -> np.ndarray:
+        return (self.rows["type_code"] == TYPE_TEXT) & ~self.has_flag(FLAG_MULTILINE) & self.has_flag(FLAG_PASSWORD)
+
+    def control_codes(self) -> np.ndarray:
+        """Index into CONTROL_TYPES for every widget"""
+        type_code = self.rows["type_code"]
+        text = type_code == TYPE_TEXT
+        return np.select(
+            [self.is_radio, self.is_pushbutton, self.is_checkbox,
+             self.is_multiline, self.is_password, text,
+             type_code == TYPE_LISTBOX, type_code == TYPE_COMBOBOX, type_code == TYPE_SIGNATURE],
+            [2, 3, 1, 5, 6, 4, 7, 8, 9],
+            default=0,
+        ).astype(np.uint8)
+
+    def field_type_counts(self) -> Dict[str, int]:
+        """Same shape as analysis['field_types'] in analyze_form_controls.py"""
+        counts = np.bincount(self.control_codes(), minlength=len(CONTROL_TYPES))
+        totals = Counter()
+        for code, count in enumerate(counts):
+            if count:
+                totals[CONTROL_TYPES[code][0]] += int(count)
+        return dict(totals)
+
+    def flag_counts(self) -> Dict[str, int]:
+        return {
+            "required": int(self.is_required.sum()),
+            "readonly": int(self.is_readonly.sum()),
+            "radio": int(self.is_radio.sum()),
+            "checkbox": int(self.is_checkbox.sum()),
+            "pushbutton": int(self.is_pushbutton.sum()),
+            "multiline": int(self.is_multiline.sum()),
+            "password": int(self.is_password.sum()),
+        }
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Materialize one widget as a dict (for reports and debugging)"""
+        record = self.rows[index]
+        control_type, control_subtype = CONTROL_TYPES[self.control_codes()[index]]
+        return {
+            "source": self.sources[record["doc"]],
+            "field_name": self.names[record["name"]],
+            "page": int(record["page"]),
+            "widget_type_code": int(record["type_code"]),
+            "control_type": control_type,
+            "control_subtype": control_subtype,
+            "current_value": self.values[record["value"]],
+            "flags": int(record["flags"]),
+            "rect": [float(v) for v in record["rect"]],
+        }
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the table (columns plus interned strings)"""
+        return self.rows.nbytes + sum(sys.getsizeof(s) for s in self.names.strings + self.values.strings)
+
+    def save(self, path: str):
+        output_path = Path(path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            output_path,
+            rows=self.rows,
+            names=np.array(self.names.strings, dtype=object),
+            values=np.array(self.values.strings, dtype=object),
+            sources=np.array(self.sources, dtype=object),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "WidgetTable":
+        with np.load(path, allow_pickle=True) as data:
+            return cls(data["rows"], StringPool(data["names"].tolist()),
+                       StringPool(data["values"].tolist()), data["sources"].tolist())
+
+
+def collect_pdf_paths(inputs: List[str]) -> List[Path]:
+    paths = []
+    for item in inputs:
+        path = Path(item)
+        paths.extend(sorted(path.rglob("*.pdf")) if path.is_dir() else [path])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a columnar widget table from PDF forms")
+    parser.add_argument("inputs", nargs="*", help="PDF files or directories of PDFs")
+    parser.add_argument("--save", "-s", help="Save the table as .npz")
+    parser.add_argument("--load", "-l", help="Load a saved .npz table instead of reading PDFs")
+
+    args = parser.parse_args()
+
+    if args.load:
+        table = WidgetTable.load(args.load)
+    else:
+        pdf_paths = collect_pdf_paths(args.inputs)
+        missing = [str(path) for path in pdf_paths if not path.exists()]
+        if not pdf_paths or missing:
+            print(f"❌ No PDF files found: {missing or args.inputs}")
+            sys.exit(1)
+        print(f"🔍 Reading widgets from {len(pdf_paths)} PDF(s)")
+        started = time.perf_counter()
+        table = WidgetTable.from_pdfs(pdf_paths)
+        print(f"   Loaded {len(table)} widgets in {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    field_types = table.field_type_counts()
+    flags = table.flag_counts()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"✅ {len(table)} widgets from {len(table.sources)} document(s), "
+          f"{table.nbytes() / 1024:.1f} KiB, classified in {elapsed_ms:.2f}ms")
+    print("\n📋 Field Type Summary:")
+    for field_type, count in sorted(field_types.items()):
+        print(f"   {field_type}: {count}")
+    print("\n🚩 Flags:")
+    for flag, count in flags.items():
+        print(f"   {flag}: {count}")
+
+    if args.save:
+        table.save(args.save)
+        print(f"\n💾 Saved to: {args.save}")
+
+
+if __name__ == "__main__":
+    main()